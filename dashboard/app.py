@@ -1,58 +1,68 @@
 import streamlit as st
 import pandas as pd
-import duckdb
+import os
 import time
 from pathlib import Path
 import sys
 
+# The bot owns logs/app.log (and its rotation); the dashboard only reads it
+os.environ.setdefault("LOG_FILES", "0")
+
 # Add src to path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
-from src.config import DATA_DIR, LOG_DIR, KILL_SWITCH_FILE, TRADING_SYMBOL
+from src.config import DATA_DIR, LOG_DIR, KILL_SWITCH_FILE, TRADING_SYMBOL, RESAMPLE_MINUTES, FEED_ENABLED, FEED_SOCKET
+from src.events.feed import FeedClient
+
+from dashboard.data import DashboardData
+from dashboard.logs import LogTail, search as search_logs
+from src.utils import STRUCTURED_DIR
 
 st.set_page_config(page_title="IBKR Algo Dashboard", layout="wide")
 
-# Database Connection - Transient with Retry
-def run_query(query: str, as_df: bool = True):
-    db_path = str(DATA_DIR / "db" / "trading.duckdb")
-    max_retries = 5
-    
-    for i in range(max_retries):
-        try:
-            with duckdb.connect(db_path, read_only=True) as conn:
-                res = conn.execute(query)
-                if as_df:
-                    return res.df()
-                return res.fetchall()
-        except duckdb.IOException:
-            time.sleep(0.1 * (i + 1))
-        except Exception as e:
-            st.error(f"DB Error: {e}")
-            return pd.DataFrame() if as_df else []
-            
-    return pd.DataFrame() if as_df else []
-
-def load_data():
-    # Recent Bars - show full day (1000 mins)
-    bars = run_query("SELECT * FROM bars_1m ORDER BY time DESC LIMIT 1000")
-    if not bars.empty: bars = bars.sort_values('time')
-    
-    # Recent Signals
-    signals = run_query("SELECT * FROM signals ORDER BY timestamp DESC LIMIT 50")
-    
-    # Strategy State - latest for metrics
-    state = run_query("SELECT * FROM strategy_state ORDER BY timestamp DESC LIMIT 1")
-    
-    # Historical State - for indicators
-    state_hist = run_query("SELECT timestamp, orb_high, orb_low, ema20 FROM strategy_state ORDER BY timestamp DESC LIMIT 1000")
-    if not state_hist.empty: state_hist = state_hist.sort_values('timestamp')
-    
-    # Fills & Orders
-    fills = run_query("SELECT * FROM fills ORDER BY time DESC LIMIT 50")
-    orders = run_query("SELECT * FROM orders ORDER BY created_at DESC LIMIT 50")
-    
-    return bars, signals, state, state_hist, fills, orders
+# One incremental data layer for every session: each refresh reads only rows newer than what's cached
+@st.cache_resource
+def get_data_layer() -> DashboardData:
+    return DashboardData(DATA_DIR / "db" / "trading.duckdb")
+
+# Remembers its offset in app.log, so a refresh only reads the lines appended since the last one
+@st.cache_resource
+def get_log_tail() -> LogTail:
+    return LogTail(LOG_DIR / "app.log", n=20)
+
+# Push feed from the bot; None when disabled. Falls back to polling the DB while disconnected.
+@st.cache_resource
+def get_feed():
+    return FeedClient(FEED_SOCKET).start() if FEED_ENABLED else None
+
+@st.cache_data(ttl=30.0, show_spinner=False)
+def load_symbols():
+    try:
+        return get_data_layer().symbols() or [TRADING_SYMBOL]
+    except Exception as e:
+        st.error(f"DB Error: {e}")
+        return [TRADING_SYMBOL]
+
+# Sessions refreshing within the same second / feed message share one load.
+# feed_seq is only part of the cache key, so a new feed message always misses the cache.
+@st.cache_data(ttl=1.0, show_spinner=False)
+def load_data(symbol: str, minutes: int = 1, feed_seq: int = 0):
+    try:
+        return get_data_layer().load(symbol, minutes, feed=get_feed())
+    except Exception as e:
+        st.error(f"DB Error: {e}")
+        empty = pd.DataFrame()
+        return empty, empty, empty, empty, empty, empty
+
+# Long ranges come pre-aggregated from DuckDB; they change slowly, so refresh them less often
+@st.cache_data(ttl=30.0, show_spinner=False)
+def load_chart(symbol: str, days: float, width_px: int):
+    try:
+        return get_data_layer().chart(symbol, days, width_px)
+    except Exception as e:
+        st.error(f"DB Error: {e}")
+        return pd.DataFrame(), pd.DataFrame(), 60
 
 # Sidebar
 st.sidebar.title("Controls")
@@ -62,6 +72,14 @@ if st.sidebar.button("Refresh Data"):
 
 auto_refresh = st.sidebar.checkbox("Auto Refresh (2s)", value=True)
 
+symbols = load_symbols()
+symbol = st.sidebar.selectbox("Symbol", symbols, index=symbols.index(TRADING_SYMBOL) if TRADING_SYMBOL in symbols else 0)
+timeframe = st.sidebar.selectbox("Timeframe (min)", [1] + RESAMPLE_MINUTES)
+# Live: last bars at the selected timeframe. Longer ranges: candle size picked to fit the chart width
+RANGES = {"Live": None, "1 day": 1, "1 week": 7, "4 weeks": 28, "3 months": 91}
+chart_days = RANGES[st.sidebar.selectbox("Chart Range", list(RANGES))]
+CHART_WIDTH_PX = 1600 # Streamlit doesn't report the real width; a wide-screen estimate caps the point count
+
 # Kill Switch
 st.sidebar.markdown("---")
 st.sidebar.subheader("Risk Control")
@@ -79,9 +97,11 @@ if st.sidebar.button("RESET KILL SWITCH"):
     st.sidebar.success("Kill Switch Reset")
 
 # Main Content
-st.title("🤖 Algo Trading Dashboard (MES)")
+st.title(f"🤖 Algo Trading Dashboard ({symbol})")
 
-bars_df, signals_df, state_df, state_hist_df, fills_df, orders_df = load_data()
+feed = get_feed()
+feed_seq = feed.seq if feed is not None else 0
+bars_df, signals_df, state_df, state_hist_df, fills_df, orders_df = load_data(symbol, timeframe, feed_seq)
 
 # Top Metrics
 col1, col2, col3, col4 = st.columns(4)
@@ -107,28 +127,33 @@ col4.metric("Current ORB", f"{orb_l:.2f} - {orb_h:.2f}" if orb_l and orb_h else
 import plotly.graph_objects as go
 
 # Charts
-if not bars_df.empty:
-    st.subheader(f"Interactive Chart ({TRADING_SYMBOL})")
+chart_bars, chart_ema, title = bars_df, state_hist_df, f"{timeframe}m"
+if chart_days is not None:
+    chart_bars, chart_ema, bucket = load_chart(symbol, chart_days, CHART_WIDTH_PX)
+    title = f"{chart_days}d, {bucket // 60}m candles"
+
+if not chart_bars.empty:
+    st.subheader(f"Interactive Chart ({symbol}, {title})")
     
     # Create figure
     fig = go.Figure()
     
     # 1. Candlestick
     fig.add_trace(go.Candlestick(
-        x=bars_df['time'],
-        open=bars_df['open'],
-        high=bars_df['high'],
-        low=bars_df['low'],
-        close=bars_df['close'],
+        x=chart_bars['time'],
+        open=chart_bars['open'],
+        high=chart_bars['high'],
+        low=chart_bars['low'],
+        close=chart_bars['close'],
         name='Price'
     ))
     
     # 2. Indicators from State History (Aligned to Market Time)
-    if not state_hist_df.empty:
+    if not chart_ema.empty:
         # EMA20 - Aligned to market timestamp
         fig.add_trace(go.Scatter(
-            x=state_hist_df['timestamp'], 
-            y=state_hist_df['ema20'], 
+            x=chart_ema['timestamp'], 
+            y=chart_ema['ema20'], 
             mode='lines', 
             name='EMA 20',
             line=dict(color='orange', width=2)
@@ -178,11 +203,26 @@ with tab2:
 
 # Logs
 st.subheader("System Logs")
-log_file = LOG_DIR / "app.log"
-if log_file.exists():
-    lines = log_file.read_text().splitlines()[-20:]
+lines = get_log_tail().read()
+if lines:
     st.text("\n".join(lines))
 
+with st.expander("Search Logs"):
+    c1, c2, c3, c4 = st.columns(4)
+    levels = c1.multiselect("Level", ["CRITICAL", "ERROR", "WARNING", "INFO", "DEBUG"], default=["ERROR", "CRITICAL"])
+    days = c2.number_input("Days", min_value=1, max_value=90, value=7)
+    component = c3.text_input("Component (module)")
+    text = c4.text_input("Contains")
+    rows = search_logs(STRUCTURED_DIR, levels, int(days), component or None, text or None)
+    if rows:
+        st.dataframe(pd.DataFrame(rows))
+    else:
+        st.info("No matching log records")
+
 if auto_refresh:
-    time.sleep(2)
+    if feed is not None and feed.connected:
+        # Redraw as soon as the bot pushes something (or every 30s if it's quiet)
+        feed.wait(feed_seq, timeout=30.0)
+    else:
+        time.sleep(2)
     st.rerun()
@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Long-range chart data, aggregated in DuckDB so the browser never gets more points than it can draw.
+# Candles: bars_1m bucketed with time_bucket at a resolution picked from the range and the chart width
+# (high = max, low = min, so wicks survive). Indicator lines: LTTB down to the same point budget.
+
+# Candle sizes the bucket is picked from (seconds); all divide a day or are whole days / a week
+BUCKETS = [60, 120, 300, 600, 900, 1800, 3600, 7200, 14400, 86400, 604800]
+PX_PER_CANDLE = 4
+
+OHLC_SQL = """
+    SELECT
+        time_bucket(to_seconds(?::BIGINT), time) AS time,
+        arg_min(open, time) AS open,
+        max(high) AS high,
+        min(low) AS low,
+        arg_max(close, time) AS close,
+        sum(volume) AS volume
+    FROM bars_1m
+    WHERE symbol = ? AND time >= ? AND time <= ?
+    GROUP BY 1
+    ORDER BY 1
+"""
+
+def pick_bucket(start: datetime, end: datetime, width_px: int) -> int:
+    """Smallest bucket (seconds) that keeps the candle count within width_px / PX_PER_CANDLE."""
+    max_candles = max(1, width_px // PX_PER_CANDLE)
+    span = (end - start).total_seconds()
+    for bucket in BUCKETS:
+        if span / bucket <= max_candles:
+            return bucket
+    return BUCKETS[-1]
+
+def lttb(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n points that keep the visual shape of (x, y).
+    First and last points are always kept; x must be sorted (numeric).
+    """
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # n - 2 buckets between the fixed endpoints
+    edges = np.linspace(1, size - 1, n - 1).astype(int)
+    out = np.empty(n, dtype=int)
+    out[0], out[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point) is the third vertex
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else size
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+def ohlc(conn, symbol: str, start: datetime, end: datetime, width_px: int) -> Tuple[pd.DataFrame, int]:
+    """(bucketed candles oldest first, bucket seconds)."""
+    bucket = pick_bucket(start, end, width_px)
+    return conn.execute(OHLC_SQL, [bucket, symbol, start, end]).df(), bucket
+
+def indicator(conn, symbol: str, column: str, start: datetime, end: datetime, n_points: int) -> pd.DataFrame:
+    """strategy_state[column] over the range, LTTB-downsampled to at most n_points rows."""
+    df = conn.execute(
+        f"SELECT timestamp, {column} FROM strategy_state "
+        f"WHERE symbol = ? AND timestamp >= ? AND timestamp <= ? AND {column} IS NOT NULL ORDER BY timestamp",
+        [symbol, start, end]
+    ).df()
+    if len(df) <= n_points:
+        return df
+    x = df['timestamp'].values.astype('datetime64[ns]').view('i8')
+    return df.iloc[lttb(x, df[column].to_numpy(), n_points)].reset_index(drop=True)
+
+def latest_time(conn, symbol: str) -> Optional[datetime]:
+    row = conn.execute("SELECT max(time) FROM bars_1m WHERE symbol = ?", [symbol]).fetchone()
+    return row[0] if row else None
+
+def chart_range(conn, symbol: str, days: float, width_px: int) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """(candles, ema20 line, bucket seconds) for the `days` up to the symbol's latest bar."""
+    end = latest_time(conn, symbol)
+    if end is None:
+        return pd.DataFrame(), pd.DataFrame(), BUCKETS[0]
+    start = end - timedelta(days=days)
+    bars, bucket = ohlc(conn, symbol, start, end, width_px)
+    ema = indicator(conn, symbol, 'ema20', start, end, max(3, width_px // 2))
+    return bars, ema, bucket
@@ -0,0 +1,231 @@
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+from dashboard import charts
+
+# Incremental dashboard data layer.
+# Each frame keeps its last `limit` rows plus a watermark (newest timestamp seen); a refresh only
+# asks DuckDB for rows at/after the watermark and merges them, so the per-refresh load follows the
+# amount of new data instead of the window size. All frames refresh on one short-lived read-only
+# connection, and one DashboardData instance is shared by every Streamlit session (st.cache_resource).
+# With the bot's live feed connected (see src/events/feed.py) bars / state / signals / fills arrive
+# pushed and are merged in memory; the DB is only read for frames the feed doesn't carry
+# (orders, higher timeframes) when a feed message says they changed, plus a periodic resync.
+
+FEED_RESYNC_SECONDS = 60.0
+
+def _state_row(data: dict) -> dict:
+    # Strategy state_log -> strategy_state columns (see DuckDBStore.insert_strategy_state)
+    return {
+        'timestamp': data.get('timestamp'),
+        'orb_high': data.get('orb_high'),
+        'orb_low': data.get('orb_low'),
+        'ema20': data.get('ema20'),
+        'atr14': data.get('atr14'),
+        'current_state': data.get('status'),
+        'active_signal_id': data.get('signal_id'),
+        'active_window': data.get('active_window'),
+        'symbol': data.get('symbol'),
+    }
+
+def _signal_row(data: dict) -> dict:
+    # Same mapping as DuckDBStore.insert_signal
+    return {
+        'signal_id': data.get('signal_id'),
+        'timestamp': data.get('timestamp'),
+        'symbol': data.get('symbol'),
+        'direction': data.get('base_signal'),
+        'strategy_name': 'ORB',
+        'entry_price': data.get('entry_price'),
+        'stop_loss': data.get('stop_points'),
+        'take_profit': data.get('take_points'),
+        'ai_decision': data.get('ai_decision'),
+        'ai_rationale': data.get('ai_rationale'),
+        'raw_json': data.get('raw_json'),
+    }
+
+class IncrementalFrame:
+    """
+    Last `limit` rows of `table` (matching `where`), ordered by `time_col`.
+    Rows at exactly the watermark are re-read and de-duplicated on `key`,
+    so rows written later with the same timestamp are not missed.
+    """
+    def __init__(self, table: str, time_col: str, columns: str = "*", where: str = "", params: list = None,
+                 limit: int = 1000, key: List[str] = None):
+        self.table = table
+        self.time_col = time_col
+        self.columns = columns
+        self.where = where
+        self.params = list(params or [])
+        self.limit = limit
+        self.key = key
+        self.frame: Optional[pd.DataFrame] = None
+        self.watermark = None
+        self.rows_fetched = 0
+        self.dirty = True # needs a DB refresh
+
+    def _select(self, extra: str = "") -> str:
+        conditions = [c for c in (self.where, extra) if c]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return f"SELECT {self.columns} FROM {self.table} {where}"
+
+    def refresh(self, conn) -> pd.DataFrame:
+        if self.frame is None or self.watermark is None:
+            new = conn.execute(
+                f"{self._select()} ORDER BY {self.time_col} DESC LIMIT {self.limit}", self.params
+            ).df()
+            new = new.iloc[::-1].reset_index(drop=True)
+            merged = new
+        else:
+            new = conn.execute(
+                f"{self._select(f'{self.time_col} >= ?')} ORDER BY {self.time_col}", self.params + [self.watermark]
+            ).df()
+            self.dirty = False
+            if new.empty:
+                return self.frame
+            merged = self._merge(new)
+
+        self.rows_fetched += len(new)
+        self.dirty = False
+        self._set(merged)
+        return self.frame
+
+    def _merge(self, new: pd.DataFrame) -> pd.DataFrame:
+        merged = pd.concat([self.frame, new], ignore_index=True)
+        merged = merged.drop_duplicates(subset=self.key, keep='last')
+        return merged.sort_values(self.time_col, kind='stable').tail(self.limit).reset_index(drop=True)
+
+    def _set(self, frame: pd.DataFrame):
+        self.frame = frame
+        if not frame.empty:
+            self.watermark = frame[self.time_col].iloc[-1]
+
+    def append(self, rows: List[dict]):
+        """Merges pushed rows (feed) without touching the DB. Ignored until the first DB load."""
+        if self.frame is None or not rows:
+            return
+        new = pd.DataFrame(rows).reindex(columns=self.frame.columns)
+        new[self.time_col] = pd.to_datetime(new[self.time_col])
+        if self.frame.empty:
+            self._set(new.sort_values(self.time_col).tail(self.limit).reset_index(drop=True))
+        else:
+            self._set(self._merge(new.astype(self.frame.dtypes.to_dict(), errors='ignore')))
+
+class DashboardData:
+    """Per-(symbol, timeframe) incremental frames behind one lock, refreshed on one connection."""
+    def __init__(self, db_path: Path, bars_limit: int = 1000, table_limit: int = 50):
+        self.db_path = str(db_path)
+        self.bars_limit = bars_limit
+        self.table_limit = table_limit
+        self.frames: Dict[Tuple, IncrementalFrame] = {}
+        self._lock = threading.Lock()
+        self.refreshes = 0
+        self.db_reads = 0
+        self.feed_seq = 0
+        self.feed_rows = 0
+        self._last_sync = 0.0
+
+    def _frame(self, name: str, *args, **kwargs) -> IncrementalFrame:
+        key = (name,) + tuple(kwargs.get('params') or [])
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = IncrementalFrame(*args, **kwargs)
+            self.frames[key] = frame
+        return frame
+
+    def _connect(self, retries: int = 5):
+        for i in range(retries):
+            try:
+                return duckdb.connect(self.db_path, read_only=True)
+            except duckdb.IOException:
+                # Bot holds the write lock; back off briefly
+                if i == retries - 1:
+                    raise
+                time.sleep(0.1 * (i + 1))
+
+    def symbols(self) -> List[str]:
+        with self._lock, self._connect() as conn:
+            return [r[0] for r in conn.execute("SELECT DISTINCT symbol FROM bars_1m ORDER BY symbol").fetchall()]
+
+    def chart(self, symbol: str, days: float, width_px: int):
+        """Long-range (candles, ema20, bucket seconds), aggregated in DuckDB (see dashboard/charts.py)."""
+        with self._lock, self._connect() as conn:
+            return charts.chart_range(conn, symbol, days, width_px)
+
+    def apply_feed(self, messages: List[dict]):
+        """Routes feed messages into the frames they belong to (call with the lock held)."""
+        rows = {}
+        for msg in messages:
+            kind, symbol, data = msg.get('type'), msg.get('symbol'), msg.get('data') or {}
+            if kind == 'bar':
+                rows.setdefault(("bars_1m", symbol), []).append(data)
+                # Higher timeframes are rolled up by the bot; re-read them incrementally
+                for key, frame in self.frames.items():
+                    if key[0].startswith("bars_") and key[0] != "bars_1m" and key[1:] == (symbol,):
+                        frame.dirty = True
+            elif kind == 'state':
+                rows.setdefault(("strategy_state", symbol), []).append(_state_row(data))
+            elif kind == 'signal':
+                rows.setdefault(("signals", symbol), []).append(_signal_row(data))
+                if ("orders",) in self.frames:
+                    self.frames[("orders",)].dirty = True # a signal that got here was just executed
+            elif kind == 'fill':
+                rows.setdefault(("fills",), []).append(data)
+                if ("orders",) in self.frames:
+                    self.frames[("orders",)].dirty = True
+        for key, frame_rows in rows.items():
+            frame = self.frames.get(key)
+            if frame is not None:
+                frame.append(frame_rows)
+                self.feed_rows += len(frame_rows)
+
+    def load(self, symbol: str, minutes: int = 1, feed=None):
+        """
+        (bars, signals, state, state_hist, fills, orders) like the old per-query loader:
+        bars / state_hist oldest first, signals / fills / orders newest first, state = latest row.
+        feed: a connected FeedClient -> only dirty frames hit the DB (plus a resync every FEED_RESYNC_SECONDS).
+        """
+        specs = [
+            self._frame(f"bars_{minutes}m", f"bars_{minutes}m", "time", where="symbol = ?", params=[symbol],
+                        limit=self.bars_limit, key=['time']),
+            self._frame("signals", "signals", "timestamp", where="symbol = ?", params=[symbol],
+                        limit=self.table_limit, key=['signal_id', 'timestamp']),
+            self._frame("strategy_state", "strategy_state", "timestamp", where="symbol = ?", params=[symbol],
+                        limit=self.bars_limit, key=['timestamp']),
+            self._frame("fills", "fills", "time", limit=self.table_limit, key=['exec_id']),
+            self._frame("orders", "orders", "created_at", limit=self.table_limit),
+        ]
+        with self._lock:
+            now = time.monotonic()
+            live = feed is not None and feed.connected and now - self._last_sync < FEED_RESYNC_SECONDS
+            if feed is not None:
+                self.feed_seq, messages = feed.since(self.feed_seq)
+                self.apply_feed(messages)
+
+            stale = specs if not live else [f for f in specs if f.dirty or f.frame is None]
+            if stale:
+                with self._connect() as conn:
+                    for f in stale:
+                        f.refresh(conn)
+                self.db_reads += 1
+                if len(stale) == len(specs):
+                    self._last_sync = now
+            self.refreshes += 1
+            bars, signals, state_hist, fills, orders = [f.frame for f in specs]
+
+        state = state_hist.iloc[::-1].head(1)
+        newest_first = lambda df: df.iloc[::-1].reset_index(drop=True)
+        return bars, newest_first(signals), state, state_hist, newest_first(fills), newest_first(orders)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'refreshes': self.refreshes,
+            'db_reads': self.db_reads,
+            'rows_fetched': sum(f.rows_fetched for f in self.frames.values()),
+            'feed_rows': self.feed_rows,
+        }
@@ -0,0 +1,109 @@
+import json
+import os
+import threading
+from collections import deque
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+# Log readers for the dashboard. Neither ever reads a whole file:
+# LogTail seeks back from the end once, then only reads what was appended since the last call;
+# search() opens only the structured files of the requested levels / days (see src/utils.JsonLinesHandler).
+
+class LogTail:
+    """Last n lines of a growing (and rotated) text log, remembering the read offset between calls."""
+    BLOCK = 8192
+
+    def __init__(self, path: Path, n: int = 20):
+        self.path = Path(path)
+        self.n = n
+        self.lines = deque(maxlen=n)
+        self.offset = 0
+        self.inode = None
+        self.bytes_read = 0
+        self._partial = b""
+        self._lock = threading.Lock()
+
+    def _seek_tail(self, f, size: int) -> int:
+        # Read blocks backwards until n complete lines are in hand
+        pos, chunk = size, b""
+        while pos > 0 and chunk.count(b"\n") <= self.n:
+            step = min(self.BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            chunk = f.read(step) + chunk
+        self.bytes_read += len(chunk)
+        if pos > 0:
+            chunk = chunk.split(b"\n", 1)[1] # first line is cut
+        self._consume(chunk)
+        return size
+
+    def _consume(self, data: bytes):
+        data = self._partial + data
+        *complete, self._partial = data.split(b"\n")
+        for line in complete:
+            self.lines.append(line.decode(errors='replace'))
+
+    def read(self) -> List[str]:
+        with self._lock:
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                return list(self.lines)
+            rotated = self.inode is not None and (st.st_ino != self.inode or st.st_size < self.offset)
+            with open(self.path, 'rb') as f:
+                if self.inode is None:
+                    self.offset = self._seek_tail(f, st.st_size)
+                elif rotated:
+                    # Fresh file after rotation: its content is new, read it from the start
+                    self._partial = b""
+                    f.seek(0)
+                    data = f.read(st.st_size)
+                    self.bytes_read += len(data)
+                    self._consume(data)
+                    self.offset = st.st_size
+                elif st.st_size > self.offset:
+                    f.seek(self.offset)
+                    data = f.read(st.st_size - self.offset)
+                    self.bytes_read += len(data)
+                    self._consume(data)
+                    self.offset = st.st_size
+            self.inode = st.st_ino
+            return list(self.lines)
+
+def search(root: Path, levels: Sequence[str] = ("ERROR", "CRITICAL"), days: int = 7,
+           component: Optional[str] = None, text: Optional[str] = None, limit: int = 200,
+           today: Optional[date] = None) -> List[Dict]:
+    """
+    Structured records of the given levels from the last `days` days, newest first.
+    Only <day>/<LEVEL>.jsonl files are opened; component / text filter within them.
+    """
+    root = Path(root)
+    today = today or date.today()
+    out = []
+    for d in range(days):
+        folder = root / (today - timedelta(days=d)).isoformat()
+        if not folder.is_dir():
+            continue
+        day_rows = []
+        for level in levels:
+            path = folder / f"{level}.jsonl"
+            if not path.exists():
+                continue
+            with open(path) as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except ValueError:
+                        continue # line being written
+                    if component and row.get('component') != component:
+                        continue
+                    if text and text.lower() not in row.get('msg', '').lower():
+                        continue
+                    day_rows.append(row)
+        day_rows.reverse() # files are chronological; keeps same-millisecond rows newest first
+        day_rows.sort(key=lambda r: r['ts'], reverse=True)
+        out.extend(day_rows)
+        if len(out) >= limit:
+            break
+    return out[:limit]
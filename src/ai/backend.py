@@ -0,0 +1,25 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any
+
+VALID_DECISIONS = ['ALLOW', 'DENY', 'REDUCE_RISK']
+
+class FilterBackend(ABC):
+    """
+    Something that turns a signal context into a verdict for GeminiFilter.
+    evaluate() may block and may raise; the filter handles threads, deadlines, caching and fallbacks.
+    """
+    name = "base"
+    # Remote backends are slow / cost money: their verdicts are cached and prefetched
+    remote = False
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    @abstractmethod
+    def evaluate(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        context: same dict as GeminiFilter.analyze_signal
+        Returns {'decision': 'ALLOW'/'DENY'/'REDUCE_RISK', 'rationale': str, 'confidence': float, 'raw_json': str}
+        """
+        pass
@@ -0,0 +1,133 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+from ..config import AI_CACHE_TTL, AI_CACHE_SIZE, AI_CACHE_ATR_STEP, AI_CACHE_DIST_STEP
+from ..utils import logger
+
+CacheKey = Tuple[str, str, int, int, int, str]
+
+class DecisionCache:
+    """
+    TTL + LRU cache of AI filter verdicts keyed on a quantized signal context:
+    (symbol, direction, ATR bucket, close-EMA bucket, breakout distance from the ORB bucket, session window).
+    Distances are measured in ATRs so the buckets mean the same thing on quiet and busy days.
+
+    Optionally backed by a DuckDBStore (ai_decisions table) so verdicts survive restarts.
+    Thread-safe: filled from the AI worker thread, read on the event loop.
+    """
+    def __init__(self, ttl: float = AI_CACHE_TTL, max_entries: int = AI_CACHE_SIZE,
+                 atr_step: float = AI_CACHE_ATR_STEP, dist_step: float = AI_CACHE_DIST_STEP, store=None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.atr_step = atr_step
+        self.dist_step = dist_step
+        self.store = store
+        self._entries = OrderedDict() # key -> (expires_at epoch seconds, result)
+        self._lock = threading.Lock()
+        
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+
+        if self.store is not None:
+            self._load()
+
+    def key(self, context: Dict[str, Any]) -> CacheKey:
+        md = context.get('market_data', {})
+        direction = context.get('signal')
+        atr = md.get('atr14') or 0.0
+        unit = atr if atr > 0 else 1.0
+        ema_dist = (md.get('close', 0.0) - md.get('ema20', 0.0)) / unit
+        # Distance beyond the level being broken
+        orb_dist = (md.get('dist_orb_high') if direction == 'BUY' else md.get('dist_orb_low')) or 0.0
+        return (
+            str(context.get('symbol')),
+            direction,
+            math.floor(atr / self.atr_step),
+            math.floor(ema_dist / self.dist_step),
+            math.floor(orb_dist / unit / self.dist_step),
+            str(context.get('window')),
+        )
+
+    @staticmethod
+    def _key_str(key: CacheKey) -> str:
+        return "|".join(str(k) for k in key)
+
+    @staticmethod
+    def _parse_key(s: str) -> CacheKey:
+        symbol, direction, atr, ema, orb, window = s.split("|", 5)
+        return (symbol, direction, int(atr), int(ema), int(orb), window)
+
+    def get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def contains(self, key: CacheKey) -> bool:
+        """Unexpired entry for key (no metrics / LRU update)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > time.time()
+
+    def put(self, key: CacheKey, result: Dict[str, Any], persist: bool = True):
+        now = time.time()
+        with self._lock:
+            self._insert(key, result, now + self.ttl)
+        if persist and self.store is not None:
+            self.store.insert_ai_decision(self._key_str(key), result, datetime.fromtimestamp(now))
+
+    def _insert(self, key: CacheKey, result: Dict[str, Any], expires_at: float):
+        self._entries[key] = (expires_at, dict(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self):
+        try:
+            since = datetime.fromtimestamp(time.time() - self.ttl)
+            df = self.store.get_ai_decisions(since)
+        except Exception as e:
+            logger.warning(f"Could not load AI decision cache: {e}")
+            return
+        with self._lock:
+            for row in df.itertuples(index=False):
+                try:
+                    key = self._parse_key(row.cache_key)
+                except ValueError:
+                    continue # key layout from an older version
+                result = {
+                    'decision': row.decision,
+                    'rationale': row.rationale,
+                    'confidence': row.confidence,
+                    'raw_json': row.raw_json,
+                }
+                self._insert(key, result, row.created_at.timestamp() + self.ttl)
+        logger.info(f"AI decision cache: loaded {len(df)} entries")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+            }
@@ -1,85 +1,61 @@
 import os
 import json
-import datetime
+import asyncio
 from google import genai
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
-from ..config import GEMINI_API_KEY
+from ..config import (
+    GEMINI_API_KEY, AI_DEADLINE_SECONDS, AI_TIMEOUT_DECISION, AI_BACKEND, AI_LOCAL_FALLBACK
+)
 from ..utils import logger
+from .backend import FilterBackend, VALID_DECISIONS
+from .decision_cache import DecisionCache
+from .local_model import LocalScoreBackend
 
-class GeminiFilter:
-    def __init__(self):
-        self.api_key = GEMINI_API_KEY
-        self.enabled = bool(self.api_key)
-        self.last_call_time = None
+class GeminiBackend(FilterBackend):
+    name = "gemini"
+    remote = True
+
+    def __init__(self, api_key: str = GEMINI_API_KEY, timeout: float = AI_DEADLINE_SECONDS + 1.0):
+        self.api_key = api_key
         self.client = None
         self.model_name = "gemini-1.5-flash"
         
-        if self.enabled:
-            # New SDK initialization
-            self.client = genai.Client(api_key=self.api_key)
-
-    def analyze_signal(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        context: {
-            'time': str,
-            'signal': 'BUY'/'SELL',
-            'market_data': { ... recent bars stats ... },
-            'risk_state': { ... },
-            'pnl': float
-        }
-        """
-        default_response = {
-            "decision": "ALLOW", 
-            "rationale": "AI Disabled or Failed", 
-            "confidence": 0.0,
-            "raw_json": ""
-        }
-
-        if not self.enabled:
-            return default_response
-
-        # Rate warning / check
-        if self.last_call_time:
-            elapsed = (datetime.datetime.now() - self.last_call_time).total_seconds()
-            if elapsed < 300: # 5 min
-                logger.info("Skipping AI call (cooldown)")
-                return {**default_response, "rationale": "AI Cooldown"}
-
-        try:
-            self.last_call_time = datetime.datetime.now()
-            
-            prompt = self._construct_prompt(context)
-            
-            # New SDK call
-            response = self.client.models.generate_content(
-                model=self.model_name,
-                contents=prompt,
-                config={
-                    'temperature': 0.2,
-                    'max_output_tokens': 500,
-                    'response_mime_type': 'application/json'
-                }
+        if self.api_key:
+            # New SDK initialization.
+            # HTTP timeout (ms) a bit past the deadline so abandoned calls don't hold a worker thread for long
+            self.client = genai.Client(
+                api_key=self.api_key,
+                http_options={'timeout': int(timeout * 1000)}
             )
-            
-            # Response handling might differ slightly, usually response.text
-            result_text = response.text
-            result_json = json.loads(result_text)
-            result_json['raw_json'] = result_text
-            
-            # validate fields
-            if result_json.get('decision') not in ['ALLOW', 'DENY', 'REDUCE_RISK']:
-                result_json['decision'] = 'ALLOW'
-                
-            return result_json
 
-        except Exception as e:
-            logger.error(f"AI Call Failed: {e}")
-            return default_response
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    def evaluate(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        prompt = self._construct_prompt(context)
+        
+        # New SDK call
+        response = self.client.models.generate_content(
+            model=self.model_name,
+            contents=prompt,
+            config={
+                'temperature': 0.2,
+                'max_output_tokens': 500,
+                'response_mime_type': 'application/json'
+            }
+        )
+        
+        # Response handling might differ slightly, usually response.text
+        result_text = response.text
+        result_json = json.loads(result_text)
+        result_json['raw_json'] = result_text
+        return result_json
 
     def _construct_prompt(self, context: Dict[str, Any]) -> str:
         return f"""
-        You are a cautious Risk Manager for a Futures Trading Bot (MES).
+        You are a cautious Risk Manager for a Trading Bot ({context.get('symbol')}).
         
         Current State:
         Time: {context.get('time')}
@@ -103,3 +79,186 @@ class GeminiFilter:
             "confidence": 0.0 to 1.0
         }}
         """
+
+def make_backend(name: str, deadline: float = AI_DEADLINE_SECONDS) -> FilterBackend:
+    if name == "local":
+        return LocalScoreBackend()
+    if name == "gemini":
+        return GeminiBackend(timeout=deadline + 1.0)
+    raise ValueError(f"Unknown AI backend: {name}")
+
+class GeminiFilter:
+    """
+    Signal filter in front of a FilterBackend (Gemini by default, see AI_BACKEND).
+    Handles what the backends don't: worker threads + deadline, decision cache and
+    prefetch for remote backends, and the local model as fallback on timeout / failure.
+    """
+    def __init__(self, deadline: float = AI_DEADLINE_SECONDS, timeout_decision: str = AI_TIMEOUT_DECISION,
+                 cache: DecisionCache = None, backend: FilterBackend = None, fallback: FilterBackend = None):
+        self.deadline = deadline
+        self.timeout_decision = timeout_decision if timeout_decision in VALID_DECISIONS else 'ALLOW'
+        self.backend = backend or make_backend(AI_BACKEND, deadline)
+        if fallback is None and AI_LOCAL_FALLBACK and self.backend.name != "local":
+            fallback = LocalScoreBackend()
+        self.fallback = fallback if fallback is not None and fallback.available else None
+        
+        # No API key: the local model stands in for the remote one
+        if not self.backend.available and self.fallback:
+            logger.info(f"AI backend {self.backend.name} unavailable, using {self.fallback.name}")
+            self.backend, self.fallback = self.fallback, None
+        self.enabled = self.backend.available
+        
+        # Verdicts for near-identical contexts are reused instead of calling the model again
+        self.cache = cache if cache is not None else DecisionCache()
+        # Background evaluations started as price approaches an ORB level: cache key -> Future
+        self._prefetching = {}
+        self.prefetches = 0
+        self.prefetch_hits = 0
+
+    @staticmethod
+    def _default_response(rationale: str = "AI Disabled or Failed") -> Dict[str, Any]:
+        return {
+            "decision": "ALLOW", 
+            "rationale": rationale, 
+            "confidence": 0.0,
+            "raw_json": ""
+        }
+
+    def _fallback_response(self, context: Dict[str, Any], reason: str, default: Dict[str, Any]) -> Dict[str, Any]:
+        if self.fallback:
+            try:
+                result = self._validate(self.fallback.evaluate(context))
+                result['rationale'] = f"{result['rationale']} ({reason}, {self.fallback.name} fallback)"
+                return result
+            except Exception as e:
+                logger.error(f"AI fallback {self.fallback.name} failed: {e}")
+        return default
+
+    @staticmethod
+    def _validate(result: Dict[str, Any]) -> Dict[str, Any]:
+        # validate fields
+        if result.get('decision') not in VALID_DECISIONS:
+            result['decision'] = 'ALLOW'
+        result.setdefault('rationale', '')
+        return result
+
+    def _precheck(self, context: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Response to use without a remote call (disabled / local backend / cached verdict), else None."""
+        if not self.enabled:
+            return self._default_response()
+
+        if not self.backend.remote:
+            # Sub-millisecond, run inline
+            return self._request(context)
+
+        cached = self.cache.get(self.cache.key(context))
+        if cached:
+            logger.info(f"AI decision from cache: {cached['decision']}")
+            cached['cached'] = True
+            return cached
+        return None
+
+    async def analyze_signal_async(self, context: Dict[str, Any], deadline: float = None) -> Dict[str, Any]:
+        """
+        Same as analyze_signal, but the model call runs in a worker thread so the event loop
+        (bars, fills, order status) keeps going. Cache hits return immediately, prefetched
+        contexts wait for the call already in flight. Past `deadline` seconds the call is
+        abandoned and the local fallback (or the configured timeout decision) is used.
+        """
+        skip = self._precheck(context)
+        if skip:
+            return skip
+
+        deadline = deadline or self.deadline
+        key = self.cache.key(context)
+        try:
+            # Already being evaluated since price approached the level: take it over
+            # (so a later prefetch() can't drop it) and wait for it instead of a new call
+            pending = self._prefetching.pop(key, None)
+            if pending:
+                self.prefetch_hits += 1
+                result = self._validate(await asyncio.wait_for(pending, timeout=deadline))
+                self.cache.put(key, result)
+                logger.info(f"AI decision from prefetch: {result['decision']}")
+                return dict(result)
+            return await asyncio.wait_for(asyncio.to_thread(self._request, context), timeout=deadline)
+        except asyncio.TimeoutError:
+            logger.warning(f"AI call exceeded {deadline:.1f}s deadline")
+            timeout_response = {**self._default_response("AI Timeout"), "decision": self.timeout_decision}
+            return self._fallback_response(context, "AI Timeout", timeout_response)
+        except Exception as e:
+            # Failed prefetch
+            logger.error(f"AI Call Failed: {e}")
+            return self._fallback_response(context, "AI Failed", self._default_response())
+
+    def analyze_signal(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        context: {
+            'time': str,
+            'symbol': str,
+            'signal': 'BUY'/'SELL',
+            'window': str,
+            'market_data': { ... recent bars stats ... },
+            'risk_state': { ... },
+            'pnl': float
+        }
+        """
+        skip = self._precheck(context)
+        if skip:
+            return skip
+        return self._request(context)
+
+    def _request(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        # Blocking backend call; runs in a worker thread for analyze_signal_async
+        try:
+            result_json = self._validate(self.backend.evaluate(context))
+            if self.backend.remote:
+                # Cached even if the caller's deadline already passed, the next similar signal gets it
+                self.cache.put(self.cache.key(context), result_json)
+            return result_json
+
+        except Exception as e:
+            logger.error(f"AI Call Failed: {e}")
+            return self._fallback_response(context, "AI Failed", self._default_response())
+
+    def prefetch(self, contexts: List[Dict[str, Any]], symbol: str = None):
+        """
+        Starts background evaluations of likely signal contexts (see ORBStrategy._prefetch).
+        Prefetches of `symbol` whose key is not in `contexts` anymore are dropped: price moved away,
+        so their verdict would be for a stale context. Other symbols' prefetches are left alone
+        (one filter is shared by every strategy). Needs a running event loop.
+        Only for remote backends, local ones answer inline anyway.
+        """
+        keys = {self.cache.key(c): c for c in contexts} if self.enabled and self.backend.remote else {}
+        if symbol is None and contexts:
+            symbol = contexts[0].get('symbol')
+        for key in list(self._prefetching):
+            if key[0] == str(symbol) and key not in keys:
+                self._prefetching.pop(key).cancel()
+        if not keys:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+
+        for key, context in keys.items():
+            if key in self._prefetching or self.cache.contains(key):
+                continue
+            future = loop.run_in_executor(None, self.backend.evaluate, context)
+            future.add_done_callback(lambda f, key=key: self._on_prefetch_done(key, f))
+            self._prefetching[key] = future
+            self.prefetches += 1
+            logger.debug(f"AI prefetch started for {key}")
+
+    def _on_prefetch_done(self, key, future):
+        # Runs on the loop. Dropped (cancelled / replaced) prefetches are discarded.
+        if self._prefetching.get(key) is not future:
+            return
+        del self._prefetching[key]
+        if future.cancelled():
+            return
+        if future.exception():
+            logger.warning(f"AI prefetch failed: {future.exception()}")
+            return
+        self.cache.put(key, self._validate(future.result()))
@@ -0,0 +1,192 @@
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from ..config import DATA_DIR, AI_LOCAL_MODEL_PATH
+from ..utils import logger
+from .backend import FilterBackend
+
+# Deterministic logistic score over the same market_data the remote filter sees.
+# Trained offline (python -m src.ai.local_model) from stored signals / strategy_state / fills.
+
+FEATURES = ['atr', 'ema_dist', 'orb_dist']
+
+def features(direction, close, ema20, atr14, orb_high, orb_low) -> np.ndarray:
+    """
+    Feature matrix (n, len(FEATURES)); works on scalars or arrays.
+    direction: +1 long / -1 short. Distances are signed in the trade direction and in ATRs.
+    """
+    direction = np.atleast_1d(np.asarray(direction, dtype=float))
+    close = np.atleast_1d(np.asarray(close, dtype=float))
+    atr = np.atleast_1d(np.asarray(atr14, dtype=float))
+    unit = np.where(atr > 0, atr, 1.0)
+    ema_dist = direction * (close - np.asarray(ema20, dtype=float)) / unit
+    orb_dist = np.where(direction > 0, close - np.asarray(orb_high, dtype=float),
+                        np.asarray(orb_low, dtype=float) - close) / unit
+    return np.column_stack([atr, ema_dist, orb_dist])
+
+def context_features(context: Dict[str, Any]) -> np.ndarray:
+    md = context.get('market_data', {})
+    close = md['close']
+    return features(
+        1 if context.get('signal') == 'BUY' else -1,
+        close, md['ema20'], md['atr14'],
+        close - md['dist_orb_high'], close + md['dist_orb_low']
+    )
+
+class LocalScoreBackend(FilterBackend):
+    """
+    Logistic model: p(win) = sigmoid(w . standardized(features) + b).
+    p >= allow_threshold -> ALLOW, p >= deny_threshold -> REDUCE_RISK, else DENY.
+    Unavailable (filter uses its default) until a model file has been trained.
+    """
+    name = "local"
+
+    def __init__(self, path: Path = AI_LOCAL_MODEL_PATH, model: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.model = model if model is not None else self._load()
+
+    def _load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        try:
+            model = json.loads(self.path.read_text())
+            if model.get('features') != FEATURES:
+                logger.warning(f"Local filter model {self.path.name} has features {model.get('features')}, retrain")
+                return None
+            return model
+        except Exception as e:
+            logger.warning(f"Could not load local filter model {self.path}: {e}")
+            return None
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def score(self, X: np.ndarray) -> np.ndarray:
+        m = self.model
+        z = (X - np.array(m['mean'])) / np.array(m['std'])
+        return 1.0 / (1.0 + np.exp(-(z @ np.array(m['weights']) + m['bias'])))
+
+    def decide(self, p: np.ndarray) -> np.ndarray:
+        return np.where(p >= self.model['allow_threshold'], 'ALLOW',
+                        np.where(p >= self.model['deny_threshold'], 'REDUCE_RISK', 'DENY'))
+
+    def evaluate(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        p = self.score(context_features(context))
+        decision = str(self.decide(p)[0])
+        return {
+            'decision': decision,
+            'rationale': f"Local score p(win)={p[0]:.2f}",
+            'confidence': float(p[0]),
+            'raw_json': ""
+        }
+
+# --- Training ---
+
+def fit_logistic(X: np.ndarray, y: np.ndarray, l2: float = 1.0, iterations: int = 2000, lr: float = 0.1) -> Dict[str, Any]:
+    """Plain gradient descent on standardized features (deterministic, no extra dependencies)."""
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    Z = (X - mean) / std
+    n = len(y)
+    w = np.zeros(Z.shape[1])
+    b = 0.0
+    for _ in range(iterations):
+        p = 1.0 / (1.0 + np.exp(-(Z @ w + b)))
+        w -= lr * (Z.T @ (p - y) / n + l2 * w / n)
+        b -= lr * float((p - y).mean())
+    return {'features': FEATURES, 'mean': mean.tolist(), 'std': std.tolist(), 'weights': w.tolist(), 'bias': b}
+
+def _trades(fills: pd.DataFrame) -> pd.DataFrame:
+    """Round trips per symbol from fills (flat -> position -> flat): entry_time, symbol, direction, pnl_points."""
+    rows = []
+    pos = {}
+    entries = {}
+    for f in fills.itertuples(index=False):
+        qty = f.shares if f.side == 'BOT' else -f.shares
+        if pos.get(f.symbol, 0) == 0:
+            entries[f.symbol] = f
+        pos[f.symbol] = pos.get(f.symbol, 0) + qty
+        entry = entries.get(f.symbol)
+        if pos[f.symbol] == 0 and entry is not None:
+            direction = 1 if entry.side == 'BOT' else -1
+            rows.append({'entry_time': entry.time, 'symbol': f.symbol, 'direction': direction,
+                         'pnl_points': direction * (f.price - entry.price)})
+            entries[f.symbol] = None
+    return pd.DataFrame(rows, columns=['entry_time', 'symbol', 'direction', 'pnl_points'])
+
+def load_training_data(db_path=None, match_minutes: int = 5) -> pd.DataFrame:
+    """
+    Signals joined with the strategy state of their bar (ema/atr/orb) and labelled with the
+    outcome of the trade entered within match_minutes after the signal (win = pnl > 0).
+    Signals that never traded (risk checks, denied) are dropped.
+    """
+    db_path = str(db_path or DATA_DIR / "db" / "trading.duckdb")
+    with duckdb.connect(db_path, read_only=True) as conn:
+        signals = conn.execute("""
+            SELECT s.timestamp, s.symbol, s.direction, s.entry_price, st.ema20, st.atr14, st.orb_high, st.orb_low
+            FROM signals s
+            ASOF JOIN strategy_state st ON s.symbol = st.symbol AND s.timestamp >= st.timestamp
+            ORDER BY s.timestamp
+        """).df()
+        fills = conn.execute("SELECT time, symbol, side, shares, price FROM fills ORDER BY time").df()
+
+    signals['direction'] = np.where(signals['direction'] == 'BUY', 1, -1)
+    trades = _trades(fills)
+    if signals.empty or trades.empty:
+        return pd.DataFrame()
+    signals['timestamp'] = pd.to_datetime(signals['timestamp']).astype('datetime64[ns]')
+    # Both naive market wall-clock (insert_signal / insert_fill), so they join directly
+    trades['entry_time'] = pd.to_datetime(trades['entry_time']).astype('datetime64[ns]')
+    trades['direction'] = trades['direction'].astype(signals['direction'].dtype)
+    signals['symbol'] = signals['symbol'].astype(object)
+    trades['symbol'] = trades['symbol'].astype(object)
+
+    data = pd.merge_asof(
+        signals, trades.sort_values('entry_time'), left_on='timestamp', right_on='entry_time', by=['symbol', 'direction'],
+        direction='forward', tolerance=pd.Timedelta(minutes=match_minutes)
+    ).dropna(subset=['pnl_points', 'ema20', 'atr14', 'orb_high', 'orb_low'])
+    data['win'] = (data['pnl_points'] > 0).astype(float)
+    return data
+
+def train(db_path=None, out_path: Path = AI_LOCAL_MODEL_PATH, allow_threshold: float = 0.5,
+          deny_threshold: float = 0.35, min_samples: int = 20) -> Optional[Dict[str, Any]]:
+    data = load_training_data(db_path)
+    if len(data) < min_samples:
+        logger.warning(f"Only {len(data)} labelled signals, need {min_samples} to train the local filter")
+        return None
+
+    X = features(data['direction'], data['entry_price'], data['ema20'], data['atr14'], data['orb_high'], data['orb_low'])
+    model = fit_logistic(X, data['win'].to_numpy())
+    model.update({
+        'allow_threshold': allow_threshold,
+        'deny_threshold': deny_threshold,
+        'samples': len(data),
+        'win_rate': float(data['win'].mean()),
+        'trained_at': datetime.now().isoformat(),
+    })
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(model, indent=2))
+    logger.info(f"Local filter trained on {len(data)} signals -> {out_path}")
+    return model
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the local AI filter model from stored signals/fills")
+    parser.add_argument("--db")
+    parser.add_argument("--out", default=str(AI_LOCAL_MODEL_PATH))
+    parser.add_argument("--allow-threshold", type=float, default=0.5)
+    parser.add_argument("--deny-threshold", type=float, default=0.35)
+    parser.add_argument("--min-samples", type=int, default=20)
+    args = parser.parse_args()
+
+    model = train(args.db, args.out, args.allow_threshold, args.deny_threshold, args.min_samples)
+    print(json.dumps(model, indent=2) if model else "Not enough data")
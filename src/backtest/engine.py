@@ -0,0 +1,242 @@
+import argparse
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from ..config import DATA_DIR, MAX_TRADES_DAILY, TRADING_SYMBOL
+from ..market.bars import BAR_DTYPE, NS_PER_MINUTE, NS_PER_DAY
+from ..strategy.indicators import TrueRange
+from ..strategy.orb_strategy import ORBParams
+from ..strategy.session import SessionSchedule, FORMING, TRADING
+from ..ai.local_model import LocalScoreBackend, features
+
+# Vectorized ORB backtest over stored 1-min bars.
+# compute_signals() mirrors ORBStrategy.on_bar/_check_entry bar for bar (see tests/test_backtest_parity.py);
+# simulate() walks the (few) signals and resolves bracket exits with array scans.
+
+TICK = 0.25 # MES tick, same rounding as Executor
+
+def load_bars_db(db_path=None, start=None, end=None, symbol: str = TRADING_SYMBOL) -> np.ndarray:
+    """Bars of one symbol from the bars_1m table as a BAR_DTYPE array (oldest first)."""
+    db_path = str(db_path or DATA_DIR / "db" / "trading.duckdb")
+    where, params = ["symbol = ?"], [symbol]
+    if start is not None:
+        where.append("time >= ?")
+        params.append(start)
+    if end is not None:
+        where.append("time < ?")
+        params.append(end)
+    query = "SELECT time, open, high, low, close, volume FROM bars_1m WHERE " + " AND ".join(where)
+    query += " ORDER BY time"
+
+    with duckdb.connect(db_path, read_only=True) as conn:
+        df = conn.execute(query, params).df()
+    return frame_to_array(df)
+
+def load_bars_parquet(symbol: str = TRADING_SYMBOL, start=None, end=None) -> np.ndarray:
+    """Bars from the Parquet history cache."""
+    from ..market.history_cache import HistoryCache
+    start_ns = pd.Timestamp(start).value if start is not None else 0
+    end_ns = pd.Timestamp(end).value if end is not None else pd.Timestamp.now().value
+    return HistoryCache(symbol).load(start_ns, end_ns)
+
+def frame_to_array(df: pd.DataFrame) -> np.ndarray:
+    arr = np.empty(len(df), dtype=BAR_DTYPE)
+    arr['time'] = df['time'].values.astype('datetime64[ns]').view('i8')
+    for name in ('open', 'high', 'low', 'close', 'volume'):
+        arr[name] = df[name].to_numpy(dtype=float)
+    return arr
+
+def compute_indicators(bars: np.ndarray, params: ORBParams) -> Dict[str, np.ndarray]:
+    """EMA / ATR series, identical to the streaming indicators fed from the first bar."""
+    close = bars['close']
+    ema = pd.Series(close).ewm(span=params.ema_period, adjust=True).mean().to_numpy()
+    tr = TrueRange.compute(bars['high'].astype(float), bars['low'].astype(float), close)
+    if params.atr_method == 'sma':
+        atr = pd.Series(tr).rolling(params.atr_period).mean().to_numpy()
+    else:
+        atr = np.full(len(tr), np.nan)
+        n = params.atr_period
+        if len(tr) >= n:
+            seeded = np.concatenate(([tr[:n].mean()], tr[n:]))
+            atr[n - 1:] = pd.Series(seeded).ewm(alpha=1.0 / n, adjust=False).mean().to_numpy()
+    return {'ema': ema, 'atr': atr}
+
+def compute_signals(bars: np.ndarray, params: ORBParams = None, indicators: Dict[str, np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Entry signals for every bar at once.
+    Returns arrays: index, direction (+1 long / -1 short), entry, stop_points, take_points, orb_high, orb_low.
+    """
+    params = params or ORBParams()
+    n = len(bars)
+    ind = indicators or compute_indicators(bars, params)
+    ema, atr = ind['ema'], ind['atr']
+
+    times = bars['time']
+    days = times // NS_PER_DAY
+    minutes = (times // NS_PER_MINUTE) % 1440
+
+    # Same session schedule as the live strategy
+    schedule = SessionSchedule.from_params(params)
+    window, phase = schedule.classify_array(minutes)
+    in_window = window >= 0
+    warm = np.arange(n) >= params.min_bars - 1
+
+    forming = (phase == FORMING) & warm
+    trading = (phase == TRADING) & warm
+
+    # ORB levels per (day, window): max/min over the forming bars of that group
+    group = np.where(in_window, days * len(schedule.starts) + window, -1)
+    keys, inverse = np.unique(group, return_inverse=True)
+    orb_high = np.full(len(keys), -np.inf)
+    orb_low = np.full(len(keys), np.inf)
+    np.maximum.at(orb_high, inverse[forming], bars['high'][forming])
+    np.minimum.at(orb_low, inverse[forming], bars['low'][forming])
+    has_orb = np.isfinite(orb_high)[inverse]
+    bar_orb_high = np.where(has_orb, orb_high[inverse], np.nan)
+    bar_orb_low = np.where(has_orb, orb_low[inverse], np.nan)
+
+    close = bars['close']
+    with np.errstate(invalid='ignore'):
+        atr_ok = (params.atr_min <= atr) & (atr <= params.atr_max)
+        candidate = trading & has_orb & atr_ok
+        long_ = candidate & (close > bar_orb_high + params.breakout_buffer) & (close > ema)
+        short = candidate & ~long_ & (close < bar_orb_low - params.breakout_buffer) & (close < ema)
+
+    idx = np.flatnonzero(long_ | short)
+    stop = np.maximum(params.min_stop, params.stop_atr_mult * atr[idx])
+    return {
+        'index': idx,
+        'direction': np.where(long_[idx], 1, -1),
+        'entry': close[idx],
+        'stop_points': stop,
+        'take_points': params.tp_mult * stop,
+        'orb_high': bar_orb_high[idx],
+        'orb_low': bar_orb_low[idx],
+    }
+
+@dataclass
+class BacktestResult:
+    trades: pd.DataFrame
+    summary: Dict[str, Any]
+
+def simulate(bars: np.ndarray, signals: Dict[str, np.ndarray], max_trades_daily: int = MAX_TRADES_DAILY,
+             point_value: float = 5.0, commission: float = 0.0) -> BacktestResult:
+    """
+    One position at a time, market entry at the signal bar close with a bracket
+    (SL/TP rounded to the tick like Executor). If SL and TP are both touched in the same bar the
+    stop is assumed first. Positions still open are closed at the last bar of the day.
+    """
+    times = bars['time']
+    days = times // NS_PER_DAY
+    # Index of the last bar of each bar's day
+    day_end = np.searchsorted(days, days, side='right') - 1
+
+    rows = []
+    busy_until = -1
+    trades_today = {}
+    for k, i in enumerate(signals['index']):
+        if i <= busy_until:
+            continue
+        day = days[i]
+        if trades_today.get(day, 0) >= max_trades_daily:
+            continue
+
+        direction = signals['direction'][k]
+        entry = signals['entry'][k]
+        sl = np.round((entry - direction * signals['stop_points'][k]) / TICK) * TICK
+        tp = np.round((entry + direction * signals['take_points'][k]) / TICK) * TICK
+
+        last = day_end[i]
+        high = bars['high'][i + 1:last + 1]
+        low = bars['low'][i + 1:last + 1]
+        if direction > 0:
+            hit_sl, hit_tp = low <= sl, high >= tp
+        else:
+            hit_sl, hit_tp = high >= sl, low <= tp
+        hit = hit_sl | hit_tp
+
+        if hit.any():
+            j = int(np.argmax(hit))
+            exit_idx = i + 1 + j
+            exit_price, reason = (sl, 'SL') if hit_sl[j] else (tp, 'TP')
+        else:
+            exit_idx = last
+            exit_price, reason = bars['close'][last], 'EOD'
+
+        points = direction * (exit_price - entry)
+        rows.append({
+            'entry_time': pd.Timestamp(int(times[i])),
+            'exit_time': pd.Timestamp(int(times[exit_idx])),
+            'direction': 'BUY' if direction > 0 else 'SELL',
+            'entry': entry,
+            'exit': exit_price,
+            'reason': reason,
+            'pnl_points': points,
+            'pnl': points * point_value - commission,
+        })
+        busy_until = exit_idx
+        trades_today[day] = trades_today.get(day, 0) + 1
+
+    trades = pd.DataFrame(rows, columns=[
+        'entry_time', 'exit_time', 'direction', 'entry', 'exit', 'reason', 'pnl_points', 'pnl'
+    ])
+    return BacktestResult(trades, summarize(trades))
+
+def summarize(trades: pd.DataFrame) -> Dict[str, Any]:
+    if trades.empty:
+        return {'trades': 0, 'total_pnl': 0.0, 'win_rate': 0.0, 'avg_pnl': 0.0, 'max_drawdown': 0.0}
+    equity = trades['pnl'].cumsum().to_numpy()
+    drawdown = np.maximum.accumulate(np.concatenate(([0.0], equity)))[1:] - equity
+    return {
+        'trades': len(trades),
+        'total_pnl': float(equity[-1]),
+        'win_rate': float((trades['pnl'] > 0).mean()),
+        'avg_pnl': float(trades['pnl'].mean()),
+        'max_drawdown': float(drawdown.max()),
+    }
+
+def apply_filter(signals: Dict[str, np.ndarray], indicators: Dict[str, np.ndarray], backend) -> Dict[str, np.ndarray]:
+    """Drops the signals a LocalScoreBackend would DENY, all scored in one vectorized pass."""
+    if len(signals['index']) == 0:
+        return signals
+    idx = signals['index']
+    X = features(signals['direction'], signals['entry'], indicators['ema'][idx], indicators['atr'][idx],
+                 signals['orb_high'], signals['orb_low'])
+    keep = backend.decide(backend.score(X)) != 'DENY'
+    return {k: v[keep] for k, v in signals.items()}
+
+def run_backtest(bars: np.ndarray, params: ORBParams = None, filter_backend=None, **sim_kwargs) -> BacktestResult:
+    params = params or ORBParams()
+    indicators = compute_indicators(bars, params)
+    signals = compute_signals(bars, params, indicators)
+    if filter_backend is not None:
+        signals = apply_filter(signals, indicators, filter_backend)
+    return simulate(bars, signals, **sim_kwargs)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vectorized ORB backtest over stored bars")
+    parser.add_argument("--source", choices=["db", "parquet"], default="db")
+    parser.add_argument("--symbol", default=TRADING_SYMBOL)
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--local-filter", action="store_true", help="drop signals the trained local AI model denies")
+    args = parser.parse_args()
+
+    if args.source == "db":
+        bars = load_bars_db(start=args.start, end=args.end, symbol=args.symbol)
+    else:
+        bars = load_bars_parquet(args.symbol, args.start, args.end)
+
+    backend = None
+    if args.local_filter:
+        backend = LocalScoreBackend()
+        if not backend.available:
+            parser.error("no trained local filter model (python -m src.ai.local_model)")
+    result = run_backtest(bars, filter_backend=backend)
+    print(f"{len(bars)} bars")
+    print(result.summary)
+    print(result.trades.tail(20))
@@ -0,0 +1,196 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import shared_memory
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import TRADING_SYMBOL
+from ..market.bars import BAR_DTYPE, NS_PER_DAY
+from ..strategy.orb_strategy import ORBParams
+from ..storage.duckdb_store import DuckDBStore
+from ..utils import logger
+from .engine import compute_signals, simulate, load_bars_db, load_bars_parquet
+
+# Parameter sweep / walk-forward optimizer for ORBParams.
+# Bars are placed once in shared memory; pool workers attach to it instead of receiving copies.
+
+DEFAULT_SPACE = {
+    'atr_min': [0.4, 0.6, 0.8],
+    'atr_max': [3.0, 4.0, 5.0],
+    'ema_period': [10, 20, 30],
+    'orb_minutes': [10, 15, 30],
+    'breakout_buffer': [0.0, 0.25, 0.5],
+    'stop_atr_mult': [1.0, 1.2, 1.5],
+    'tp_mult': [1.2, 1.6, 2.0],
+}
+
+# Bars before a test window used only to warm up indicators / ORB
+WARMUP_BARS = 300
+
+def grid(space: Dict[str, list]) -> List[Dict[str, Any]]:
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[k] for k in keys))]
+
+def random_search(space: Dict[str, list], n_iter: int, seed: int = 0) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [{k: rng.choice(v) for k, v in space.items()} for _ in range(n_iter)]
+
+def _parse_time(t):
+    return datetime.strptime(t, "%H:%M").time() if isinstance(t, str) else t
+
+def make_params(overrides: Dict[str, Any]) -> ORBParams:
+    overrides = dict(overrides)
+    # Time fields may come as "HH:MM" strings (CLI / JSON)
+    if 'orb_starts' in overrides:
+        overrides['orb_starts'] = sorted(_parse_time(t) for t in overrides['orb_starts'])
+    if 'trading_end' in overrides:
+        overrides['trading_end'] = _parse_time(overrides['trading_end'])
+    return ORBParams(**overrides)
+
+def walk_forward_splits(bars: np.ndarray, train_days: int, test_days: int,
+                        step_days: Optional[int] = None) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    """[(train (start, end), test (start, end)), ...] as bar index ranges, rolling by step_days."""
+    step_days = step_days or test_days
+    days = bars['time'] // NS_PER_DAY
+    unique_days = np.unique(days)
+    # First bar index of each day, plus the end
+    bounds = np.append(np.searchsorted(days, unique_days), len(bars))
+
+    splits = []
+    d = 0
+    while d + train_days + test_days <= len(unique_days):
+        train = (int(bounds[d]), int(bounds[d + train_days]))
+        test = (int(bounds[d + train_days]), int(bounds[d + train_days + test_days]))
+        splits.append((train, test))
+        d += step_days
+    return splits
+
+# --- Worker side ---
+
+_worker_shm = None
+_worker_bars = None
+
+def _attach(shm_name: str, n_bars: int):
+    global _worker_shm, _worker_bars
+    _worker_shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_bars = np.ndarray((n_bars,), dtype=BAR_DTYPE, buffer=_worker_shm.buf)
+
+def evaluate(bars: np.ndarray, overrides: Dict[str, Any], start: int, end: int,
+             warmup: int = WARMUP_BARS, **sim_kwargs) -> Dict[str, Any]:
+    """Backtest bars[start:end], using up to `warmup` earlier bars only for indicator warm-up."""
+    params = make_params(overrides)
+    lead = min(warmup, start)
+    window = bars[start - lead:end]
+    signals = compute_signals(window, params)
+    keep = signals['index'] >= lead
+    signals = {k: v[keep] for k, v in signals.items()}
+    return simulate(window, signals, **sim_kwargs).summary
+
+def _evaluate_task(task):
+    overrides, start, end = task
+    return overrides, evaluate(_worker_bars, overrides, start, end)
+
+# --- Driver ---
+
+class SharedBars:
+    """Copies a bar array into a named shared memory block for the lifetime of the sweep."""
+    def __init__(self, bars: np.ndarray):
+        self.n = len(bars)
+        self.shm = shared_memory.SharedMemory(create=True, size=max(bars.nbytes, 1))
+        np.ndarray((self.n,), dtype=BAR_DTYPE, buffer=self.shm.buf)[:] = bars
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shm.close()
+        self.shm.unlink()
+
+def _run_pool(pool, workers, candidates, start, end) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    tasks = [(c, start, end) for c in candidates]
+    chunksize = max(1, len(tasks) // (workers * 4))
+    return list(pool.map(_evaluate_task, tasks, chunksize=chunksize))
+
+def run_sweep(bars: np.ndarray, candidates: List[Dict[str, Any]], train_days: Optional[int] = None,
+              test_days: Optional[int] = None, step_days: Optional[int] = None,
+              metric: str = 'total_pnl', workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Without train/test days: every candidate on the whole range (split='full').
+    With them: walk-forward; per fold every candidate runs on train, the best (by metric) runs on test.
+    Returns result rows (also the shape written to sweep_results).
+    """
+    run_id = uuid.uuid4().hex[:12]
+    workers = workers or os.cpu_count()
+    rows = []
+
+    def add(fold, split, overrides, summary):
+        rows.append({
+            'run_id': run_id,
+            'fold': fold,
+            'split': split,
+            'params': json.dumps(overrides, sort_keys=True, default=str),
+            **summary,
+        })
+
+    with SharedBars(bars) as shared, ProcessPoolExecutor(
+        max_workers=workers, initializer=_attach, initargs=(shared.shm.name, shared.n)
+    ) as pool:
+        if not train_days or not test_days:
+            logger.info(f"Sweep {run_id}: {len(candidates)} candidates on {len(bars)} bars, {workers} workers")
+            for overrides, summary in _run_pool(pool, workers, candidates, 0, len(bars)):
+                add(0, 'full', overrides, summary)
+            return rows
+
+        splits = walk_forward_splits(bars, train_days, test_days, step_days)
+        logger.info(f"Sweep {run_id}: {len(candidates)} candidates x {len(splits)} folds, {workers} workers")
+        for fold, ((train_start, train_end), (test_start, test_end)) in enumerate(splits):
+            results = _run_pool(pool, workers, candidates, train_start, train_end)
+            for overrides, summary in results:
+                add(fold, 'train', overrides, summary)
+
+            best, best_summary = max(results, key=lambda r: r[1][metric])
+            _, test_summary = _run_pool(pool, workers, [best], test_start, test_end)[0]
+            add(fold, 'test', best, test_summary)
+            logger.info(f"Fold {fold}: best train {metric}={best_summary[metric]:.2f} -> test {test_summary[metric]:.2f} {best}")
+    return rows
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ORB parameter sweep / walk-forward optimizer")
+    parser.add_argument("--source", choices=["db", "parquet"], default="db")
+    parser.add_argument("--symbol", default=TRADING_SYMBOL)
+    parser.add_argument("--start")
+    parser.add_argument("--end")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid")
+    parser.add_argument("--n-iter", type=int, default=200, help="random search samples")
+    parser.add_argument("--space", help="JSON file overriding DEFAULT_SPACE")
+    parser.add_argument("--train-days", type=int)
+    parser.add_argument("--test-days", type=int)
+    parser.add_argument("--step-days", type=int)
+    parser.add_argument("--metric", default="total_pnl")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.source == "db":
+        bars = load_bars_db(start=args.start, end=args.end, symbol=args.symbol)
+    else:
+        bars = load_bars_parquet(args.symbol, start=args.start, end=args.end)
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            space = json.load(f)
+    candidates = grid(space) if args.search == "grid" else random_search(space, args.n_iter)
+
+    rows = run_sweep(bars, candidates, args.train_days, args.test_days, args.step_days, args.metric, args.workers)
+
+    store = DuckDBStore()
+    store.insert_sweep_results(rows)
+    store.close()
+    print(f"Wrote {len(rows)} rows to sweep_results (run {rows[0]['run_id'] if rows else '-'})")
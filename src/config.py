@@ -19,6 +19,7 @@ LOG_DIR.mkdir(exist_ok=True)
 (DATA_DIR / "orders").mkdir(exist_ok=True)
 (DATA_DIR / "fills").mkdir(exist_ok=True)
 (DATA_DIR / "db").mkdir(exist_ok=True)
+CHECKPOINT_DIR = DATA_DIR / "state"
 
 # IBKR Config
 IB_HOST = os.getenv("IB_HOST", "127.0.0.1")
@@ -28,6 +29,22 @@ IB_ACCOUNT = os.getenv("IB_ACCOUNT", "")
 
 # AI Config
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+# Filter backend: "gemini" (remote) or "local" (logistic score model, see src/ai/local_model.py)
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini")
+# Use the local model when the remote backend times out / fails / has no API key
+AI_LOCAL_FALLBACK = os.getenv("AI_LOCAL_FALLBACK", "1") == "1"
+AI_LOCAL_MODEL_PATH = DATA_DIR / "models" / "local_filter.json"
+# Hard deadline per signal for the AI filter; past it the signal gets AI_TIMEOUT_DECISION
+AI_DEADLINE_SECONDS = float(os.getenv("AI_DEADLINE_SECONDS", "3.0"))
+AI_TIMEOUT_DECISION = os.getenv("AI_TIMEOUT_DECISION", "ALLOW") # ALLOW / DENY / REDUCE_RISK
+# Decision cache: near-identical signal contexts reuse the last verdict for AI_CACHE_TTL seconds
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "1800"))
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "256"))
+AI_CACHE_ATR_STEP = float(os.getenv("AI_CACHE_ATR_STEP", "0.25")) # ATR bucket width, points
+AI_CACHE_DIST_STEP = float(os.getenv("AI_CACHE_DIST_STEP", "0.25")) # EMA / ORB distance bucket width, in ATRs
+AI_CACHE_PERSIST = os.getenv("AI_CACHE_PERSIST", "1") == "1" # keep decisions in DuckDB across restarts
+# Pre-evaluate the likely breakout while price is within this many ATRs of an ORB level (0 = off)
+AI_PREFETCH_ATR_FRACTION = float(os.getenv("AI_PREFETCH_ATR_FRACTION", "0.5"))
 
 # Trading Config
 TRADING_SYMBOL = os.getenv("TRADING_SYMBOL", "MES")
@@ -35,6 +52,59 @@ TRADING_SEC_TYPE = os.getenv("TRADING_SEC_TYPE", "FUT")
 TRADING_EXCHANGE = os.getenv("TRADING_EXCHANGE", "GLOBEX")
 TRADING_CURRENCY = os.getenv("TRADING_CURRENCY", "USD")
 
+# Multi-symbol: comma separated SYMBOL[:SEC_TYPE[:EXCHANGE[:CURRENCY]]], e.g. "MES,MNQ,M2K,AAPL:STK:SMART"
+# Missing parts default to the TRADING_* values above. Empty = TRADING_SYMBOL only.
+def _parse_instruments(env_val: str):
+    instruments = []
+    for item in (env_val or "").split(","):
+        parts = [p.strip() for p in item.split(":")]
+        if not parts[0]:
+            continue
+        defaults = [None, TRADING_SEC_TYPE, TRADING_EXCHANGE, TRADING_CURRENCY]
+        parts += defaults[len(parts):]
+        instruments.append(tuple(p or d for p, d in zip(parts[:4], defaults)))
+    return instruments or [(TRADING_SYMBOL, TRADING_SEC_TYPE, TRADING_EXCHANGE, TRADING_CURRENCY)]
+
+TRADING_INSTRUMENTS = _parse_instruments(os.getenv("TRADING_SYMBOLS", ""))
+TRADING_SYMBOLS = [i[0] for i in TRADING_INSTRUMENTS]
+
+# Market Data Config
+# Max 1-min bars kept in memory by BarManager (a full day is 1440)
+BAR_BUFFER_CAPACITY = int(os.getenv("BAR_BUFFER_CAPACITY", "2048"))
+# Parquet cache of historical bars; only missing ranges are requested from IB
+HISTORY_CACHE_DIR = DATA_DIR / "history"
+HISTORY_WARMUP_DAYS = int(os.getenv("HISTORY_WARMUP_DAYS", "1")) # 1 = today (min 5h)
+HISTORY_CACHE_FLUSH_BARS = int(os.getenv("HISTORY_CACHE_FLUSH_BARS", "30"))
+# Timezone IB reports bar times in (the TWS / Gateway login tz). Executions arrive in UTC and are
+# stored converted to it, so fills line up with bars / signals. Empty = this machine's local tz.
+MARKET_TZ = os.getenv("MARKET_TZ", "")
+# Higher timeframes (minutes) rolled up from the 1-min stream, each stored in bars_<N>m (1440 = daily)
+RESAMPLE_MINUTES = [int(m) for m in os.getenv("RESAMPLE_MINUTES", "5,15,60,1440").split(",") if m.strip()]
+# Tick ingestion for intra-minute breakout detection: "off", "tickbytick" (reqTickByTickData)
+# or "mktdata" (reqMktData). Both need the matching IB market data permissions.
+TICK_DATA = os.getenv("TICK_DATA", "off")
+# Bar sizes (seconds) aggregated from ticks; 60 drives the partial 1-min bar seen by strategies
+TICK_BAR_SECONDS = [int(s) for s in os.getenv("TICK_BAR_SECONDS", "1,5,60").split(",") if s.strip()]
+# Default per-subscriber queue size on the event bus (order-critical subscribers are unbounded)
+EVENT_QUEUE_CAPACITY = int(os.getenv("EVENT_QUEUE_CAPACITY", "1024"))
+# Latency metrics: Prometheus text endpoint on localhost (0 = off), per-stage summary rows to DuckDB every N seconds
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "60"))
+# Live push feed to the dashboard (bars / state / signals / fills as JSON lines over a Unix socket)
+FEED_ENABLED = os.getenv("FEED_ENABLED", "1") == "1"
+FEED_SOCKET = os.getenv("FEED_SOCKET", str(DATA_DIR / "live_feed.sock"))
+FEED_MAX_BUFFER = int(os.getenv("FEED_MAX_BUFFER", str(1 << 20))) # bytes pending per client before it is dropped
+# logs/app.log rotation (size, plus daily at midnight) and the structured JSONL sink under logs/structured/
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 << 20)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+LOG_JSON = os.getenv("LOG_JSON", "1") == "1"
+# Records waiting for the background log writer; beyond this they are dropped (and counted)
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# File sinks on/off for this process (the dashboard only reads them; the bot owns writing / rotation)
+LOG_FILES = os.getenv("LOG_FILES", "1") == "1"
+# Threads for per-symbol startup work (history catch-up / restore) when trading several symbols
+MARKET_DATA_WORKERS = int(os.getenv("MARKET_DATA_WORKERS", "4"))
+
 # Time Config
 def _parse_time(env_val: str, default_h: int, default_m: int):
     try:
@@ -63,6 +133,22 @@ MULTI_ORB_STARTS = [
 # We'll use a print because logger might not be fully configured yet here
 print(f"DEBUG: MULTI_ORB_STARTS env='{_multi_env}' -> parsed={MULTI_ORB_STARTS}")
 
+# Storage Config
+# DuckDB inserts are queued and written in batches by a background writer
+DUCKDB_FLUSH_ROWS = int(os.getenv("DUCKDB_FLUSH_ROWS", "200"))
+DUCKDB_FLUSH_INTERVAL = float(os.getenv("DUCKDB_FLUSH_INTERVAL", "1.0")) # seconds
+# Keep the writer connection open between flushes. DuckDB locks the file per process,
+# so this blocks the dashboard's read-only connections while the bot runs.
+DUCKDB_KEEP_OPEN = os.getenv("DUCKDB_KEEP_OPEN", "0") == "1"
+
+# CSV archive: open writers are flushed every N rows or T seconds (1 row = line-buffered)
+CSV_FLUSH_ROWS = int(os.getenv("CSV_FLUSH_ROWS", "100"))
+CSV_FLUSH_INTERVAL = float(os.getenv("CSV_FLUSH_INTERVAL", "5.0"))
+
+# Persistence pipeline (CSV/DB writes off the event loop)
+PERSIST_QUEUE_SIZE = int(os.getenv("PERSIST_QUEUE_SIZE", "10000"))
+PERSIST_PUT_TIMEOUT = float(os.getenv("PERSIST_PUT_TIMEOUT", "0.05")) # seconds to wait when full
+
 # Risk Config
 MAX_POSITION = 1
 MAX_TRADES_DAILY = int(os.getenv("MAX_TRADES_DAILY", "8"))
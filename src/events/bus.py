@@ -0,0 +1,211 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional, Type
+
+from ..config import EVENT_QUEUE_CAPACITY
+from ..utils import logger
+from .events import Event
+
+# What a full subscriber queue does with a new event
+DROP_OLDEST = "drop_oldest" # evict the oldest pending event (always see the latest)
+DROP_NEWEST = "drop_newest" # reject the new event (keep what's pending)
+COALESCE = "coalesce" # at most one pending event per key (default: symbol), newer replaces older; full -> drop oldest
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, COALESCE)
+
+class Subscriber:
+    """
+    One consumer: its own queue and task, so a slow handler only ever backs up itself.
+    capacity counts the pending events plus the one being handled (0 = unbounded, for order-critical consumers).
+    """
+    def __init__(self, name: str, event_type: Type[Event], handler: Callable, capacity: int,
+                 policy: str, symbol: Optional[str] = None, key: Callable[[Event], Any] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        self.name = name
+        self.event_type = event_type
+        self.handler = handler
+        self.is_async = asyncio.iscoroutinefunction(handler)
+        self.capacity = capacity
+        self.policy = policy
+        self.symbol = symbol
+        self.key = key or (lambda e: e.symbol)
+        self.queue = deque()
+        self.busy = False
+        self.wake = asyncio.Event()
+        self.task = None
+        self._stats = {
+            'delivered': 0,
+            'failed': 0,
+            'dropped': 0,
+            'coalesced': 0,
+            'high_watermark': 0,
+            'latency_sum_us': 0.0, # publish -> handler start
+            'latency_max_us': 0.0,
+            'handler_sum_us': 0.0,
+            'handler_max_us': 0.0,
+        }
+
+    def accepts(self, event: Event) -> bool:
+        return self.symbol is None or event.symbol == self.symbol
+
+    def offer(self, event: Event):
+        if self.policy == COALESCE:
+            key = self.key(event)
+            for i, queued in enumerate(self.queue):
+                if self.key(queued) == key:
+                    self.queue[i] = event
+                    self._stats['coalesced'] += 1
+                    return
+
+        pending = len(self.queue) + self.busy
+        if self.capacity and pending >= self.capacity:
+            if self.policy == DROP_NEWEST or not self.queue:
+                self._stats['dropped'] += 1
+                return
+            self.queue.popleft()
+            self._stats['dropped'] += 1
+
+        self.queue.append(event)
+        depth = len(self.queue)
+        if depth > self._stats['high_watermark']:
+            self._stats['high_watermark'] = depth
+        self.wake.set()
+
+    async def run(self):
+        while True:
+            if not self.queue:
+                self.wake.clear()
+                await self.wake.wait()
+                continue
+            event = self.queue.popleft()
+            self.busy = True
+            start = time.perf_counter_ns()
+            try:
+                if self.is_async:
+                    await self.handler(event)
+                else:
+                    self.handler(event)
+                ok = True
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                ok = False
+                logger.exception(f"Event subscriber {self.name} failed on {type(event).__name__}: {e}")
+            finally:
+                self.busy = False
+            end = time.perf_counter_ns()
+            self._record(ok, (start - event.created_ns) / 1000, (end - start) / 1000)
+
+    def _record(self, ok: bool, latency_us: float, handler_us: float):
+        s = self._stats
+        s['delivered' if ok else 'failed'] += 1
+        s['latency_sum_us'] += latency_us
+        s['handler_sum_us'] += handler_us
+        if latency_us > s['latency_max_us']:
+            s['latency_max_us'] = latency_us
+        if handler_us > s['handler_max_us']:
+            s['handler_max_us'] = handler_us
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        n = max(1, s['delivered'] + s['failed'])
+        return {
+            'delivered': s['delivered'],
+            'failed': s['failed'],
+            'dropped': s['dropped'],
+            'coalesced': s['coalesced'],
+            'depth': len(self.queue),
+            'high_watermark': s['high_watermark'],
+            'latency_avg_us': s['latency_sum_us'] / n,
+            'latency_max_us': s['latency_max_us'],
+            'handler_avg_us': s['handler_sum_us'] / n,
+            'handler_max_us': s['handler_max_us'],
+        }
+
+class EventBus:
+    """
+    In-process pub/sub for typed events (see events.py).
+
+    publish() never blocks and never runs handlers: it appends the event to the queue of every
+    matching subscriber (subscribing to a base class receives its subclasses too), applying that
+    subscriber's overflow policy. Each subscriber drains its queue on its own task on the event loop,
+    so the AI filter or a dashboard writer falling behind never delays order-critical consumers.
+    publish() is thread-safe: calls from other threads are handed to the loop.
+    """
+    def __init__(self, default_capacity: int = EVENT_QUEUE_CAPACITY):
+        self.default_capacity = default_capacity
+        self.subscribers: List[Subscriber] = []
+        self._routes: Dict[type, List[Subscriber]] = {}
+        self._loop = None
+        self._loop_thread = None
+        self.published = 0
+
+    def subscribe(self, event_type: Type[Event], handler: Callable, name: str = None,
+                  capacity: int = None, policy: str = DROP_OLDEST, symbol: str = None,
+                  key: Callable[[Event], Any] = None) -> Subscriber:
+        """handler(event), sync or async. symbol: only events of that symbol."""
+        sub = Subscriber(
+            name or getattr(handler, '__name__', repr(handler)),
+            event_type, handler,
+            self.default_capacity if capacity is None else capacity,
+            policy, symbol, key
+        )
+        self.subscribers.append(sub)
+        self._routes.clear()
+        if self._loop is not None:
+            self._start_subscriber(sub)
+        return sub
+
+    def start(self):
+        """Starts the subscriber tasks; call from the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        for sub in self.subscribers:
+            self._start_subscriber(sub)
+
+    def _start_subscriber(self, sub: Subscriber):
+        if sub.task is None:
+            sub.task = self._loop.create_task(sub.run(), name=f"bus:{sub.name}")
+
+    def _route(self, event_type: type) -> List[Subscriber]:
+        subs = self._routes.get(event_type)
+        if subs is None:
+            subs = [s for s in self.subscribers if issubclass(event_type, s.event_type)]
+            self._routes[event_type] = subs
+        return subs
+
+    def publish(self, event: Event):
+        if self._loop is not None and threading.get_ident() != self._loop_thread:
+            self._loop.call_soon_threadsafe(self._publish, event)
+        else:
+            self._publish(event)
+
+    def _publish(self, event: Event):
+        self.published += 1
+        for sub in self._route(type(event)):
+            if sub.accepts(event):
+                sub.offer(event)
+
+    async def drain(self, timeout: float = 5.0):
+        """Waits until every subscriber queue is empty and idle (or timeout)."""
+        deadline = time.monotonic() + timeout
+        while any(s.queue or s.busy for s in self.subscribers if s.task):
+            if time.monotonic() > deadline:
+                break
+            await asyncio.sleep(0.01)
+
+    async def close(self, timeout: float = 5.0):
+        await self.drain(timeout)
+        for sub in self.subscribers:
+            if sub.task is not None:
+                sub.task.cancel()
+        await asyncio.gather(*(s.task for s in self.subscribers if s.task), return_exceptions=True)
+        for sub in self.subscribers:
+            sub.task = None
+        self._loop = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {s.name: s.stats() for s in self.subscribers}
@@ -0,0 +1,43 @@
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Typed events published on the EventBus. created_ns (perf_counter_ns at construction)
+# is what the bus measures subscriber latency against.
+
+@dataclass
+class Event:
+    symbol: str
+    created_ns: int = field(default_factory=time.perf_counter_ns, kw_only=True)
+
+@dataclass
+class BarClosed(Event):
+    bar: Dict[str, Any] # {'symbol', 'time', 'open', 'high', 'low', 'close', 'volume'}
+    replaying: bool = False
+
+@dataclass
+class SignalGenerated(Event):
+    signal: Dict[str, Any] # ORBStrategy signal, still carrying 'ai_context'
+
+@dataclass
+class OrderPlaced(Event):
+    signal_id: str
+    action: str
+    quantity: float
+    stop_loss: float
+    take_profit: float
+    order_ids: List[int] = field(default_factory=list)
+
+@dataclass
+class Fill(Event):
+    exec_id: str
+    side: str
+    shares: float
+    price: float
+    time: Optional[datetime] = None
+
+@dataclass
+class RiskBreach(Event):
+    reason: str
+    signal_id: Optional[str] = None
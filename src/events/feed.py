@@ -0,0 +1,164 @@
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from datetime import datetime, date
+from typing import Any, Dict, List, Tuple
+
+from ..config import FEED_SOCKET, FEED_MAX_BUFFER
+from ..utils import logger
+
+# Live push feed from the bot to local readers (the dashboard) over a Unix socket.
+# Wire format: one JSON object per line
+#   {"seq": 17, "type": "bar" | "state" | "signal" | "fill", "symbol": "MES", "ts": <epoch s>, "data": {...}}
+# Datetimes go out as naive wall-clock ISO strings (tz dropped), the same representation the
+# bar / state / signal tables store, so feed rows and DB rows line up.
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if hasattr(value, 'item'): # numpy scalars
+        return value.item()
+    return str(value)
+
+def encode(seq: int, kind: str, symbol: str, data: Dict[str, Any]) -> bytes:
+    msg = {'seq': seq, 'type': kind, 'symbol': symbol, 'ts': time.time(), 'data': data}
+    return (json.dumps(msg, default=_default) + "\n").encode()
+
+class FeedServer:
+    """
+    Publisher side, on the bot's event loop. publish() only appends to each client's transport
+    buffer; a client whose buffer grows past max_buffer (not reading) is disconnected rather
+    than slowing the bot down.
+    """
+    def __init__(self, path: str = FEED_SOCKET, max_buffer: int = FEED_MAX_BUFFER):
+        self.path = str(path)
+        self.max_buffer = max_buffer
+        self.server = None
+        self.clients = set()
+        self.seq = 0
+        self.dropped_clients = 0
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path) # stale socket from a previous run
+        self.server = await asyncio.start_unix_server(self._on_client, path=self.path)
+        logger.info(f"Live feed on unix socket {self.path}")
+
+    async def _on_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.clients.add(writer)
+        try:
+            await reader.read() # clients never send; returns on disconnect
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.clients.discard(writer)
+            writer.close()
+
+    def publish(self, kind: str, symbol: str, data: Dict[str, Any]):
+        if not self.clients:
+            return
+        self.seq += 1
+        line = encode(self.seq, kind, symbol, data)
+        for writer in list(self.clients):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                logger.warning(f"Live feed client not reading, disconnecting ({self.max_buffer} bytes pending)")
+                self.dropped_clients += 1
+                self.clients.discard(writer)
+                writer.transport.abort()
+                continue
+            writer.write(line)
+
+    async def close(self):
+        for writer in list(self.clients):
+            writer.transport.abort()
+        self.clients.clear()
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+class FeedClient:
+    """
+    Subscriber side, for synchronous readers (Streamlit). A daemon thread keeps the socket open
+    (reconnecting while the bot is down) and buffers the last `maxlen` messages.
+    Each message gets a local sequence number; wait(seq) blocks until something newer arrives.
+    """
+    def __init__(self, path: str = FEED_SOCKET, maxlen: int = 10000, retry_seconds: float = 1.0):
+        self.path = str(path)
+        self.retry_seconds = retry_seconds
+        self.messages = deque(maxlen=maxlen) # (local seq, message dict)
+        self.seq = 0
+        self.connected = False
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._sock = None
+        self._thread = threading.Thread(target=self._run, name="feed-client", daemon=True)
+
+    def start(self) -> "FeedClient":
+        self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                    sock.connect(self.path)
+                    self._sock = sock
+                    self._set_connected(True)
+                    with sock.makefile('rb') as stream:
+                        for line in stream:
+                            self._on_line(line)
+            except OSError:
+                pass
+            finally:
+                self._sock = None
+                self._set_connected(False)
+            self._stop.wait(self.retry_seconds)
+
+    def _set_connected(self, connected: bool):
+        with self._cond:
+            if self.connected != connected:
+                self.connected = connected
+                self.seq += 1 # readers should re-sync when the feed comes / goes
+                self._cond.notify_all()
+
+    def _on_line(self, line: bytes):
+        try:
+            msg = json.loads(line)
+        except ValueError:
+            return
+        with self._cond:
+            self.seq += 1
+            self.messages.append((self.seq, msg))
+            self._cond.notify_all()
+
+    def wait(self, after_seq: int, timeout: float) -> int:
+        """Blocks until seq > after_seq (or timeout); returns the current seq."""
+        with self._cond:
+            self._cond.wait_for(lambda: self.seq > after_seq or self._stop.is_set(), timeout)
+            return self.seq
+
+    def since(self, after_seq: int) -> Tuple[int, List[Dict[str, Any]]]:
+        """(current seq, messages newer than after_seq oldest first), read atomically."""
+        with self._cond:
+            return self.seq, [msg for seq, msg in self.messages if seq > after_seq]
+
+    def close(self):
+        self._stop.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        with self._cond:
+            self._cond.notify_all()
+        self._thread.join(timeout=2)
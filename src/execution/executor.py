@@ -1,33 +1,49 @@
+import time
 from ib_insync import IB, Order, MarketOrder, LimitOrder, StopOrder, Trade
 from datetime import datetime
 from typing import Dict, Any, Optional
 
 from ..broker.ibkr_client import IBKRClient
 from ..risk.risk_manager import RiskManager
-from ..storage.duckdb_store import DuckDBStore
+from ..storage.duckdb_store import get_store
 from ..storage.csv_store import CSVStore
+from ..storage.pipeline import get_pipeline
 from ..utils import logger
+from ..events.events import OrderPlaced, Fill, RiskBreach
+from ..metrics.latency import get_metrics
+
+# Order statuses after which no fill will come
+TERMINAL_STATUSES = {'Cancelled', 'ApiCancelled', 'Inactive'}
 
 class Executor:
-    def __init__(self, ib_client: IBKRClient, risk_manager: RiskManager):
+    def __init__(self, ib_client: IBKRClient, risk_manager: RiskManager, bus=None):
         self.ib = ib_client.ib
         self.risk_manager = risk_manager
-        self.db_store = DuckDBStore()
+        self.bus = bus # OrderPlaced / Fill / RiskBreach events, if set
+        self.db_store = get_store()
         self.csv_store = CSVStore()
+        self.persistence = get_pipeline()
+        self.persistence.register_periodic(self.csv_store.flush_due)
         self.active_signals = set()
+        self.metrics = get_metrics()
+        self._placed_ns = {} # parent orderId -> perf_counter_ns when placed (order -> fill latency)
         
         # Subscribe to execution updates
         self.ib.execDetailsEvent += self._on_exec_details
+        self.ib.orderStatusEvent += self._on_order_status
 
-    def process_signal(self, signal: Dict[str, Any], contract):
+    def process_signal(self, signal: Dict[str, Any], contract, tick: float = None):
         """
         signal: {
             'signal_id': str,
             'base_signal': 'BUY'/'SELL',
             'stop_points': float,
             'take_points': float,
+            'symbol': str,
             ...
         }
+        tick: contract min tick for SL/TP rounding (default 0.25, MES)
+        signal['bar_received_ns'] (optional): perf_counter_ns of the bar that produced it, for bar -> order latency
         """
         if not signal:
             return
@@ -41,10 +57,11 @@ class Executor:
         action = signal['base_signal']
         qty = 1 # fixed for MVP
         
-        allowed, reason = self.risk_manager.checks_pass("ENTRY", qty)
+        allowed, reason = self.risk_manager.checks_pass("ENTRY", qty, contract.symbol)
         if not allowed:
             logger.warning(f"Risk Check Failed for {sid}: {reason}")
-            # Log refusal?
+            if self.bus is not None:
+                self.bus.publish(RiskBreach(contract.symbol, reason, sid))
             return
 
         # Execute
@@ -65,6 +82,7 @@ class Executor:
         # Let's use the estimated 'entry_price' from signal to calculate absolute SL/TP levels for the bracket.
         # It's an approximation but standard for "Market entry".
         
+        t0 = time.perf_counter_ns()
         est_entry = signal['entry_price']
         sl_points = signal['stop_points']
         tp_points = signal['take_points']
@@ -78,9 +96,10 @@ class Executor:
              tp_price = est_entry - tp_points
              parent = MarketOrder('SELL', qty)
              
-        # Round prices (MES tick size 0.25)
-        sl_price = round(sl_price * 4) / 4
-        tp_price = round(tp_price * 4) / 4
+        # Round prices to the contract tick (MES 0.25)
+        tick = tick or 0.25
+        sl_price = round(round(sl_price / tick) * tick, 8)
+        tp_price = round(round(tp_price / tick) * tick, 8)
         
         # Bracket
         bracket = self.ib.bracketOrder(
@@ -95,22 +114,41 @@ class Executor:
         bracket[0].orderType = 'MKT'
         bracket[0].lmtPrice = 0
         
+        t1 = self.metrics.since('bracket', t0)
+        
         # Place Orders
         for o in bracket:
             self.ib.placeOrder(contract, o)
+        placed = self.metrics.since('place_order', t1)
+        self._placed_ns[bracket[0].orderId] = placed
+        if signal.get('bar_received_ns'):
+            self.metrics.record('bar_to_order', placed - signal['bar_received_ns'])
             
         self.active_signals.add(sid)
         self.risk_manager.record_trade_entry()
+        if self.bus is not None:
+            self.bus.publish(OrderPlaced(
+                contract.symbol, sid, action, qty, sl_price, tp_price, [o.orderId for o in bracket]
+            ))
         
         # Log Orders
         # We can't log IDs yet efficiently until placed, but we can rely on exec details for DB
         logger.info(f"Orders placed for {sid}. SL: {sl_price}, TP: {tp_price}")
 
+    def _on_order_status(self, trade: Trade):
+        # Cancelled / rejected orders never fill: forget their placement time
+        if trade.orderStatus.status in TERMINAL_STATUSES:
+            self._placed_ns.pop(trade.order.orderId, None)
+
     def _on_exec_details(self, trade: Trade, fill):
         """
         Fill detected.
         """
-        logger.info(f"Fill: {fill.execution.side} {fill.execution.shares} @ {fill.execution.price}")
+        t0 = time.perf_counter_ns()
+        placed = self._placed_ns.pop(trade.order.orderId, None)
+        if placed is not None:
+            self.metrics.record('order_to_fill', t0 - placed)
+        logger.info("Fill: %s %s @ %s", fill.execution.side, fill.execution.shares, fill.execution.price)
         
         # Store
         fill_dict = {
@@ -123,14 +161,21 @@ class Executor:
             'permId': fill.execution.permId,
             'commission': 0.0 # Paper often 0
         }
-        self.csv_store.write_fill(fill_dict)
-        self.db_store.insert_fill(fill_dict)
+        # Audit trail: never dropped under backpressure
+        self.persistence.submit_critical(self.csv_store.write_fill, fill_dict)
+        self.persistence.submit_critical(self.db_store.insert_fill, fill_dict)
+        if self.bus is not None:
+            self.bus.publish(Fill(
+                fill_dict['symbol'], fill_dict['execId'], fill_dict['side'],
+                fill_dict['shares'], fill_dict['price'], fill_dict['time']
+            ))
         
         # Update Risk Manager Position
         # We need to reconcile total position.
         # IBKR updates positions automatically, we can poll it or track fills.
         # Safer to read self.ib.positions()
         self._sync_position()
+        self.metrics.since('fill_handler', t0)
         
         # If Realized PnL is available (from closing trade), update daily PnL
         # getting realized PnL from ib_insync is tricky without PnL events.
@@ -138,14 +183,13 @@ class Executor:
         # For MVP, let's try to track simple trade output if possible, or rely on PnL subscription in Main.
         
     def _sync_position(self):
-        positions = self.ib.positions()
-        # Find our symbol
-        net_pos = 0
-        for p in positions:
-            if p.contract.symbol == 'MES': # Simplification
-                net_pos += p.position
+        # Net position per symbol (symbols we held before and are now flat go back to 0)
+        net = {symbol: 0 for symbol in self.risk_manager.positions}
+        for p in self.ib.positions():
+            net[p.contract.symbol] = net.get(p.contract.symbol, 0) + p.position
                 
-        self.risk_manager.update_position(net_pos)
+        for symbol, position in net.items():
+            self.risk_manager.update_position(position, symbol)
 
     def cancel_all(self):
         logger.warning("Cancelling ALL open orders")
@@ -1,4 +1,5 @@
 import asyncio
+import time
 import sys
 import nest_asyncio
 nest_asyncio.apply()
@@ -9,21 +10,34 @@ from pathlib import Path
 PROJECT_ROOT = Path(__file__).parent.parent
 sys.path.append(str(PROJECT_ROOT))
 
-from src.config import IB_HOST, IB_PORT, IB_CLIENT_ID, MAX_TRADES_DAILY
-from src.utils import logger
+from src.config import (
+    IB_HOST, IB_PORT, IB_CLIENT_ID, MAX_TRADES_DAILY, AI_CACHE_PERSIST, METRICS_PORT, METRICS_FLUSH_SECONDS,
+    FEED_ENABLED
+)
+from src.utils import logger, log_stats, stop_logging
 from src.broker.ibkr_client import IBKRClient
-from src.market.bars import BarManager
+from src.market.bars import BarManager, bar_frame
+from src.market.market_data import MarketDataManager
 from src.strategy.orb_strategy import ORBStrategy
 from src.risk.risk_manager import RiskManager
 from src.execution.executor import Executor
 from src.ai.gemini_filter import GeminiFilter
+from src.ai.decision_cache import DecisionCache
+from src.storage.duckdb_store import get_store, market_wall
+from src.storage.pipeline import get_pipeline
+from src.storage.checkpoint import CheckpointStore
+from src.events.bus import EventBus, COALESCE, DROP_NEWEST
+from src.events.events import BarClosed, SignalGenerated, OrderPlaced, Fill
+from src.events.feed import FeedServer
+from src.metrics.latency import get_metrics
+from src.metrics.exporter import MetricsServer
 
 async def main():
     logger.info("Starting IBKR Algo Bot...")
     
     # 1. Initialize Components
     risk_manager = RiskManager()
-    ai_filter = GeminiFilter()
+    ai_filter = GeminiFilter(cache=DecisionCache(store=get_store() if AI_CACHE_PERSIST else None))
     
     ib_client = IBKRClient()
     
@@ -34,46 +48,148 @@ async def main():
         logger.critical("Could not connect to IBKR. Exiting.")
         return
 
-    # 3. Setup Market Data
-    bar_manager = BarManager(ib_client.ib)
-    
-    # 4. Setup Strategy
-    strategy = ORBStrategy(ai_filter)
+    # 3. Event bus: bars -> strategies -> AI filter -> orders, each consumer on its own queue
+    bus = EventBus()
+    metrics = get_metrics()
+
+    # Live push feed for the dashboard (bars, state, signals, fills)
+    feed = None
+    if FEED_ENABLED:
+        try:
+            feed = FeedServer()
+            await feed.start()
+        except OSError as e:
+            logger.error(f"Live feed not started: {e}")
+            feed = None
+
+    # 4. Setup Market Data (one BarManager per symbol in TRADING_SYMBOLS)
+    market_data = MarketDataManager(ib_client.ib, bus=bus)
     
     # 5. Setup Executor
-    executor = Executor(ib_client, risk_manager)
+    executor = Executor(ib_client, risk_manager, bus=bus)
     
-    # 6. Wiring
-    # Bar Update -> Strategy.on_bar
-    def on_bar_wrapper(bar_dict, replaying=False):
-        try:
-            # We need the full dataframe for strategy
-            df = bar_manager.get_latest_bars(100)
-            signal = strategy.on_bar(df, replaying=replaying)
-            
+    # 6. Risk state is account wide, checkpointed on its own
+    persistence = get_pipeline()
+    risk_checkpoints = CheckpointStore("risk")
+    risk_manager.load_state((risk_checkpoints.load() or {}).get('risk'))
+
+    def save_risk_checkpoint(event=None):
+        persistence.submit_critical(risk_checkpoints.write, risk_checkpoints.encode({'risk': risk_manager.get_state()}))
+
+    # Orders / fills change risk counters; a burst only needs the latest snapshot
+    bus.subscribe(OrderPlaced, save_risk_checkpoint, name="risk-checkpoint:orders", capacity=1, policy=COALESCE)
+    bus.subscribe(Fill, save_risk_checkpoint, name="risk-checkpoint:fills", capacity=1, policy=COALESCE)
+    if feed:
+        bus.subscribe(Fill, lambda e: feed.publish('fill', e.symbol, {
+            'exec_id': e.exec_id, 'time': market_wall(e.time), 'symbol': e.symbol, 'side': e.side, 'shares': e.shares, 'price': e.price
+        }), name="feed:fills")
+
+    # 7. One strategy per symbol, wired to its own bar stream
+    strategies = {}
+
+    def wire(bar_manager: BarManager):
+        symbol = bar_manager.symbol
+        strategy = ORBStrategy(ai_filter, symbol=symbol)
+        strategies[symbol] = strategy
+        checkpoints = CheckpointStore(strategy.name)
+
+        def save_checkpoint():
+            # Encode on the calling thread (consistent snapshot), write on the persistence worker
+            persistence.submit(checkpoints.write, checkpoints.encode({'strategy': strategy.get_state()}))
+
+        # History -> restore from checkpoint (replay only newer bars), else vectorized catch-up.
+        # Runs on the market data pool, one symbol per thread.
+        def on_catch_up(history):
+            checkpoint = checkpoints.load() or {}
+            if not strategy.restore(checkpoint.get('strategy'), history):
+                strategy.catch_up(history)
+            save_checkpoint()
+
+        def emit(signal):
+            logger.info("SIGNAL GENERATED: %s %s @ %s (ORB: %s - %s)", signal['symbol'], signal['base_signal'],
+                        signal['entry_price'], signal['orb_low'], signal['orb_high'])
+            bus.publish(SignalGenerated(symbol, signal))
+
+        # BarClosed -> Strategy.on_bar (order-critical: unbounded queue, nothing dropped)
+        def on_bar(event: BarClosed):
+            if event.replaying:
+                strategy.on_bar(bar_frame(event.bar), replaying=True)
+                return
+            t0 = metrics.since('bar_dispatch', event.created_ns)
+            signal = strategy.on_bar(bar_frame(event.bar))
+            metrics.since('strategy', t0)
+            save_checkpoint()
             if signal:
-                logger.info(f"SIGNAL GENERATED: {signal['base_signal']} @ {signal['entry_price']} (ORB: {signal['orb_low']} - {signal['orb_high']})")
-                executor.process_signal(signal, bar_manager.contract)
-        except Exception as e:
-            logger.error(f"Error in on_bar_wrapper: {e}")
-            if not replaying: 
-                import traceback
-                logger.error(traceback.format_exc())
-
-    bar_manager.on_bar_update.append(on_bar_wrapper)
+                signal['bar_received_ns'] = event.created_ns
+                emit(signal)
+            if feed:
+                feed.publish('bar', symbol, event.bar)
+                if strategy.last_state and strategy.last_state['timestamp'] == event.bar['time']:
+                    feed.publish('state', symbol, strategy.last_state)
+
+        # SignalGenerated -> AI filter -> Executor. One signal per symbol at a time:
+        # signals arriving while the AI call runs are dropped (counted in the bus stats)
+        async def on_signal(event: SignalGenerated):
+            approved = await strategy.filter_signal(event.signal)
+            if approved:
+                executor.process_signal(approved, bar_manager.contract, bar_manager.min_tick)
+                if feed:
+                    feed.publish('signal', symbol, approved)
+
+        # Ticks -> forming 1-min bar -> intra-minute breakout check (TICK_DATA)
+        def on_tick_bar(seconds, bar, partial):
+            if seconds != 60 or not partial:
+                return
+            try:
+                received_ns = time.perf_counter_ns()
+                signal = strategy.on_partial_bar(bar)
+                if signal:
+                    signal['bar_received_ns'] = received_ns
+                    emit(signal)
+            except Exception as e:
+                logger.error(f"Error in on_tick_bar ({symbol}): {e}")
+
+        bus.subscribe(BarClosed, on_bar, name=f"strategy:{symbol}", capacity=0, symbol=symbol)
+        bus.subscribe(SignalGenerated, on_signal, name=f"ai:{symbol}", capacity=1, policy=DROP_NEWEST, symbol=symbol)
+        bar_manager.on_catch_up.append(on_catch_up)
+        tick_stream = market_data.ticks.get(symbol)
+        if tick_stream:
+            tick_stream.on_tick.append(strategy.on_tick)
+            tick_stream.on_bar.append(on_tick_bar)
+
+    for bar_manager in market_data:
+        wire(bar_manager)
+    bus.start()
+
+    # 8. Latency metrics: Prometheus endpoint + periodic per-stage rows in latency_metrics
+    metrics_server = None
+    if METRICS_PORT:
+        try:
+            metrics_server = MetricsServer(METRICS_PORT, [metrics.prometheus_text])
+            metrics_server.start()
+        except OSError as e:
+            logger.error(f"Metrics endpoint not started (port {METRICS_PORT}): {e}")
+
+    async def flush_metrics():
+        while True:
+            await asyncio.sleep(METRICS_FLUSH_SECONDS)
+            persistence.submit(get_store().insert_latency_metrics, metrics.flush_rows())
+
+    metrics_task = asyncio.ensure_future(flush_metrics())
     
     # Summary Log
+    first = next(iter(strategies.values()))
     logger.info("="*50)
-    logger.info(f"BOT READY - Multi-ORB Schedule: {strategy.orb_starts}")
-    logger.info(f"Target Symbol: {bar_manager.contract.symbol} ({bar_manager.contract.secType})")
-    logger.info(f"Trading End: {strategy.trading_end}")
+    logger.info(f"BOT READY - Multi-ORB Schedule: {first.orb_starts}")
+    logger.info(f"Target Symbols: {', '.join(f'{bm.symbol} ({bm.contract.secType})' for bm in market_data)}")
+    logger.info(f"Trading End: {first.trading_end}")
     logger.info(f"Max Daily Trades Limit: {MAX_TRADES_DAILY}")
     logger.info("="*50)
     
-    # 7. Start Streaming
-    bar_manager.start_streaming()
+    # 9. Start Streaming (all symbols concurrently)
+    await market_data.start_streaming_async()
     
-    # 8. Keep Alive
+    # 10. Keep Alive
     logger.info("Bot Running. Press Ctrl+C to stop.")
     try:
         # ib_insync on asyncio loop.
@@ -84,7 +200,29 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Stopping...")
     finally:
+        await bus.close(timeout=2.0)
+        if feed:
+            await feed.close()
+        metrics_task.cancel()
+        if metrics_server:
+            metrics_server.close()
         ib_client.disconnect()
+        logger.info(f"Event bus: {bus.stats()}")
+        logger.info(f"Latency (us): {metrics.summary()}")
+        logger.info(f"AI decision cache: {ai_filter.cache.stats()}, prefetches: {ai_filter.prefetches} ({ai_filter.prefetch_hits} used)")
+        # Replays still running on the pool submit writes: let them finish first
+        market_data.close()
+        # Drain queued CSV/DB writes, then flush the DB writer
+        pipeline = get_pipeline()
+        pipeline.submit(market_data.save_history_cache)
+        pipeline.submit(get_store().insert_latency_metrics, metrics.flush_rows())
+        for bar_manager in market_data:
+            pipeline.register_closer(bar_manager.csv_store.close)
+        pipeline.register_closer(executor.csv_store.close)
+        pipeline.register_closer(get_store().close)
+        pipeline.close()
+        logger.info(f"Logging: {log_stats()}")
+        stop_logging()
 
 if __name__ == "__main__":
     try:
@@ -1,30 +1,217 @@
+import asyncio
+import time
 from ib_insync import IB, Future, Stock, Forex, BarData, util
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import Optional
+import numpy as np
 import pandas as pd
-from ..config import TRADING_SYMBOL, TRADING_SEC_TYPE, TRADING_EXCHANGE, TRADING_CURRENCY
+import math
+from ..config import (
+    TRADING_SYMBOL, TRADING_SEC_TYPE, TRADING_EXCHANGE, TRADING_CURRENCY, BAR_BUFFER_CAPACITY,
+    HISTORY_WARMUP_DAYS, HISTORY_CACHE_FLUSH_BARS
+)
 from ..storage.csv_store import CSVStore
-from ..storage.duckdb_store import DuckDBStore
+from ..storage.duckdb_store import get_store
+from ..storage.pipeline import get_pipeline
+from ..events.events import BarClosed
+from ..metrics.latency import get_metrics
 from ..utils import logger
 
+# One row per bar. 'time' is wall-clock nanoseconds (tz stripped, see BarBuffer.tz)
+BAR_DTYPE = np.dtype([
+    ('time', 'i8'),
+    ('open', 'f8'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('close', 'f8'),
+    ('volume', 'f8'),
+])
+
+NS_PER_MINUTE = 60 * 1_000_000_000
+NS_PER_DAY = 1440 * NS_PER_MINUTE
+
+def to_wall_ns(ts) -> tuple[int, object]:
+    """
+    Returns (wall-clock ns, tzinfo) for a datetime/date/Timestamp.
+    Tz-aware values keep their local wall time; the tz is returned so it can be re-attached.
+    """
+    tz = getattr(ts, 'tzinfo', None)
+    if tz is not None:
+        ts = ts.replace(tzinfo=None)
+    return pd.Timestamp(ts).value, tz
+
+def from_wall_ns(ns: int, tz=None) -> pd.Timestamp:
+    ts = pd.Timestamp(int(ns))
+    return ts.tz_localize(tz) if tz is not None else ts
+
+def wall_time(ts) -> pd.Timestamp:
+    """Naive wall-clock time: the representation bars are stored in (DB, CSV, feed), live or history."""
+    return from_wall_ns(to_wall_ns(ts)[0])
+
+def history_to_frame(history: np.ndarray) -> pd.DataFrame:
+    """BAR_DTYPE array -> DataFrame with a 'time' column, for bulk persistence."""
+    return pd.DataFrame({
+        'time': pd.to_datetime(history['time']),
+        'open': history['open'],
+        'high': history['high'],
+        'low': history['low'],
+        'close': history['close'],
+        'volume': history['volume'],
+    })
+
+def bar_frame(bar_dict: dict) -> pd.DataFrame:
+    """One bar dict -> single-row DataFrame indexed by 'date' (the shape strategies' on_bar takes)."""
+    return pd.DataFrame(
+        [[bar_dict['open'], bar_dict['high'], bar_dict['low'], bar_dict['close'], bar_dict['volume']]],
+        columns=['open', 'high', 'low', 'close', 'volume'],
+        index=pd.DatetimeIndex([bar_dict['time']], name='date')
+    )
+
+def duration_str(seconds: int) -> str:
+    """IB durationStr; 'S' is only accepted up to one day."""
+    seconds = max(60, int(seconds))
+    if seconds <= 86400:
+        return f"{seconds} S"
+    return f"{math.ceil(seconds / 86400)} D"
+
+def bars_to_array(bars) -> tuple[np.ndarray, object]:
+    """Converts a list of ib_insync BarData into a BAR_DTYPE array (+ tz of the timestamps)."""
+    arr = np.empty(len(bars), dtype=BAR_DTYPE)
+    tz = None
+    for i, b in enumerate(bars):
+        ns, tz = to_wall_ns(b.date)
+        arr[i] = (ns, b.open, b.high, b.low, b.close, b.volume)
+    return arr, tz
+
+class BarBuffer:
+    """
+    Fixed-capacity ring buffer of bars backed by a NumPy structured array.
+    Each bar is written twice (slot i and i + capacity), so the last N bars are always
+    a single contiguous slice: append is O(1) and tail(n) is a zero-copy view.
+    """
+    def __init__(self, capacity: int = BAR_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=BAR_DTYPE)
+        self._head = 0 # next slot to write, in [0, capacity)
+        self._count = 0
+        self.tz = None
+
+    def __len__(self):
+        return self._count
+
+    def clear(self):
+        self._head = 0
+        self._count = 0
+
+    @property
+    def last_time(self) -> Optional[int]:
+        if self._count == 0:
+            return None
+        return int(self._data['time'][self._head - 1 + self.capacity])
+
+    def append(self, time, open_, high, low, close, volume):
+        ns, tz = to_wall_ns(time)
+        if tz is not None:
+            self.tz = tz
+        self.append_row(ns, open_, high, low, close, volume)
+
+    def append_row(self, ns: int, open_, high, low, close, volume):
+        """append() for a timestamp already in wall-clock ns (no datetime conversion)."""
+        slot = self._head
+        if self._count and ns == self.last_time:
+            # Same bar revised (keepUpToDate) -> overwrite in place
+            slot = (self._head - 1) % self.capacity
+        else:
+            self._head = (self._head + 1) % self.capacity
+            self._count = min(self._count + 1, self.capacity)
+
+        row = (ns, open_, high, low, close, volume)
+        self._data[slot] = row
+        self._data[slot + self.capacity] = row
+
+    def append_bar(self, bar_dict: dict):
+        self.append(
+            bar_dict['time'], bar_dict['open'], bar_dict['high'],
+            bar_dict['low'], bar_dict['close'], bar_dict['volume']
+        )
+
+    def extend(self, rows: np.ndarray, tz=None):
+        """Bulk append of a BAR_DTYPE array (e.g. history warm-up). Only the newest `capacity` rows are kept."""
+        if tz is not None:
+            self.tz = tz
+        rows = rows[-self.capacity:]
+        m = len(rows)
+        if m == 0:
+            return
+        slots = (self._head + np.arange(m)) % self.capacity
+        self._data[slots] = rows
+        self._data[slots + self.capacity] = rows
+        self._head = (self._head + m) % self.capacity
+        self._count = min(self._count + m, self.capacity)
+
+    def tail(self, n: int) -> np.ndarray:
+        """Zero-copy view of the last n bars, oldest first."""
+        n = min(n, self._count)
+        end = self._head + self.capacity
+        return self._data[end - n:end]
+
+    def to_frame(self, n: int) -> pd.DataFrame:
+        """Builds a DataFrame (indexed by 'date', like util.df) of the last n bars."""
+        arr = self.tail(n)
+        index = pd.to_datetime(arr['time'])
+        if self.tz is not None:
+            index = index.tz_localize(self.tz)
+        index.name = 'date'
+        return pd.DataFrame({
+            'open': arr['open'],
+            'high': arr['high'],
+            'low': arr['low'],
+            'close': arr['close'],
+            'volume': arr['volume'],
+        }, index=index)
+
 class BarManager:
-    def __init__(self, ib: IB):
+    """
+    1-min bars for one contract (defaults: the TRADING_* config).
+    executor: optional thread pool for the startup catch-up (see MarketDataManager).
+    bus: EventBus that receives a BarClosed per bar (live, and replayed when bulk replay is off).
+    """
+    def __init__(self, ib: IB, symbol: str = None, sec_type: str = None, exchange: str = None,
+                 currency: str = None, executor=None, bus=None):
         self.ib = ib
+        self.symbol = symbol or TRADING_SYMBOL
+        self.sec_type = sec_type or TRADING_SEC_TYPE
+        self.exchange = exchange or TRADING_EXCHANGE
+        self.currency = currency or TRADING_CURRENCY
+        self.executor = executor
+        self.bus = bus
+        self.min_tick = None # from contract details once qualified
         
-        if TRADING_SEC_TYPE == "STK":
-            self.contract = Stock(symbol=TRADING_SYMBOL, exchange=TRADING_EXCHANGE, currency=TRADING_CURRENCY)
-        elif TRADING_SEC_TYPE == "CASH":
-            self.contract = Forex(pair=TRADING_SYMBOL)
+        if self.sec_type == "STK":
+            self.contract = Stock(symbol=self.symbol, exchange=self.exchange, currency=self.currency)
+        elif self.sec_type == "CASH":
+            self.contract = Forex(pair=self.symbol)
         else:
             # Default to Future (FUT)
             contract_month = self._get_futures_month()
             logger.info(f"Using Calculated Contract Month: {contract_month}")
-            self.contract = Future(symbol=TRADING_SYMBOL, lastTradeDateOrContractMonth=contract_month, exchange=TRADING_EXCHANGE, currency=TRADING_CURRENCY)
+            self.contract = Future(symbol=self.symbol, lastTradeDateOrContractMonth=contract_month, exchange=self.exchange, currency=self.currency)
         
         self.csv_store = CSVStore()
-        self.db_store = DuckDBStore()
-        self.bars = []
-        self.df = pd.DataFrame()
-        self.on_bar_update = [] # Callbacks
+        self.db_store = get_store()
+        self.persistence = get_pipeline()
+        self.persistence.register_periodic(self.csv_store.flush_due)
+        self.metrics = get_metrics()
+        self.buffer = BarBuffer(BAR_BUFFER_CAPACITY)
+        from .resampler import Resampler
+        self.resampler = Resampler(self.symbol, db_store=self.db_store, persistence=self.persistence)
+        self.bars_list = None
+        self.on_catch_up = [] # Callbacks taking the whole history array (bulk replay)
+        
+        from .history_cache import HistoryCache
+        self.history_cache = HistoryCache(self.symbol)
+        self._stream_start_ns = None # start of the range covered by the live subscription
+        self._bars_since_cache_save = 0
 
     def _get_futures_month(self) -> str:
         """
@@ -62,85 +249,178 @@ class BarManager:
             
         return f"{target_year}{target_month:02d}"
 
-    def qualify_contract(self):
-        logger.info("Qualifying contract...")
-        details = self.ib.qualifyContracts(self.contract)
+    async def qualify_contract_async(self):
+        logger.info(f"Qualifying contract {self.symbol}...")
+        details = await self.ib.qualifyContractsAsync(self.contract)
         
         if not details:
-            if TRADING_SEC_TYPE == "FUT":
+            if self.sec_type == "FUT":
                 # Fallback for continuous contract if specific fails
-                logger.warning(f"Specific future contract failed. Trying continuous contract for {TRADING_SYMBOL}...")
-                self.contract = Future(TRADING_SYMBOL, 'CONT', TRADING_EXCHANGE, currency=TRADING_CURRENCY)
-                self.ib.qualifyContracts(self.contract)
+                logger.warning(f"Specific future contract failed. Trying continuous contract for {self.symbol}...")
+                self.contract = Future(self.symbol, 'CONT', self.exchange, currency=self.currency)
+                await self.ib.qualifyContractsAsync(self.contract)
             else:
                 logger.error(f"Failed to qualify contract: {self.contract}")
 
-        logger.info(f"Contract qualified: {self.contract}")
+        contract_details = await self.ib.reqContractDetailsAsync(self.contract)
+        if contract_details:
+            self.min_tick = contract_details[0].minTick
+        logger.info(f"Contract qualified: {self.contract} (tick {self.min_tick})")
 
-    def start_streaming(self):
-        self.qualify_contract()
+    def qualify_contract(self):
+        util.run(self.qualify_contract_async())
+
+    def start_streaming(self, bulk_replay: bool = True):
+        util.run(self.start_streaming_async(bulk_replay))
+
+    async def start_streaming_async(self, bulk_replay: bool = True):
+        """
+        Qualifies the contract, loads the warm-up history (cache + IB gaps), catches strategies up
+        and subscribes to live bars. Awaitable, so several BarManagers can start concurrently.
+        """
+        await self.qualify_contract_async()
         
-        # Request historical to fill buffer
-        # Smart Duration: Look back at least 10 hours OR enough to cover today's first ORB
+        # Warm-up window: at least 5 hours, covering today (and HISTORY_WARMUP_DAYS - 1 earlier days).
         # To avoid replaying Jan 1st when it's Jan 2nd noon.
         now = datetime.now()
         day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
-        hours_since_day_start = int((now - day_start).total_seconds() / 3600) + 1
+        warmup_start = min(now - timedelta(hours=5), day_start - timedelta(days=HISTORY_WARMUP_DAYS - 1))
+        start_ns, _ = to_wall_ns(warmup_start)
+        now_ns, _ = to_wall_ns(now)
         
-        # We want at least 4-5 hours for warmup, but also to cover today
-        duration_h = max(5, hours_since_day_start)
-        duration_s = duration_h * 3600
-        duration_str = f"{duration_s} S"
+        # Only ranges missing from the local cache go to IB
+        gaps = self.history_cache.missing_ranges(start_ns, now_ns)
+        tail_start = gaps[-1][0] if gaps and gaps[-1][1] == now_ns else now_ns
+        fetched = [await self._backfill(gap_start, gap_end) for gap_start, gap_end in gaps if gap_end < now_ns]
         
-        logger.info(f"Requesting {duration_h} hours ({duration_str}) of historical data + streaming...")
-        self.bars_list = self.ib.reqHistoricalData(
+        # Tail: from the end of the cache up to now, and keep streaming
+        duration = duration_str((now_ns - tail_start) / 1e9)
+        logger.info(f"{self.symbol}: history cache has {len(gaps)} gap(s). Requesting {duration} of historical data + streaming...")
+        self.bars_list = await self.ib.reqHistoricalDataAsync(
             self.contract,
             endDateTime='',
-            durationStr=duration_str,
+            durationStr=duration,
             barSizeSetting='1 min',
             whatToShow='TRADES',
             useRTH=False,
             keepUpToDate=True
         )
+        live, tz = bars_to_array(self.bars_list)
+        self._stream_start_ns = min(tail_start, int(live['time'][0])) if len(live) else tail_start
+        self.persistence.submit(self.save_history_cache)
         
-        # Replay history to catch up strategy state
-        full_df = util.df(self.bars_list)
-        if full_df is not None and not full_df.empty:
-            full_df.set_index('date', inplace=True)
-            logger.info(f"Replaying {len(full_df)} historical bars to catch up strategy...")
-            
-            for i in range(len(full_df)):
-                # Incrementally populate self.df so get_latest_bars() works correctly during replay
-                self.df = full_df.iloc[:i+1]
-                
-                last_row = full_df.iloc[i]
-                bar_dict = {
-                    'time': last_row.name,
-                    'open': last_row['open'],
-                    'high': last_row['high'],
-                    'low': last_row['low'],
-                    'close': last_row['close'],
-                    'volume': last_row['volume']
-                }
-                
-                # Persist
-                self.csv_store.write_bar(bar_dict)
-                self.db_store.insert_bar(bar_dict)
-                
-                # Notify strategies
-                for callback in self.on_bar_update:
-                    callback(bar_dict, replaying=True)
+        # Warm-up = cached bars + live bars (from disk, no extra round-trips)
+        first_live = int(live['time'][0]) if len(live) else now_ns
+        cached = self.history_cache.load(start_ns, first_live)
+        history = np.concatenate([cached, live])
+        new_bars = np.concatenate(fetched + [live])
+        logger.info(f"{self.symbol} warm-up: {len(cached)} cached + {len(live)} live bars ({len(new_bars)} fetched from IB)")
+        
+        # Catch up strategy state from history (on the worker pool if there is one)
+        if len(history):
+            if self.executor is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    self.executor, self.replay_history, history, tz, bulk_replay, new_bars
+                )
+            else:
+                self.replay_history(history, tz, bulk=bulk_replay, new_bars=new_bars)
         
         # Connect to live updates
         self.bars_list.updateEvent += self._on_bar_update_event
-        logger.info(f"Live data stream connected. Waiting for real-time updates...")
+        logger.info(f"{self.symbol}: live data stream connected. Waiting for real-time updates...")
+
+    async def _backfill(self, gap_start: int, gap_end: int) -> np.ndarray:
+        """Fetches one historical hole [gap_start, gap_end) from IB (no streaming) into the cache."""
+        end_dt = from_wall_ns(gap_end, self.buffer.tz).to_pydatetime()
+        duration = duration_str((gap_end - gap_start) / 1e9)
+        logger.info(f"{self.symbol}: backfilling {duration} of history ending {end_dt}...")
+        try:
+            bars = await self.ib.reqHistoricalDataAsync(
+                self.contract,
+                endDateTime=end_dt,
+                durationStr=duration,
+                barSizeSetting='1 min',
+                whatToShow='TRADES',
+                useRTH=False,
+                keepUpToDate=False
+            )
+        except Exception as e:
+            logger.warning(f"{self.symbol}: backfill failed: {e}")
+            bars = []
+        arr, tz = bars_to_array(bars or [])
+        if tz is not None:
+            self.buffer.tz = tz
+        if len(arr) == 0:
+            # Errors, timeouts and pacing violations also come back empty: don't mark the hole
+            # as covered, the next start asks again (a real no-trading gap costs one cheap request)
+            logger.warning(f"{self.symbol}: backfill ending {end_dt} returned no bars, not cached")
+            return arr
+        arr = arr[(arr['time'] >= gap_start) & (arr['time'] < gap_end)]
+        self.history_cache.store(arr, covered=(gap_start, gap_end))
+        return arr
+
+    def save_history_cache(self):
+        """
+        Saves the streamed bars to the Parquet cache. The last bar may still be forming,
+        so it is left out of both the data and the covered range.
+        """
+        if not self.bars_list or self._stream_start_ns is None:
+            return
+        arr, _ = bars_to_array(list(self.bars_list))
+        if len(arr) == 0:
+            return
+        self.history_cache.store(arr[:-1], covered=(self._stream_start_ns, int(arr['time'][-1])))
+
+    def replay_history(self, history: np.ndarray, tz=None, bulk: bool = True, new_bars: np.ndarray = None):
+        """
+        Persists the history batch and brings strategies up to date.
+        bulk=True: one CSV write, one DuckDB insert, one on_catch_up call per strategy.
+        bulk=False: legacy bar-by-bar replay, one BarClosed(replaying=True) per bar on the bus.
+        new_bars: the part of history not stored yet (default: all of it).
+        """
+        to_persist = history_to_frame(history if new_bars is None else new_bars)
+        if not to_persist.empty:
+            self.persistence.submit(self.csv_store.write_bars, to_persist.to_dict('records'), self.symbol)
+            self.persistence.submit(self.db_store.insert_bars, to_persist, self.symbol)
+
+        self.buffer.clear()
+        if bulk and self.on_catch_up:
+            logger.info(f"Catching up strategies on {len(history)} historical bars (bulk)...")
+            self.buffer.extend(history, tz)
+            self.resampler.extend(history, tz)
+            for callback in self.on_catch_up:
+                callback(history)
+            return
+
+        logger.info(f"Replaying {len(history)} historical bars to catch up strategy...")
+        self.resampler.reset(tz)
+        for row in history:
+            bar_dict = {
+                'symbol': self.symbol,
+                'time': from_wall_ns(row['time'], tz),
+                'open': row['open'],
+                'high': row['high'],
+                'low': row['low'],
+                'close': row['close'],
+                'volume': row['volume']
+            }
+            
+            # Incrementally populate the buffer so get_latest_bars() works correctly during replay
+            self.buffer.append_bar(bar_dict)
+            self.resampler.update(int(row['time']), row['open'], row['high'], row['low'], row['close'], row['volume'], tz)
+            
+            # Notify strategies (the bus hands events from this worker thread to the loop, in order)
+            if self.bus is not None:
+                self.bus.publish(BarClosed(self.symbol, bar_dict, replaying=True))
 
     def _on_bar_update_event(self, bars, has_new_bar):
-        logger.info(f"_on_bar_update_event called: has_new_bar={has_new_bar}, bars_count={len(bars) if bars else 0}")
+        logger.debug("_on_bar_update_event called: has_new_bar=%s, bars_count=%d", has_new_bar, len(bars) if bars else 0)
         if has_new_bar:
+            received_ns = time.perf_counter_ns()
             last_bar = bars[-1]
             # Process new bar
             bar_dict = {
+                'symbol': self.symbol,
                 'time': last_bar.date,
                 'open': last_bar.open,
                 'high': last_bar.high,
@@ -149,29 +429,42 @@ class BarManager:
                 'volume': last_bar.volume
             }
             
-            # Persist
-            self.csv_store.write_bar(bar_dict)
-            self.db_store.insert_bar(bar_dict)
+            # Persist (worker thread, never blocks the event loop). Stored as naive wall-clock like
+            # the history batches; tz-aware values would be shifted to UTC by DuckDB
+            stored = dict(bar_dict, time=wall_time(last_bar.date).to_pydatetime())
+            self.persistence.submit(self.csv_store.write_bar, stored)
+            self.persistence.submit(self.db_store.insert_bar, stored)
             
-            # Update local DF
-            self.update_df(bars)
+            # Update local buffer (O(1), no DataFrame rebuild) and the higher timeframes
+            self.buffer.append_bar(bar_dict)
+            self.resampler.update(
+                self.buffer.last_time, last_bar.open, last_bar.high, last_bar.low, last_bar.close,
+                last_bar.volume, self.buffer.tz
+            )
             
-            # Notify strategies
-            for callback in self.on_bar_update:
-                callback(bar_dict, replaying=False)
-
-    def update_df(self, bars):
-        df = util.df(bars)
-        if df is None:
-            self.df = pd.DataFrame()
-        else:
-            self.df = df
+            # Periodically move streamed bars into the history cache (off the event loop)
+            self._bars_since_cache_save += 1
+            if self._bars_since_cache_save >= HISTORY_CACHE_FLUSH_BARS:
+                self._bars_since_cache_save = 0
+                self.persistence.submit(self.save_history_cache)
             
-        if not self.df.empty:
-            self.df.set_index('date', inplace=True)
-
-    def get_latest_bars(self, n=50):
-        # Prefer DB or Memory? Memory is faster for strategy
-        if self.df.empty and self.bars_list:
-             self.update_df(self.bars_list)
-        return self.df.tail(n)
+            # Notify strategies (created_ns = receipt, the start of the bar -> order latency chain)
+            self.metrics.since('bar_ingest', received_ns)
+            if self.bus is not None:
+                self.bus.publish(BarClosed(self.symbol, bar_dict, created_ns=received_ns))
+
+    def load_bars(self, bars):
+        """(Re)loads the buffer from a full ib_insync bar list."""
+        arr, tz = bars_to_array(bars)
+        self.buffer.clear()
+        self.buffer.extend(arr, tz)
+        self.resampler.extend(arr, tz)
+
+    def get_latest_bars(self, n=50, minutes: int = 1):
+        """Last n bars; minutes > 1 reads one of the resampled timeframes (RESAMPLE_MINUTES)."""
+        # Memory is faster for strategy. Only the last n bars are turned into a DataFrame.
+        if len(self.buffer) == 0 and self.bars_list:
+            self.load_bars(self.bars_list)
+        if minutes != 1:
+            return self.resampler.to_frame(minutes, n)
+        return self.buffer.to_frame(n)
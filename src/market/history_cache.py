@@ -0,0 +1,119 @@
+import json
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from ..config import HISTORY_CACHE_DIR
+from ..utils import logger
+from .bars import BAR_DTYPE, NS_PER_DAY
+
+Range = Tuple[int, int] # [start_ns, end_ns) wall-clock
+
+def _merge_ranges(ranges: List[Range]) -> List[Range]:
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class HistoryCache:
+    """
+    On-disk cache of 1-min bars for one symbol:
+        HISTORY_CACHE_DIR/<symbol>/<YYYY-MM-DD>.parquet   one partition per (wall-clock) day
+        HISTORY_CACHE_DIR/<symbol>/coverage.json          time ranges already fetched from IB
+
+    Coverage is tracked separately from the bars themselves so market halts / weekends
+    (ranges with no bars) are not re-requested on every start.
+    """
+    def __init__(self, symbol: str, root: Path = None):
+        self.symbol = symbol
+        self.root = Path(root or HISTORY_CACHE_DIR) / symbol
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._coverage_path = self.root / "coverage.json"
+        self._lock = threading.Lock()
+
+    # --- Coverage ---
+
+    def coverage(self) -> List[Range]:
+        if not self._coverage_path.exists():
+            return []
+        try:
+            return [tuple(r) for r in json.loads(self._coverage_path.read_text())]
+        except Exception as e:
+            logger.warning(f"Unreadable history coverage for {self.symbol}, ignoring cache: {e}")
+            return []
+
+    def _add_coverage(self, covered: Range):
+        ranges = _merge_ranges(self.coverage() + [covered])
+        tmp = self._coverage_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(ranges))
+        tmp.replace(self._coverage_path)
+
+    def missing_ranges(self, start_ns: int, end_ns: int) -> List[Range]:
+        """Sub-ranges of [start_ns, end_ns) not covered by the cache, oldest first."""
+        gaps = []
+        cursor = start_ns
+        for c_start, c_end in self.coverage():
+            if c_end <= cursor:
+                continue
+            if c_start >= end_ns:
+                break
+            if c_start > cursor:
+                gaps.append((cursor, c_start))
+            cursor = max(cursor, c_end)
+        if cursor < end_ns:
+            gaps.append((cursor, end_ns))
+        return gaps
+
+    # --- Bars ---
+
+    def _partition(self, day: int) -> Path:
+        return self.root / f"{pd.Timestamp(day * NS_PER_DAY).strftime('%Y-%m-%d')}.parquet"
+
+    @staticmethod
+    def _read(path: Path) -> np.ndarray:
+        # memory_map: columns are read straight from the page cache, no extra copy on open
+        table = pq.read_table(path, memory_map=True)
+        arr = np.empty(table.num_rows, dtype=BAR_DTYPE)
+        for name in BAR_DTYPE.names:
+            arr[name] = table.column(name).to_numpy()
+        return arr
+
+    def load(self, start_ns: int, end_ns: int) -> np.ndarray:
+        """Cached bars with start_ns <= time < end_ns (BAR_DTYPE, sorted)."""
+        parts = []
+        for day in range(start_ns // NS_PER_DAY, (end_ns - 1) // NS_PER_DAY + 1):
+            path = self._partition(day)
+            if path.exists():
+                parts.append(self._read(path))
+        if not parts:
+            return np.empty(0, dtype=BAR_DTYPE)
+        arr = np.concatenate(parts)
+        return arr[(arr['time'] >= start_ns) & (arr['time'] < end_ns)]
+
+    def store(self, bars: np.ndarray, covered: Optional[Range] = None):
+        """Merges bars into their day partitions (newer values win) and records the covered range."""
+        with self._lock:
+            if len(bars):
+                days = bars['time'] // NS_PER_DAY
+                for day in np.unique(days):
+                    new = bars[days == day]
+                    path = self._partition(int(day))
+                    if path.exists():
+                        new = np.concatenate([self._read(path), new])
+                    # Keep the last occurrence of each timestamp
+                    _, idx = np.unique(new['time'][::-1], return_index=True)
+                    new = new[::-1][idx]
+                    table = pa.table({name: new[name] for name in BAR_DTYPE.names})
+                    tmp = path.with_suffix(".tmp")
+                    pq.write_table(table, tmp)
+                    tmp.replace(path)
+            if covered is not None and covered[1] > covered[0]:
+                self._add_coverage(covered)
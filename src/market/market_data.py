@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from ib_insync import IB, util
+
+from ..config import TRADING_INSTRUMENTS, MARKET_DATA_WORKERS, TICK_DATA
+from ..utils import logger
+from .bars import BarManager
+from .ticks import TickStream
+
+class MarketDataManager:
+    """
+    One BarManager per instrument, all on the same IB connection.
+
+    Startup (contract qualification, cache backfill, history requests) runs concurrently for
+    all symbols, and the history catch-up of each symbol's strategies runs on a shared thread pool,
+    so N symbols start in roughly the wall time of the slowest one.
+    Live bars are published per symbol as BarClosed events on the shared bus.
+    With TICK_DATA enabled each symbol also gets a TickStream, started once its bars are streaming.
+    """
+    def __init__(self, ib: IB, instruments: List[Tuple[str, str, str, str]] = None, workers: int = MARKET_DATA_WORKERS,
+                 tick_data: str = TICK_DATA, bus=None):
+        self.ib = ib
+        instruments = instruments or TRADING_INSTRUMENTS
+        self.pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(instruments))), thread_name_prefix="marketdata")
+        self.managers: Dict[str, BarManager] = {}
+        for symbol, sec_type, exchange, currency in instruments:
+            self.managers[symbol] = BarManager(ib, symbol, sec_type, exchange, currency, executor=self.pool, bus=bus)
+        self.ticks: Dict[str, TickStream] = {}
+        if tick_data != "off":
+            self.ticks = {symbol: TickStream(ib, bm, mode=tick_data) for symbol, bm in self.managers.items()}
+
+    def __getitem__(self, symbol: str) -> BarManager:
+        return self.managers[symbol]
+
+    def __iter__(self):
+        return iter(self.managers.values())
+
+    def __len__(self):
+        return len(self.managers)
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.managers)
+
+    async def start_streaming_async(self, bulk_replay: bool = True):
+        results = await asyncio.gather(
+            *(bm.start_streaming_async(bulk_replay) for bm in self.managers.values()),
+            return_exceptions=True
+        )
+        for bm, result in zip(self.managers.values(), results):
+            if isinstance(result, Exception):
+                # One bad contract shouldn't take the other symbols down
+                logger.error(f"{bm.symbol}: failed to start streaming: {result}")
+            elif bm.symbol in self.ticks:
+                try:
+                    self.ticks[bm.symbol].start()
+                except Exception as e:
+                    logger.error(f"{bm.symbol}: failed to start tick stream: {e}")
+        logger.info(f"Streaming {sum(not isinstance(r, Exception) for r in results)}/{len(results)} symbols")
+
+    def start_streaming(self, bulk_replay: bool = True):
+        util.run(self.start_streaming_async(bulk_replay))
+
+    def save_history_cache(self):
+        for bm in self.managers.values():
+            bm.save_history_cache()
+
+    def close(self):
+        self.pool.shutdown(wait=True)
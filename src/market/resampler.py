@@ -0,0 +1,168 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import RESAMPLE_MINUTES, BAR_BUFFER_CAPACITY
+from .bars import BarBuffer, NS_PER_MINUTE, history_to_frame
+
+class _Rollup:
+    """
+    One timeframe. The forming bar is the last row of the buffer and is rewritten in place;
+    it is kept as (closed minutes of the bucket) + (last minute), so a revised 1-min bar
+    replaces its contribution instead of being counted twice.
+    """
+    def __init__(self, minutes: int, capacity: int):
+        self.minutes = minutes
+        self.interval_ns = minutes * NS_PER_MINUTE
+        self.buffer = BarBuffer(capacity)
+        self.reset()
+
+    def reset(self):
+        self.buffer.clear()
+        self.bucket = None # start ns of the forming bar
+        self.last = None # (ns, o, h, l, c, v) of the newest 1-min bar in the bucket
+        self._reset_prefix()
+
+    def _reset_prefix(self):
+        self.p_open = None
+        self.p_high = -np.inf
+        self.p_low = np.inf
+        self.p_volume = 0.0
+
+    def update(self, ns: int, o, h, l, c, v) -> Optional[np.void]:
+        """Folds one 1-min bar in; returns the bar it completed, if any."""
+        bucket = ns - ns % self.interval_ns
+        completed = None
+        if self.bucket is None or bucket > self.bucket:
+            if self.bucket is not None:
+                completed = self.buffer.tail(1)[0].copy()
+            self.bucket = bucket
+            self._reset_prefix()
+        elif bucket < self.bucket or ns < self.last[0]:
+            return None # older than what we have
+        elif ns > self.last[0]:
+            # Previous minute is final -> move it into the prefix
+            _, lo, lh, ll, _, lv = self.last
+            if self.p_open is None:
+                self.p_open = lo
+            self.p_high = max(self.p_high, lh)
+            self.p_low = min(self.p_low, ll)
+            self.p_volume += lv
+        self.last = (ns, o, h, l, c, v)
+
+        self.buffer.append_row(
+            bucket,
+            o if self.p_open is None else self.p_open,
+            max(self.p_high, h),
+            min(self.p_low, l),
+            c,
+            self.p_volume + v,
+        )
+        return completed
+
+    def extend(self, history: np.ndarray) -> np.ndarray:
+        """
+        Vectorized rollup of a history batch; returns the completed bars.
+        A first bucket the history starts inside of stays in the buffer (as the forming bar when it is
+        the only one) but isn't returned: its earlier minutes are missing, it mustn't be persisted.
+        """
+        times = history['time']
+        buckets = times - times % self.interval_ns
+        starts = np.flatnonzero(np.diff(buckets, prepend=buckets[0] - 1))
+        ends = np.append(starts[1:], len(history)) - 1
+
+        rolled = np.empty(len(starts), dtype=history.dtype)
+        rolled['time'] = buckets[starts]
+        rolled['open'] = history['open'][starts]
+        rolled['high'] = np.maximum.reduceat(history['high'], starts)
+        rolled['low'] = np.minimum.reduceat(history['low'], starts)
+        rolled['close'] = history['close'][ends]
+        rolled['volume'] = np.add.reduceat(history['volume'], starts)
+        self.buffer.extend(rolled)
+
+        # Streaming state for the last (forming) bucket
+        self.bucket = int(rolled['time'][-1])
+        self._reset_prefix()
+        closed = history[starts[-1]:ends[-1]]
+        if len(closed):
+            self.p_open = float(closed['open'][0])
+            self.p_high = float(closed['high'].max())
+            self.p_low = float(closed['low'].min())
+            self.p_volume = float(closed['volume'].sum())
+        self.last = tuple(history[ends[-1]].tolist())
+        partial = 1 if times[0] != buckets[0] else 0
+        return rolled[partial:-1]
+
+class Resampler:
+    """
+    Higher-timeframe bars (RESAMPLE_MINUTES, e.g. 5/15/60/1440) rolled up incrementally from 1-min bars,
+    O(1) per bar. Each timeframe lives in a BarBuffer, so tail()/to_frame() work like the 1-min buffer
+    (the last row is the still-forming bar). Completed bars go to bars_<N>m in DuckDB and to on_bar callbacks.
+    """
+    def __init__(self, symbol: str, minutes: List[int] = None, capacity: int = BAR_BUFFER_CAPACITY,
+                 db_store=None, persistence=None):
+        self.symbol = symbol
+        self.frames: Dict[int, _Rollup] = {m: _Rollup(m, capacity) for m in sorted(minutes or RESAMPLE_MINUTES) if m > 1}
+        self.db_store = db_store
+        self.persistence = persistence
+        self.on_bar = [] # callbacks(minutes, bar_dict) for completed bars
+
+    @property
+    def timeframes(self) -> List[int]:
+        return list(self.frames)
+
+    def update(self, ns: int, o, h, l, c, v, tz=None):
+        for minutes, rollup in self.frames.items():
+            if tz is not None:
+                rollup.buffer.tz = tz
+            completed = rollup.update(ns, o, h, l, c, v)
+            if completed is None:
+                continue
+            bar = {
+                'symbol': self.symbol,
+                'time': pd.Timestamp(int(completed['time'])),
+                'open': float(completed['open']),
+                'high': float(completed['high']),
+                'low': float(completed['low']),
+                'close': float(completed['close']),
+                'volume': float(completed['volume']),
+            }
+            self._persist(minutes, bar)
+            for callback in self.on_bar:
+                callback(minutes, bar)
+
+    def reset(self, tz=None):
+        """Drops every timeframe's bars and forming state (before a bar-by-bar replay)."""
+        for rollup in self.frames.values():
+            rollup.reset()
+            rollup.buffer.tz = tz
+
+    def extend(self, history: np.ndarray, tz=None):
+        """Rebuilds every timeframe from a history batch (replaces what was there)."""
+        self.reset(tz)
+        if len(history) == 0:
+            return
+        for minutes, rollup in self.frames.items():
+            completed = rollup.extend(history)
+            if len(completed):
+                self._persist(minutes, history_to_frame(completed))
+
+    def _persist(self, minutes: int, payload):
+        if self.db_store is None:
+            return
+        if isinstance(payload, dict):
+            task = (self.db_store.insert_bar, payload, minutes)
+        else:
+            task = (self.db_store.insert_bars, payload, self.symbol, minutes)
+        if self.persistence is not None:
+            self.persistence.submit(*task)
+        else:
+            task[0](*task[1:])
+
+    def tail(self, minutes: int, n: int) -> np.ndarray:
+        """Zero-copy view of the last n bars of a timeframe (last one still forming)."""
+        return self.frames[minutes].buffer.tail(n)
+
+    def to_frame(self, minutes: int, n: int) -> pd.DataFrame:
+        return self.frames[minutes].buffer.to_frame(n)
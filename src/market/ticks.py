@@ -0,0 +1,162 @@
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from ib_insync import IB
+
+from ..config import TICK_DATA, TICK_BAR_SECONDS, BAR_BUFFER_CAPACITY
+from ..utils import logger
+from .bars import BarBuffer, BarManager, from_wall_ns
+
+_EPOCH = datetime(1970, 1, 1)
+_NS_PER_SECOND = 1_000_000_000
+
+# reqMktData tick types carrying a trade price
+_LAST_TICK_TYPES = {4, 68} # LAST, DELAYED_LAST
+
+def wall_ns(dt: datetime, tz=None) -> int:
+    """Wall-clock ns of dt in tz (the bar stream's tz), exact integer math, no pandas."""
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(tz).replace(tzinfo=None) if tz is not None else dt.astimezone().replace(tzinfo=None)
+    delta = dt - _EPOCH
+    return (delta.days * 86400 + delta.seconds) * _NS_PER_SECOND + delta.microseconds * 1000
+
+class BarBuilder:
+    """
+    Aggregates ticks into fixed-interval bars in O(1) per tick.
+    The forming bar lives in plain attributes; completed bars go to a BarBuffer (array-backed, zero-copy tail).
+    A bar is completed by the first tick of a later interval.
+    """
+    def __init__(self, seconds: int, capacity: int = BAR_BUFFER_CAPACITY):
+        self.seconds = seconds
+        self.interval_ns = seconds * _NS_PER_SECOND
+        self.bars = BarBuffer(capacity)
+        self.start = None # ns of the forming bar
+        self.open = self.high = self.low = self.close = 0.0
+        self.volume = 0.0
+        self.ticks = 0
+
+    def add(self, ns: int, price: float, size: float) -> Optional[np.void]:
+        """Adds a tick; returns the bar it completed (BAR_DTYPE row), if any."""
+        start = ns - ns % self.interval_ns
+        if self.start is not None and start < self.start:
+            return None # late tick for a bar already closed
+        
+        completed = None
+        if self.start is None or start > self.start:
+            if self.start is not None:
+                completed = self._close_bar()
+            self.start = start
+            self.open = self.high = self.low = self.close = price
+            self.volume = size
+            self.ticks = 1
+        else:
+            if price > self.high:
+                self.high = price
+            elif price < self.low:
+                self.low = price
+            self.close = price
+            self.volume += size
+            self.ticks += 1
+        return completed
+
+    def _close_bar(self) -> np.void:
+        self.bars.append_row(self.start, self.open, self.high, self.low, self.close, self.volume)
+        return self.bars.tail(1)[0]
+
+    def partial(self) -> Optional[Dict[str, Any]]:
+        if self.start is None:
+            return None
+        return {
+            'time': from_wall_ns(self.start, self.bars.tz),
+            'open': self.open,
+            'high': self.high,
+            'low': self.low,
+            'close': self.close,
+            'volume': self.volume,
+        }
+
+class TickStream:
+    """
+    Trade ticks for one BarManager's contract, aggregated into TICK_BAR_SECONDS bars.
+
+    Callbacks:
+        on_tick(tick_dict)                         every trade tick
+        on_bar(seconds, bar_dict, partial: bool)   partial=True on every tick for the forming bar,
+                                                   partial=False once when a bar completes
+    The 1-min bars from keepUpToDate stay the source of truth for storage and indicators;
+    this stream only exists to see breakouts before the minute closes.
+    """
+    def __init__(self, ib: IB, bar_manager: BarManager, seconds: List[int] = None, mode: str = TICK_DATA):
+        self.ib = ib
+        self.bar_manager = bar_manager
+        self.symbol = bar_manager.symbol
+        self.mode = mode
+        self.builders = {s: BarBuilder(s) for s in sorted(seconds or TICK_BAR_SECONDS)}
+        self.on_tick = []
+        self.on_bar = []
+        self.ticker = None
+        self.tick_count = 0
+
+    def start(self):
+        contract = self.bar_manager.contract
+        if self.mode == "tickbytick":
+            self.ticker = self.ib.reqTickByTickData(contract, 'AllLast')
+        elif self.mode == "mktdata":
+            self.ticker = self.ib.reqMktData(contract, '', False, False)
+        else:
+            raise ValueError(f"Unknown tick data mode: {self.mode}")
+        self.ticker.updateEvent += self._on_ticker_update
+        logger.info(f"{self.symbol}: tick stream ({self.mode}) -> {list(self.builders)}s bars")
+
+    def stop(self):
+        if self.ticker is None:
+            return
+        self.ticker.updateEvent -= self._on_ticker_update
+        if self.mode == "tickbytick":
+            self.ib.cancelTickByTickData(self.ticker.contract, 'AllLast')
+        else:
+            self.ib.cancelMktData(self.ticker.contract)
+        self.ticker = None
+
+    def _on_ticker_update(self, ticker):
+        # ib_insync resets tickByTicks / ticks on every update, so these are the new ones
+        if self.mode == "tickbytick":
+            for t in ticker.tickByTicks:
+                self.process(t.time, t.price, t.size)
+        else:
+            for t in ticker.ticks:
+                if t.tickType in _LAST_TICK_TYPES and t.price > 0:
+                    self.process(t.time, t.price, t.size or 0)
+
+    def process(self, time: datetime, price: float, size: float):
+        tz = self.bar_manager.buffer.tz
+        ns = wall_ns(time, tz)
+        self.tick_count += 1
+        
+        if self.on_tick:
+            tick = {'symbol': self.symbol, 'time': time, 'price': price, 'size': size}
+            for callback in self.on_tick:
+                callback(tick)
+
+        for seconds, builder in self.builders.items():
+            builder.bars.tz = tz
+            completed = builder.add(ns, price, size)
+            if not self.on_bar:
+                continue
+            if completed is not None:
+                bar = {
+                    'symbol': self.symbol,
+                    'time': from_wall_ns(completed['time'], tz),
+                    'open': float(completed['open']),
+                    'high': float(completed['high']),
+                    'low': float(completed['low']),
+                    'close': float(completed['close']),
+                    'volume': float(completed['volume']),
+                }
+                for callback in self.on_bar:
+                    callback(seconds, bar, False)
+            partial = builder.partial()
+            partial['symbol'] = self.symbol
+            for callback in self.on_bar:
+                callback(seconds, partial, True)
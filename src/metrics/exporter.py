@@ -0,0 +1,44 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List
+
+from ..utils import logger
+
+class MetricsServer:
+    """
+    Serves GET /metrics in Prometheus text format from a daemon thread.
+    sources: callables returning exposition text, concatenated per scrape.
+    """
+    def __init__(self, port: int, sources: List[Callable[[], str]], host: str = "127.0.0.1"):
+        self.sources = sources
+
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = server.render().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass # scrapes every few seconds would flood the app log
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+
+    def render(self) -> str:
+        return "".join(source() for source in self.sources)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Metrics endpoint on http://{self.httpd.server_address[0]}:{self.port}/metrics")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
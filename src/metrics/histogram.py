@@ -0,0 +1,71 @@
+from typing import Dict, Iterable
+
+import numpy as np
+
+# HDR-style log-linear histogram: values below 2^SUB_BITS get exact buckets, above that every
+# power of two is split into 2^SUB_BITS linear sub-buckets, so the relative error stays < 1%
+# (SUB_BITS=7) from nanoseconds to minutes with a few thousand integer counters.
+SUB_BITS = 7
+SUB_COUNT = 1 << SUB_BITS
+MAX_BITS = 40 # ~18 minutes in ns; larger values land in the last bucket
+N_BUCKETS = (MAX_BITS - SUB_BITS + 1) * SUB_COUNT
+
+def bucket_index(value: int) -> int:
+    if value < SUB_COUNT:
+        return max(value, 0)
+    shift = value.bit_length() - SUB_BITS - 1
+    idx = (shift + 1) * SUB_COUNT + (value >> shift) - SUB_COUNT
+    return min(idx, N_BUCKETS - 1)
+
+def bucket_value(idx: int) -> int:
+    """Midpoint of a bucket (what percentiles report)."""
+    if idx < SUB_COUNT:
+        return idx
+    shift = idx // SUB_COUNT - 1
+    lower = (idx % SUB_COUNT + SUB_COUNT) << shift
+    return lower + ((1 << shift) >> 1)
+
+_BUCKET_VALUES = np.array([bucket_value(i) for i in range(N_BUCKETS)], dtype=np.float64)
+
+class Histogram:
+    """
+    record() is a couple of integer ops and a list increment (no allocation, no lock:
+    meant to be written from the event loop thread). Percentiles are computed on read.
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * N_BUCKETS
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+    def record(self, value: int):
+        self.counts[bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "Histogram"):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentiles(self, qs: Iterable[float]) -> Dict[float, float]:
+        qs = list(qs)
+        if self.count == 0:
+            return {q: 0.0 for q in qs}
+        cum = np.cumsum(self.counts)
+        out = {}
+        for q in qs:
+            rank = max(1, int(np.ceil(q * self.count)))
+            idx = int(np.searchsorted(cum, rank))
+            out[q] = min(float(_BUCKET_VALUES[idx]), float(self.max))
+        return out
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
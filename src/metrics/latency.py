@@ -0,0 +1,120 @@
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List
+
+from .histogram import Histogram
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+# Hot-path stages, in pipeline order (anything else recorded is appended)
+STAGES = [
+    'bar_ingest', # IB bar update -> BarClosed published (persist submit, buffer, resampler)
+    'bar_dispatch', # BarClosed published -> strategy handler start (event bus)
+    'indicators', # EMA / ATR update
+    'check_entry', # breakout check
+    'strategy', # whole ORBStrategy.on_bar
+    'ai_filter', # filter_signal (AI call / cache / fallback)
+    'risk_check', # RiskManager.checks_pass
+    'bracket', # bracket order construction
+    'place_order', # placeOrder calls
+    'bar_to_order', # bar receipt -> orders on the wire (end to end)
+    'order_to_fill', # parent order placed -> first fill callback
+    'fill_handler', # Executor._on_exec_details
+]
+
+class _Stage:
+    def __init__(self):
+        self.total = Histogram() # since start (Prometheus)
+        self.window = Histogram() # since the last metrics flush (DuckDB)
+
+    def record(self, ns: int):
+        self.total.record(ns)
+        self.window.record(ns)
+
+class LatencyMetrics:
+    """
+    Per-stage latency histograms, all in nanoseconds from time.perf_counter_ns().
+
+        t0 = time.perf_counter_ns()
+        ...
+        metrics.since('check_entry', t0)
+
+    Read side: prometheus_text() for the /metrics endpoint, flush_rows() for the latency_metrics table.
+    """
+    def __init__(self):
+        self.stages: Dict[str, _Stage] = {name: _Stage() for name in STAGES}
+        self._lock = threading.Lock() # only for creating stages / resetting windows
+
+    def _stage(self, name: str) -> _Stage:
+        stage = self.stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self.stages.setdefault(name, _Stage())
+        return stage
+
+    def record(self, name: str, ns: int):
+        self._stage(name).record(ns)
+
+    def since(self, name: str, start_ns: int) -> int:
+        """Records now - start_ns; returns now (to chain the next stage)."""
+        now = time.perf_counter_ns()
+        self._stage(name).record(now - start_ns)
+        return now
+
+    def summary(self, window: bool = False) -> Dict[str, Dict[str, float]]:
+        out = {}
+        for name, stage in list(self.stages.items()):
+            h = stage.window if window else stage.total
+            if h.count == 0:
+                continue
+            p = h.percentiles(QUANTILES)
+            out[name] = {
+                'count': h.count,
+                'mean_us': h.mean / 1000,
+                'p50_us': p[0.5] / 1000,
+                'p90_us': p[0.9] / 1000,
+                'p99_us': p[0.99] / 1000,
+                'max_us': h.max / 1000,
+            }
+        return out
+
+    def flush_rows(self) -> List[Dict[str, Any]]:
+        """Per-stage summary of the window since the previous call (then resets the window)."""
+        now = datetime.now()
+        rows = [{'timestamp': now, 'stage': name, **s} for name, s in self.summary(window=True).items()]
+        with self._lock:
+            for stage in self.stages.values():
+                stage.window.reset()
+        return rows
+
+    def prometheus_text(self, prefix: str = "ibkr_bot") -> str:
+        """Prometheus text exposition: one summary (quantiles, _sum, _count) per stage, in seconds."""
+        name = f"{prefix}_stage_latency_seconds"
+        lines = [
+            f"# HELP {name} Hot-path stage latency (bar -> order -> fill).",
+            f"# TYPE {name} summary",
+        ]
+        for stage_name, stage in list(self.stages.items()):
+            h = stage.total
+            if h.count == 0:
+                continue
+            for q, v in h.percentiles(QUANTILES).items():
+                lines.append(f'{name}{{stage="{stage_name}",quantile="{q}"}} {v / 1e9:.9f}')
+            lines.append(f'{name}_sum{{stage="{stage_name}"}} {h.total / 1e9:.9f}')
+            lines.append(f'{name}_count{{stage="{stage_name}"}} {h.count}')
+        for stage_name, stage in list(self.stages.items()):
+            if stage.total.count:
+                lines.append(f'{prefix}_stage_latency_max_seconds{{stage="{stage_name}"}} {stage.total.max / 1e9:.9f}')
+        return "\n".join(lines) + "\n"
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+def get_metrics() -> LatencyMetrics:
+    """The process-wide latency metrics."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = LatencyMetrics()
+        return _metrics
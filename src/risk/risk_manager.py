@@ -1,20 +1,23 @@
 import datetime
+import time
 from pathlib import Path
 from ..config import (
     MAX_POSITION, MAX_TRADES_DAILY, MAX_LOSS_DAILY, MAX_LOSS_PER_TRADE,
-    COOLDOWN_MINUTES, KILL_SWITCH_FILE, START_TIME, END_TIME
+    COOLDOWN_MINUTES, KILL_SWITCH_FILE, START_TIME, END_TIME, TRADING_SYMBOL
 )
 from ..utils import logger
+from ..metrics.latency import get_metrics
 
 class RiskManager:
     def __init__(self):
         self.daily_pnl = 0.0
         self.daily_trades = 0
-        self.current_position = 0
+        self.positions = {} # symbol -> net position
         self.last_trade_time = None
         self.cooldown_until = None
         self.consecutive_losses = 0
         self.kill_switch_active = False
+        self.metrics = get_metrics()
         
         # Load kill switch state on startup
         self._check_external_kill_switch()
@@ -58,7 +61,19 @@ class RiskManager:
             f.write("STOP")
         logger.warning("Kill Switch Activated")
 
-    def checks_pass(self, proposed_action: str, quantity: int = 1) -> tuple[bool, str]:
+    @property
+    def current_position(self) -> int:
+        # Gross exposure across symbols
+        return sum(abs(p) for p in self.positions.values())
+
+    def checks_pass(self, proposed_action: str, quantity: int = 1, symbol: str = TRADING_SYMBOL) -> tuple[bool, str]:
+        t0 = time.perf_counter_ns()
+        try:
+            return self._checks_pass(proposed_action, quantity, symbol)
+        finally:
+            self.metrics.since('risk_check', t0)
+
+    def _checks_pass(self, proposed_action: str, quantity: int, symbol: str) -> tuple[bool, str]:
         self._check_external_kill_switch()
         
         if self.kill_switch_active:
@@ -81,21 +96,44 @@ class RiskManager:
         if self.cooldown_until and datetime.datetime.now() < self.cooldown_until:
             return False, f"In Cooldown until {self.cooldown_until}"
 
-        if abs(self.current_position + quantity) > MAX_POSITION:
+        # MAX_POSITION is per symbol; daily trade / loss limits are account wide
+        position = self.positions.get(symbol, 0)
+        if abs(position + quantity) > MAX_POSITION:
              # This is a basic check. Real logic depends on direction.
              # If we are Long 1 and Sell 1, pos becomes 0. That's fine.
              # If we are 0 and Buy 1, pos becomes 1. Fine.
              # If we are 0 and Buy 2, fail.
              # For MVP, assuming Strategy requests 1 unit.
-             if abs(self.current_position) >= MAX_POSITION and proposed_action == "ENTRY":
+             if abs(position) >= MAX_POSITION and proposed_action == "ENTRY":
                  return False, "Max Position Limit"
 
         return True, "OK"
 
+    def get_state(self) -> dict:
+        return {
+            'date': datetime.date.today(),
+            'daily_pnl': self.daily_pnl,
+            'daily_trades': self.daily_trades,
+            'last_trade_time': self.last_trade_time,
+            'cooldown_until': self.cooldown_until,
+            'consecutive_losses': self.consecutive_losses,
+        }
+
+    def load_state(self, state: dict):
+        # Daily counters only carry over within the same day
+        if not state or state.get('date') != datetime.date.today():
+            return
+        self.daily_pnl = state['daily_pnl']
+        self.daily_trades = state['daily_trades']
+        self.last_trade_time = state['last_trade_time']
+        self.cooldown_until = state['cooldown_until']
+        self.consecutive_losses = state['consecutive_losses']
+        logger.info(f"Risk state restored: trades={self.daily_trades}, pnl={self.daily_pnl}")
+
     def record_trade_entry(self):
         self.daily_trades += 1
         self.last_trade_time = datetime.datetime.now()
 
-    def update_position(self, new_position: int):
-        self.current_position = int(new_position)
+    def update_position(self, new_position: int, symbol: str = TRADING_SYMBOL):
+        self.positions[symbol] = int(new_position)
 
@@ -0,0 +1,58 @@
+import os
+import pickle
+import struct
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..config import CHECKPOINT_DIR
+from ..utils import logger
+
+# File layout: header (magic, format version, payload length, crc32) + pickled state dict.
+# Bump CHECKPOINT_VERSION whenever the state layout changes; older files are then ignored.
+MAGIC = b"IBKRCKPT"
+CHECKPOINT_VERSION = 1
+HEADER = struct.Struct("<8sHII")
+
+class CheckpointStore:
+    """
+    Snapshot of in-memory state (strategy, indicators, risk) for fast restarts.
+    encode() runs on the event loop so the snapshot is consistent; write() can run on a worker thread.
+    """
+    def __init__(self, name: str, root: Path = None):
+        self.root = Path(root or CHECKPOINT_DIR)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / f"{name}.ckpt"
+
+    @staticmethod
+    def encode(state: Dict[str, Any]) -> bytes:
+        payload = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
+        return HEADER.pack(MAGIC, CHECKPOINT_VERSION, len(payload), zlib.crc32(payload)) + payload
+
+    def write(self, data: bytes):
+        # Write + rename so a crash never leaves a half-written checkpoint
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.path)
+
+    def save(self, state: Dict[str, Any]):
+        self.write(self.encode(state))
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        if not self.path.exists():
+            return None
+        try:
+            data = self.path.read_bytes()
+            magic, version, length, crc = HEADER.unpack_from(data)
+            payload = data[HEADER.size:]
+            if magic != MAGIC or version != CHECKPOINT_VERSION:
+                logger.warning(f"Ignoring checkpoint {self.path.name}: format {magic!r} v{version}")
+                return None
+            if len(payload) != length or zlib.crc32(payload) != crc:
+                logger.warning(f"Ignoring corrupt checkpoint {self.path.name}")
+                return None
+            return pickle.loads(payload)
+        except Exception as e:
+            logger.warning(f"Could not read checkpoint {self.path.name}: {e}")
+            return None
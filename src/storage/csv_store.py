@@ -1,11 +1,63 @@
 import csv
+import threading
+import time
 from pathlib import Path
-from datetime import datetime
-from ..config import DATA_DIR
+from datetime import datetime, timedelta
+from ..config import DATA_DIR, CSV_FLUSH_ROWS, CSV_FLUSH_INTERVAL, TRADING_SYMBOL
+
+BAR_FIELDS = ['time', 'open', 'high', 'low', 'close', 'volume']
+
+# Rare rows that make up the audit trail: written through to the OS on every write
+FLUSH_EVERY_ROW = {"fills", "orders", "risk"}
+
+class _DailyWriter:
+    """An open csv.DictWriter on one day's file, flushed every flush_rows rows or flush_interval seconds."""
+    def __init__(self, path: Path, fieldnames, flush_rows: int, flush_interval: float):
+        write_header = not path.exists() or path.stat().st_size == 0
+        self.file = open(path, 'a', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=fieldnames, extrasaction='ignore')
+        if write_header:
+            self.writer.writeheader()
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+    def write(self, rows: list):
+        self.writer.writerows(rows)
+        self.unflushed += len(rows)
+        if self.unflushed >= self.flush_rows or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self.file.flush()
+        self.unflushed = 0
+        self.last_flush = time.monotonic()
+
+    def flush_if_due(self):
+        if self.unflushed and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
 
 class CSVStore:
-    def __init__(self):
-        pass
+    """
+    Append-only CSV archive, one folder per day.
+    Writers stay open per (category, file) and are rotated when the date changes,
+    so a row costs a buffered write instead of mkdir/exists/open/close.
+    Rows sitting in a buffer are flushed by flush_due() (run by the persistence worker every second),
+    so a lone row doesn't wait for the next write; fills / orders / risk events are flushed per write.
+    Call flush()/close() on shutdown.
+    """
+    def __init__(self, flush_rows: int = CSV_FLUSH_ROWS, flush_interval: float = CSV_FLUSH_INTERVAL):
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._writers = {} # (category, filename) -> _DailyWriter
+        self._lock = threading.Lock()
+        self._today = None
+        self._rollover_at = 0.0 # epoch seconds of next midnight
 
     def _get_path(self, category: str, filename: str) -> Path:
         today = datetime.now().strftime("%Y-%m-%d")
@@ -13,83 +65,98 @@ class CSVStore:
         folder.mkdir(parents=True, exist_ok=True)
         return folder / filename
 
+    def _check_rollover(self):
+        # One float compare per write; the date is only recomputed at midnight
+        if time.time() < self._rollover_at:
+            return
+        now = datetime.now()
+        self._today = now.strftime("%Y-%m-%d")
+        tomorrow = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        self._rollover_at = tomorrow.timestamp()
+        # New day -> close yesterday's files, next write opens today's
+        for w in self._writers.values():
+            w.close()
+        self._writers.clear()
+
+    def _write(self, category: str, filename: str, rows: list, fieldnames=None):
+        if not rows:
+            return
+        with self._lock:
+            self._check_rollover()
+            key = (category, filename)
+            writer = self._writers.get(key)
+            if writer is None:
+                writer = _DailyWriter(
+                    self._get_path(category, filename),
+                    fieldnames or list(rows[0].keys()),
+                    1 if category in FLUSH_EVERY_ROW else self.flush_rows,
+                    self.flush_interval
+                )
+                self._writers[key] = writer
+            writer.write(rows)
+
+    @staticmethod
+    def _serialize(row: dict) -> dict:
+        row = dict(row)
+        # Ensure time is formatted consistently
+        for k, v in row.items():
+            if isinstance(v, datetime):
+                row[k] = v.isoformat()
+        return row
+
+    @staticmethod
+    def _bar_file(symbol: str) -> str:
+        return f"{symbol or TRADING_SYMBOL}_1min.csv"
+
     def write_bar(self, bar_data: dict):
         """
-        bar_data: {'time': datetime, 'open': float, 'high': ...}
+        bar_data: {'time': datetime, 'open': float, 'high': ..., 'symbol': str (default TRADING_SYMBOL)}
+        One file per symbol, e.g. MES_1min.csv
+        """
+        self._write("market", self._bar_file(bar_data.get('symbol')), [self._serialize(bar_data)], BAR_FIELDS)
+
+    def write_bars(self, rows: list, symbol: str = None):
+        """
+        Bulk version of write_bar, one writerows for the whole batch.
+        rows: [{'time': datetime, 'open': float, ...}, ...], all of the same symbol
         """
-        filepath = self._get_path("market", "MES_1min.csv")
-        file_exists = filepath.exists()
-        
-        fieldnames = ['time', 'open', 'high', 'low', 'close', 'volume']
-        
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
-            if not file_exists:
-                writer.writeheader()
-            
-            # Ensure time is formatted consistently
-            row = bar_data.copy()
-            if isinstance(row['time'], datetime):
-                row['time'] = row['time'].isoformat()
-                
-            writer.writerow(row)
+        self._write("market", self._bar_file(symbol), [self._serialize(r) for r in rows], BAR_FIELDS)
 
     def write_signal(self, signal_data: dict):
-        filepath = self._get_path("signals", "signals.csv")
-        file_exists = filepath.exists()
-        
         # Assume keys in signal_data are the headers
         if not signal_data:
             return
-
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=signal_data.keys())
-            if not file_exists:
-                writer.writeheader()
-            
-            row = signal_data.copy()
-            # Serialize non-serializable objects if necessary
-            for k, v in row.items():
-                if isinstance(v, datetime):
-                    row[k] = v.isoformat()
-            
-            writer.writerow(row)
+        self._write("signals", "signals.csv", [self._serialize(signal_data)])
 
     def write_order(self, order_data: dict):
-        filepath = self._get_path("orders", "orders.csv")
-        file_exists = filepath.exists()
-        
         if not order_data:
             return
-            
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=order_data.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(order_data)
+        self._write("orders", "orders.csv", [order_data])
 
     def write_fill(self, fill_data: dict):
-        filepath = self._get_path("fills", "fills.csv")
-        file_exists = filepath.exists()
-        
         if not fill_data:
             return
-            
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=fill_data.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(fill_data)
-            
+        self._write("fills", "fills.csv", [fill_data])
+
     def write_risk_event(self, event_data: dict):
-        filepath = self._get_path("risk", "risk_events.csv")
-        file_exists = filepath.exists()
-        
         if not event_data:
             return
-            
-        with open(filepath, 'a', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=event_data.keys())
-            if not file_exists:
-                writer.writeheader()
-            writer.writerow(event_data)
+        self._write("risk", "risk_events.csv", [event_data])
+
+    def flush(self):
+        with self._lock:
+            for w in self._writers.values():
+                w.flush()
+
+    def flush_due(self):
+        """Flushes writers holding rows older than flush_interval (see PersistencePipeline.register_periodic)."""
+        with self._lock:
+            for w in self._writers.values():
+                w.flush_if_due()
+
+    def close(self):
+        with self._lock:
+            for w in self._writers.values():
+                w.close()
+            self._writers.clear()
+            self._rollover_at = 0.0
@@ -1,62 +1,330 @@
 import duckdb
+import threading
+import time
+import atexit
+import pandas as pd
 from pathlib import Path
 from datetime import datetime
-from ..config import DATA_DIR
+from contextlib import contextmanager
+from zoneinfo import ZoneInfo
+from ..config import (
+    DATA_DIR, DUCKDB_FLUSH_ROWS, DUCKDB_FLUSH_INTERVAL, DUCKDB_KEEP_OPEN, TRADING_SYMBOL, RESAMPLE_MINUTES,
+    MARKET_TZ
+)
+from ..utils import logger
+
+def _wall(ts):
+    # Market-time columns hold naive exchange wall-clock (like bars_1m); DuckDB would convert
+    # tz-aware values to UTC instead
+    if getattr(ts, 'tzinfo', None) is not None:
+        return ts.replace(tzinfo=None)
+    return ts
+
+MARKET_ZONE = ZoneInfo(MARKET_TZ) if MARKET_TZ else None
+
+def market_wall(ts):
+    """
+    Naive wall-clock in the market tz for a tz-aware time that isn't already in it (ib_insync
+    execution times are UTC, bars come in the TWS tz). None zone = this machine's local tz.
+    """
+    if getattr(ts, 'tzinfo', None) is None:
+        return ts
+    if MARKET_ZONE is None:
+        return datetime.fromtimestamp(ts.timestamp())
+    return _wall(ts.astimezone(MARKET_ZONE))
+
+# Columns written by the batched writer, per table
+TABLE_COLUMNS = {
+    'bars_1m': ['symbol', 'time', 'open', 'high', 'low', 'close', 'volume'],
+    'signals': [
+        'signal_id', 'timestamp', 'symbol', 'direction', 'strategy_name',
+        'entry_price', 'stop_loss', 'take_profit', 'ai_decision', 'ai_rationale', 'raw_json'
+    ],
+    'orders': [
+        'order_id', 'perm_id', 'client_id', 'symbol', 'action', 'total_quantity',
+        'order_type', 'lmt_price', 'aux_price', 'status', 'created_at'
+    ],
+    'fills': ['exec_id', 'time', 'symbol', 'side', 'shares', 'price', 'perm_id', 'commission'],
+    'strategy_state': [
+        'timestamp', 'orb_high', 'orb_low', 'ema20', 'atr14',
+        'current_state', 'active_signal_id', 'active_window', 'symbol'
+    ],
+    'sweep_results': [
+        'run_id', 'fold', 'split', 'params', 'trades', 'total_pnl',
+        'win_rate', 'avg_pnl', 'max_drawdown', 'created_at'
+    ],
+    'ai_decisions': ['cache_key', 'decision', 'rationale', 'confidence', 'raw_json', 'created_at'],
+    'latency_metrics': ['timestamp', 'stage', 'count', 'mean_us', 'p50_us', 'p90_us', 'p99_us', 'max_us'],
+}
+
+def bar_table(minutes: int = 1) -> str:
+    return f"bars_{minutes}m"
+
+# Resampled timeframes (see market/resampler.py), same layout as bars_1m
+for _minutes in RESAMPLE_MINUTES:
+    TABLE_COLUMNS[bar_table(_minutes)] = TABLE_COLUMNS['bars_1m']
+
+# Tables where re-inserting an existing key is expected (history replay)
+IGNORE_CONFLICTS = {bar_table(m) for m in [1] + RESAMPLE_MINUTES}
+
+# Max rows per multi-row INSERT statement
+MAX_ROWS_PER_STATEMENT = 500
+
+# Failed flushes of the same batch before it is written row by row and bad rows are dropped
+MAX_FLUSH_ATTEMPTS = 3
 
 class DuckDBStore:
-    def __init__(self, db_path: Path = None):
+    """
+    Write-behind DuckDB store.
+    insert_* only queue the row (microseconds); a background writer flushes the queue
+    in one transaction when DUCKDB_FLUSH_ROWS rows are pending or every DUCKDB_FLUSH_INTERVAL seconds.
+    Use get_store() to share one writer across the bot, and close() on shutdown.
+    """
+    def __init__(self, db_path: Path = None, flush_rows: int = DUCKDB_FLUSH_ROWS,
+                 flush_interval: float = DUCKDB_FLUSH_INTERVAL, keep_open: bool = DUCKDB_KEEP_OPEN):
         if db_path is None:
             db_path = DATA_DIR / "db" / "trading.duckdb"
         self.db_path = str(db_path)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.keep_open = keep_open
+        
+        self._conn = None
+        self._conn_lock = threading.RLock() # guards the connection and flush()
+        self._pending = [] # (table, rows list | DataFrame) in arrival order
+        self._pending_rows = 0
+        self._queue_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._writer = None
+        self._failed_flushes = 0 # consecutive
+        self.dropped_rows = 0
+        self._closed = False
+        
         self._init_schema()
 
-    def _execute_query(self, query: str, params: tuple = None):
-        max_retries = 5
-        import time
-        
-        for i in range(max_retries):
-            conn = None
+    @contextmanager
+    def _connection(self):
+        """Yields the writer connection, retrying while another process holds the file lock."""
+        with self._conn_lock:
+            if self._conn is None:
+                max_retries = 5
+                for i in range(max_retries):
+                    try:
+                        self._conn = duckdb.connect(self.db_path)
+                        break
+                    except duckdb.IOException:
+                        # Locked
+                        if i < max_retries - 1:
+                            time.sleep(0.1 * (i + 1))
+                        else:
+                            raise
             try:
-                conn = duckdb.connect(self.db_path)
-                if params:
-                    conn.execute(query, params)
-                else:
-                    conn.execute(query)
-                return
-            except duckdb.IOException:
-                # Locked
-                if i < max_retries - 1:
-                    time.sleep(0.1 * (i + 1))
-                else:
-                    raise
-            except Exception as e:
-                # Log error? 
-                raise e
+                yield self._conn
             finally:
-                if conn:
-                    conn.close()
+                if not self.keep_open and self._conn is not None:
+                    self._conn.close()
+                    self._conn = None
+
+    def _execute_query(self, query: str, params: tuple = None):
+        with self._connection() as conn:
+            if params:
+                conn.execute(query, params)
+            else:
+                conn.execute(query)
 
     def _get_conn(self):
-        # We try to avoid direct connection usage where possible
-        # But if needed, just return connect.
-        # This calls might fail if locked.
+        # Direct connection for ad-hoc reads. Might fail if locked.
         return duckdb.connect(self.db_path)
 
-    def _init_schema(self):
-        conn = self._get_conn()
-        
-        # Bars table
-        conn.execute("""
-            CREATE TABLE IF NOT EXISTS bars_1m (
-                time TIMESTAMP,
-                open DOUBLE,
-                high DOUBLE,
-                low DOUBLE,
-                close DOUBLE,
-                volume INTEGER,
-                PRIMARY KEY (time)
+    # --- Write-behind queue ---
+
+    def _enqueue(self, table: str, payload):
+        n = len(payload)
+        with self._queue_lock:
+            self._pending.append((table, payload))
+            self._pending_rows += n
+            full = self._pending_rows >= self.flush_rows
+
+        if self._closed:
+            # Late writes after shutdown go straight to disk
+            self.flush()
+            return
+
+        if self._writer is None:
+            self._start_writer()
+        if full:
+            self._wake.set()
+
+    def _start_writer(self):
+        with self._queue_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._writer_loop, name="duckdb-writer", daemon=True)
+            self._writer.start()
+
+    def _writer_loop(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"DuckDB flush failed: {e}")
+
+    def pending_rows(self) -> int:
+        return self._pending_rows
+
+    def flush(self):
+        """Writes every queued row in one transaction (one multi-row INSERT per table chunk)."""
+        with self._conn_lock:
+            with self._queue_lock:
+                batch, self._pending = self._pending, []
+                self._pending_rows = 0
+            if not batch:
+                return
+
+            # Group by table, keeping arrival order within each table
+            by_table = {}
+            for table, payload in batch:
+                by_table.setdefault(table, []).append(payload)
+
+            try:
+                with self._connection() as conn:
+                    conn.execute("BEGIN TRANSACTION")
+                    try:
+                        for table, payloads in by_table.items():
+                            self._write_table(conn, table, payloads)
+                        conn.execute("COMMIT")
+                    except Exception:
+                        conn.execute("ROLLBACK")
+                        raise
+            except Exception as e:
+                self._failed_flushes += 1
+                if self._failed_flushes < MAX_FLUSH_ATTEMPTS or isinstance(e, duckdb.IOException):
+                    # Transient (or DB locked): put the batch back in front, the next flush retries it
+                    self._requeue(batch)
+                    raise
+                # Keeps failing: a bad row. Write what can be written, drop the rest
+                logger.error(f"DuckDB flush failed {self._failed_flushes} times ({e}), writing rows one by one")
+                self._salvage(batch)
+            self._failed_flushes = 0
+
+    def _requeue(self, batch: list):
+        with self._queue_lock:
+            self._pending = batch + self._pending
+            self._pending_rows += sum(len(p) for _, p in batch)
+
+    def _salvage(self, batch: list):
+        """Per payload, then per row for payloads that fail; rows that still fail are logged and dropped."""
+        try:
+            with self._connection() as conn:
+                for table, payload in batch:
+                    try:
+                        self._write_table(conn, table, [payload])
+                        continue
+                    except Exception:
+                        pass
+                    if isinstance(payload, pd.DataFrame):
+                        columns = [c for c in TABLE_COLUMNS[table] if c in payload.columns]
+                        payload = list(payload[columns].itertuples(index=False, name=None))
+                    for row in payload:
+                        try:
+                            self._write_table(conn, table, [[row]])
+                        except Exception as e:
+                            self.dropped_rows += 1
+                            logger.error(f"Dropping {table} row {row}: {e}")
+        except duckdb.IOException:
+            self._requeue(batch)
+            raise
+
+    def _write_table(self, conn, table: str, payloads: list):
+        columns = TABLE_COLUMNS[table]
+        col_sql = ", ".join(columns)
+        verb = "INSERT OR IGNORE" if table in IGNORE_CONFLICTS else "INSERT"
+
+        rows = []
+        for payload in payloads:
+            if isinstance(payload, pd.DataFrame):
+                # Bulk frames go through DataFrame registration
+                self._write_rows(conn, verb, table, col_sql, rows)
+                rows = []
+                conn.register('_batch', payload)
+                try:
+                    conn.execute(f"{verb} INTO {table} ({col_sql}) SELECT {col_sql} FROM _batch")
+                finally:
+                    conn.unregister('_batch')
+            else:
+                rows.extend(payload)
+        self._write_rows(conn, verb, table, col_sql, rows)
+
+    @staticmethod
+    def _write_rows(conn, verb: str, table: str, col_sql: str, rows: list):
+        if not rows:
+            return
+        placeholders = "(" + ", ".join("?" * len(rows[0])) + ")"
+        for start in range(0, len(rows), MAX_ROWS_PER_STATEMENT):
+            chunk = rows[start:start + MAX_ROWS_PER_STATEMENT]
+            params = [v for row in chunk for v in row]
+            conn.execute(
+                f"{verb} INTO {table} ({col_sql}) VALUES " + ", ".join([placeholders] * len(chunk)),
+                params
             )
-        """)
+
+    def close(self):
+        """Stops the writer, flushes everything still queued and releases the connection."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._writer is not None:
+            self._writer.join(timeout=5)
+        # Repeated failures end in _salvage, so this terminates with the good rows written
+        for _ in range(MAX_FLUSH_ATTEMPTS):
+            try:
+                self.flush()
+                break
+            except Exception as e:
+                logger.error(f"DuckDB flush on close failed: {e}")
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _init_schema(self):
+        with self._connection() as conn:
+            self._create_tables(conn)
+
+    def _create_tables(self, conn):        
+        # Migration: bars_1m keyed by (symbol, time). The primary key can't be altered,
+        # so the table is rebuilt; existing rows belong to TRADING_SYMBOL.
+        bar_cols = [r[0] for r in conn.execute(
+            "SELECT column_name FROM information_schema.columns WHERE table_name = 'bars_1m'"
+        ).fetchall()]
+        migrate_bars = bool(bar_cols) and 'symbol' not in bar_cols
+        if migrate_bars:
+            logger.info(f"Migrating bars_1m to per-symbol keys (existing rows -> {TRADING_SYMBOL})")
+            conn.execute("ALTER TABLE bars_1m RENAME TO bars_1m_old")
+
+        # Bars tables: 1-min + resampled timeframes (bar start time)
+        for minutes in [1] + RESAMPLE_MINUTES:
+            volume_type = "INTEGER" if minutes == 1 else "DOUBLE"
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {bar_table(minutes)} (
+                    symbol VARCHAR,
+                    time TIMESTAMP,
+                    open DOUBLE,
+                    high DOUBLE,
+                    low DOUBLE,
+                    close DOUBLE,
+                    volume {volume_type},
+                    PRIMARY KEY (symbol, time)
+                )
+            """)
+        if migrate_bars:
+            conn.execute("""
+                INSERT INTO bars_1m SELECT ?, time, open, high, low, close, volume FROM bars_1m_old
+            """, [TRADING_SYMBOL])
+            conn.execute("DROP TABLE bars_1m_old")
         
         # Signals table
         conn.execute("""
@@ -120,34 +388,84 @@ class DuckDBStore:
             )
         """)
         
+        # Backtest parameter sweep results
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS sweep_results (
+                run_id VARCHAR,
+                fold INTEGER,
+                split VARCHAR,
+                params VARCHAR,
+                trades INTEGER,
+                total_pnl DOUBLE,
+                win_rate DOUBLE,
+                avg_pnl DOUBLE,
+                max_drawdown DOUBLE,
+                created_at TIMESTAMP
+            )
+        """)
+        
+        # AI filter decision cache (latest row per key wins)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS ai_decisions (
+                cache_key VARCHAR,
+                decision VARCHAR,
+                rationale VARCHAR,
+                confidence DOUBLE,
+                raw_json VARCHAR,
+                created_at TIMESTAMP
+            )
+        """)
+        
+        # Per-stage hot-path latency, one row per stage per flush window
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS latency_metrics (
+                timestamp TIMESTAMP,
+                stage VARCHAR,
+                count BIGINT,
+                mean_us DOUBLE,
+                p50_us DOUBLE,
+                p90_us DOUBLE,
+                p99_us DOUBLE,
+                max_us DOUBLE
+            )
+        """)
+        
         # Migration: Add active_window if not exists
         try:
             conn.execute("ALTER TABLE strategy_state ADD COLUMN active_window VARCHAR")
         except:
             pass # Already exists
+        
+        # Migration: per-symbol strategy state
+        try:
+            conn.execute(f"ALTER TABLE strategy_state ADD COLUMN symbol VARCHAR DEFAULT '{TRADING_SYMBOL}'")
+        except:
+            pass # Already exists
 
-        conn.close()
-
-    def insert_bar(self, bar_data: dict):
-        self._execute_query("""
-            INSERT OR IGNORE INTO bars_1m 
-            (time, open, high, low, close, volume)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (
-            bar_data['time'], bar_data['open'], bar_data['high'], 
+    def insert_bar(self, bar_data: dict, minutes: int = 1):
+        self._enqueue(bar_table(minutes), [(
+            bar_data.get('symbol', TRADING_SYMBOL),
+            _wall(bar_data['time']), bar_data['open'], bar_data['high'], 
             bar_data['low'], bar_data['close'], bar_data['volume']
-        ))
+        )])
+
+    def insert_bars(self, bars_df, symbol: str = None, minutes: int = 1):
+        """
+        Bulk insert of many bars, written through DataFrame registration.
+        bars_df: DataFrame with columns time, open, high, low, close, volume (and symbol, unless given)
+        minutes: timeframe, 1 or one of RESAMPLE_MINUTES
+        """
+        if bars_df is None or bars_df.empty:
+            return
+        if symbol is not None or 'symbol' not in bars_df.columns:
+            bars_df = bars_df.assign(symbol=symbol or TRADING_SYMBOL)
+        self._enqueue(bar_table(minutes), bars_df[TABLE_COLUMNS['bars_1m']])
 
     def insert_signal(self, signal_data: dict):
-        self._execute_query("""
-            INSERT INTO signals 
-            (signal_id, timestamp, symbol, direction, strategy_name, 
-            entry_price, stop_loss, take_profit, ai_decision, ai_rationale, raw_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._enqueue('signals', [(
             signal_data.get('signal_id'),
-            signal_data.get('timestamp'),
-            signal_data.get('symbol', 'MES'),
+            _wall(signal_data.get('timestamp')),
+            signal_data.get('symbol', TRADING_SYMBOL),
             signal_data.get('base_signal'),
             'ORB',
             signal_data.get('entry_price'),
@@ -156,15 +474,10 @@ class DuckDBStore:
             signal_data.get('ai_decision'),
             signal_data.get('ai_rationale'),
             signal_data.get('raw_json')
-        ))
+        )])
 
     def insert_order(self, order_data: dict):
-        self._execute_query("""
-            INSERT INTO orders 
-            (order_id, perm_id, client_id, symbol, action, total_quantity, 
-            order_type, lmt_price, aux_price, status, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._enqueue('orders', [(
             order_data.get('orderId'),
             order_data.get('permId'),
             order_data.get('clientId'),
@@ -176,47 +489,90 @@ class DuckDBStore:
             order_data.get('auxPrice', 0.0),
             order_data.get('status'),
             datetime.now()
-        ))
+        )])
 
     def insert_fill(self, fill_data: dict):
-        self._execute_query("""
-            INSERT INTO fills
-            (exec_id, time, symbol, side, shares, price, perm_id, commission)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        self._enqueue('fills', [(
             fill_data.get('execId'),
-            fill_data.get('time'),
+            market_wall(fill_data.get('time')),
             fill_data.get('symbol'),
             fill_data.get('side'),
             fill_data.get('shares'),
             fill_data.get('price'),
             fill_data.get('permId'),
             fill_data.get('commission')
-        ))
+        )])
 
     def insert_strategy_state(self, ts: datetime, state_data: dict):
-        self._execute_query("""
-            INSERT INTO strategy_state
-            (timestamp, orb_high, orb_low, ema20, atr14, current_state, active_signal_id, active_window)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            ts,
+        self._enqueue('strategy_state', [(
+            _wall(ts),
             state_data.get('orb_high'),
             state_data.get('orb_low'),
             state_data.get('ema20'),
             state_data.get('atr14'),
             state_data.get('status'),
             state_data.get('signal_id'),
-            str(state_data.get('active_window')) if state_data.get('active_window') else None
-        ))
+            str(state_data.get('active_window')) if state_data.get('active_window') else None,
+            state_data.get('symbol', TRADING_SYMBOL)
+        )])
 
-    def get_recent_bars(self, limit=100):
-        conn = self._get_conn()
-        try:
+    def insert_sweep_results(self, rows: list):
+        now = datetime.now()
+        self._enqueue('sweep_results', [(
+            r['run_id'], r['fold'], r['split'], r['params'], r['trades'], r['total_pnl'],
+            r['win_rate'], r['avg_pnl'], r['max_drawdown'], now
+        ) for r in rows])
+
+    def insert_ai_decision(self, cache_key: str, result: dict, created_at: datetime):
+        self._enqueue('ai_decisions', [(
+            cache_key,
+            result.get('decision'),
+            result.get('rationale'),
+            result.get('confidence'),
+            result.get('raw_json'),
+            created_at
+        )])
+
+    def insert_latency_metrics(self, rows: list):
+        """rows: LatencyMetrics.flush_rows()"""
+        if not rows:
+            return
+        self._enqueue('latency_metrics', [
+            tuple(r[c] for c in TABLE_COLUMNS['latency_metrics']) for r in rows
+        ])
+
+    def get_ai_decisions(self, since: datetime) -> pd.DataFrame:
+        """Latest decision per cache key created at or after `since`."""
+        self.flush()
+        with self._connection() as conn:
+            return conn.execute("""
+                SELECT * FROM ai_decisions
+                WHERE created_at >= ?
+                QUALIFY row_number() OVER (PARTITION BY cache_key ORDER BY created_at DESC) = 1
+                ORDER BY created_at
+            """, [since]).df()
+
+    def get_recent_bars(self, limit=100, symbol: str = None, minutes: int = 1):
+        # Read-your-writes: push queued rows first
+        self.flush()
+        with self._connection() as conn:
             return conn.execute(f"""
-                SELECT * FROM bars_1m 
+                SELECT * FROM {bar_table(minutes)} 
+                WHERE symbol = ?
                 ORDER BY time DESC 
                 LIMIT {limit}
-            """).df().sort_values('time')
-        finally:
-            conn.close()
+            """, [symbol or TRADING_SYMBOL]).df().sort_values('time')
+
+_shared_stores = {}
+_shared_lock = threading.Lock()
+
+def get_store(db_path: Path = None) -> DuckDBStore:
+    """One shared write-behind store per database file (flushed and closed at exit)."""
+    key = str(db_path or DATA_DIR / "db" / "trading.duckdb")
+    with _shared_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = DuckDBStore(db_path)
+            _shared_stores[key] = store
+            atexit.register(store.close)
+        return store
@@ -0,0 +1,165 @@
+import queue
+import threading
+import time
+from typing import Callable, Dict, Any
+
+from ..config import PERSIST_QUEUE_SIZE, PERSIST_PUT_TIMEOUT
+from ..utils import logger
+
+_STOP = object()
+
+# How often the worker runs its periodic callbacks (e.g. time-based CSV flushes), busy or idle
+PERIODIC_SECONDS = 1.0
+
+class PersistencePipeline:
+    """
+    Runs CSVStore / DuckDBStore writes on one dedicated worker thread behind a bounded queue,
+    so the ib_insync event loop never waits on disk or DB locks.
+
+    - Ordering: a single FIFO worker, so writes to the same table/file keep submission order.
+    - Backpressure: past maxsize pending writes, submit() waits up to put_timeout, then drops (and counts it).
+      Only for writes that can be lost (bars, state, metrics): the next ones or a restart rebuild them.
+    - submit_critical() (fills, orders, risk): never waits and never drops; the queue itself is
+      unbounded, maxsize only applies to submit().
+    - Shutdown: close() drains everything still queued, including writes submitted while it drains,
+      then runs the registered closers (flush files / DB). Writes submitted after that are rejected.
+    """
+    def __init__(self, maxsize: int = PERSIST_QUEUE_SIZE, put_timeout: float = PERSIST_PUT_TIMEOUT):
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout
+        self._queue = queue.Queue()
+        self._closers = []
+        self._periodic = []
+        self._closed = False # close() called
+        self._stopped = False # worker drained and exited: nothing can be written anymore
+        self._lock = threading.Lock()
+        self._space = threading.Condition(self._lock) # notified as the worker takes items
+        self._stats = {
+            'submitted': 0,
+            'completed': 0,
+            'failed': 0,
+            'blocked': 0, # submits that found the queue full
+            'dropped': 0, # submits that gave up after put_timeout
+            'rejected': 0, # submits after the pipeline was closed
+            'high_watermark': 0,
+            'max_queue_wait_ms': 0.0,
+        }
+        self._worker = threading.Thread(target=self._run, name="persistence", daemon=True)
+        self._worker.start()
+
+    def register_closer(self, fn: Callable[[], Any]):
+        """fn is called once, on the worker side of close(), after the queue is drained."""
+        self._closers.append(fn)
+
+    def register_periodic(self, fn: Callable[[], Any]):
+        """fn runs on the worker about every PERIODIC_SECONDS, also when no writes come in."""
+        self._periodic.append(fn)
+
+    def _run_periodic(self):
+        for fn in self._periodic:
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"Persistence periodic task failed ({getattr(fn, '__name__', fn)}): {e}")
+
+    def submit(self, fn: Callable, *args, **kwargs) -> bool:
+        """Droppable write (bars, state, metrics). Returns False if it was dropped."""
+        return self._submit(fn, args, kwargs, critical=False)
+
+    def submit_critical(self, fn: Callable, *args, **kwargs) -> bool:
+        """Write that must not be lost (fills, orders, risk): queued even past maxsize."""
+        return self._submit(fn, args, kwargs, critical=True)
+
+    def _submit(self, fn: Callable, args, kwargs, critical: bool) -> bool:
+        with self._space:
+            if self._stopped:
+                # The closers have flushed / closed the stores: nowhere safe to write this anymore
+                self._stats['rejected'] += 1
+                logger.error(f"Persistence pipeline closed, rejected write: {getattr(fn, '__name__', fn)}")
+                return False
+            if not critical and self._queue.qsize() >= self.maxsize:
+                self._stats['blocked'] += 1
+                if not self._space.wait_for(lambda: self._queue.qsize() < self.maxsize, self.put_timeout):
+                    self._stats['dropped'] += 1
+                    logger.error(f"Persistence queue full ({self.maxsize}), dropped write: {getattr(fn, '__name__', fn)}")
+                    return False
+            self._queue.put_nowait((fn, args, kwargs, time.monotonic()))
+            self._stats['submitted'] += 1
+            depth = self._queue.qsize()
+            if depth > self._stats['high_watermark']:
+                self._stats['high_watermark'] = depth
+        return True
+
+    def _run(self):
+        next_periodic = time.monotonic() + PERIODIC_SECONDS
+        while True:
+            if time.monotonic() >= next_periodic:
+                self._run_periodic()
+                next_periodic = time.monotonic() + PERIODIC_SECONDS
+            try:
+                item = self._queue.get(timeout=max(0.0, next_periodic - time.monotonic()))
+            except queue.Empty:
+                continue
+            with self._space:
+                self._space.notify()
+                if item is _STOP:
+                    if self._queue.qsize() == 0:
+                        self._stopped = True
+                    else:
+                        # Writes submitted while closing: run them first
+                        self._queue.put_nowait(_STOP)
+            try:
+                if item is _STOP:
+                    if self._stopped:
+                        return
+                    continue
+                fn, args, kwargs, enqueued_at = item
+                wait_ms = (time.monotonic() - enqueued_at) * 1000
+                try:
+                    fn(*args, **kwargs)
+                    ok = True
+                except Exception as e:
+                    ok = False
+                    logger.error(f"Persistence write failed ({getattr(fn, '__name__', fn)}): {e}")
+                with self._lock:
+                    self._stats['completed' if ok else 'failed'] += 1
+                    if wait_ms > self._stats['max_queue_wait_ms']:
+                        self._stats['max_queue_wait_ms'] = wait_ms
+            finally:
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, 'depth': self._queue.qsize(), 'capacity': self.maxsize}
+
+    def drain(self):
+        """Blocks until every write submitted so far has been executed."""
+        self._queue.join()
+
+    def close(self, timeout: float = 30.0):
+        if self._closed:
+            return
+        self._closed = True
+        with self._lock:
+            self._queue.put_nowait(_STOP)
+        self._worker.join(timeout)
+        if self._worker.is_alive():
+            logger.error(f"Persistence worker did not drain within {timeout}s: {self.stats()}")
+
+        for fn in self._closers:
+            try:
+                fn()
+            except Exception as e:
+                logger.error(f"Persistence closer failed: {e}")
+        logger.info(f"Persistence pipeline closed: {self.stats()}")
+
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+def get_pipeline() -> PersistencePipeline:
+    """The process-wide persistence pipeline."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            _pipeline = PersistencePipeline()
+        return _pipeline
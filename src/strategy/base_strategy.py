@@ -2,6 +2,8 @@ from abc import ABC, abstractmethod
 from datetime import datetime
 from typing import Optional, Dict, Any
 
+import pandas as pd
+
 class BaseStrategy(ABC):
     def __init__(self, name: str):
         self.name = name
@@ -16,3 +18,20 @@ class BaseStrategy(ABC):
     @abstractmethod
     def on_tick(self, tick: Any):
         pass
+
+    def replay(self, bars):
+        """Feeds a BAR_DTYPE array (oldest first) through on_bar(replaying=True), bar by bar."""
+        for row in bars:
+            df = pd.DataFrame({
+                'open': [row['open']], 'high': [row['high']], 'low': [row['low']],
+                'close': [row['close']], 'volume': [row['volume']]
+            }, index=pd.DatetimeIndex([pd.Timestamp(int(row['time']))], name='date'))
+            self.on_bar(df, replaying=True)
+
+    def catch_up(self, bars):
+        """
+        Rebuild state from a batch of historical bars (BAR_DTYPE array, oldest first).
+        Default: replay every bar; strategies override it with a vectorized pass that must end
+        in the same state (see ORBStrategy.catch_up).
+        """
+        self.replay(bars)
@@ -0,0 +1,251 @@
+import math
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+# Streaming indicators: each keeps running state and updates in O(1) per bar.
+# warm_up() rebuilds the state from whole arrays in one vectorized pass (history catch-up).
+# Values are NaN until enough bars have been seen, like the pandas equivalents.
+
+class EMA:
+    """
+    Exponential moving average, span=period.
+    adjust=True reproduces pandas ewm(span=period, adjust=True) over the full series.
+    """
+    def __init__(self, period: int, adjust: bool = True):
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self.adjust = adjust
+        self.reset()
+
+    def reset(self):
+        self.value = math.nan
+        self.count = 0
+        self._num = 0.0
+        self._den = 0.0
+
+    def update(self, x: float) -> float:
+        decay = 1.0 - self.alpha
+        if self.adjust:
+            self._num = x + decay * self._num
+            self._den = 1.0 + decay * self._den
+            self.value = self._num / self._den
+        elif self.count == 0:
+            self.value = x
+        else:
+            self.value = self.alpha * x + decay * self.value
+        self.count += 1
+        return self.value
+
+    def warm_up(self, values: np.ndarray) -> float:
+        self.reset()
+        n = len(values)
+        if n == 0:
+            return self.value
+        self.value = float(pd.Series(values).ewm(span=self.period, adjust=self.adjust).mean().iloc[-1])
+        self.count = n
+        if self.adjust:
+            # Weight sum of the adjusted EMA has a closed form
+            decay = 1.0 - self.alpha
+            self._den = (1.0 - decay ** n) / self.alpha
+            self._num = self.value * self._den
+        return self.value
+
+class TrueRange:
+    """True range; the first bar (no previous close) uses high - low."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.prev_close = None
+        self.value = math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.value = tr
+        return tr
+
+    @staticmethod
+    def compute(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """Vectorized true range over whole arrays."""
+        tr = high - low
+        if len(tr) > 1:
+            prev_close = close[:-1]
+            tr[1:] = np.maximum(
+                tr[1:],
+                np.maximum(np.abs(high[1:] - prev_close), np.abs(low[1:] - prev_close))
+            )
+        return tr
+
+    def warm_up(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        self.reset()
+        tr = self.compute(high, low, close)
+        if len(tr):
+            self.prev_close = float(close[-1])
+            self.value = float(tr[-1])
+        return tr
+
+class ATR:
+    """
+    Average true range.
+    method='sma': simple mean of the last `period` TRs (what ORB used with rolling().mean()).
+    method='wilder': Wilder smoothing seeded with the SMA of the first `period` TRs.
+    """
+    def __init__(self, period: int = 14, method: str = 'sma'):
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown ATR method: {method}")
+        self.period = period
+        self.method = method
+        self.tr = TrueRange()
+        self.reset()
+
+    def reset(self):
+        self.tr.reset()
+        self.value = math.nan
+        self.count = 0
+        self._window = deque(maxlen=self.period)
+
+    def update(self, high: float, low: float, close: float) -> float:
+        tr = self.tr.update(high, low, close)
+        self.count += 1
+
+        if self.method == 'sma' or self.count <= self.period:
+            self._window.append(tr)
+            if len(self._window) == self.period:
+                self.value = sum(self._window) / self.period
+        else:
+            self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+    def warm_up(self, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> float:
+        self.reset()
+        tr = self.tr.warm_up(
+            np.asarray(high, dtype=float), np.asarray(low, dtype=float), np.asarray(close, dtype=float)
+        )
+        self.count = len(tr)
+        self._window.extend(tr[-self.period:] if self.method == 'sma' else tr[:self.period])
+        if self.count < self.period:
+            return self.value
+
+        if self.method == 'sma':
+            self.value = float(tr[-self.period:].mean())
+        else:
+            seed = tr[:self.period].mean()
+            rest = tr[self.period:]
+            if len(rest):
+                series = pd.Series(np.concatenate(([seed], rest)))
+                self.value = float(series.ewm(alpha=1.0 / self.period, adjust=False).mean().iloc[-1])
+            else:
+                self.value = float(seed)
+        return self.value
+
+class VWAP:
+    """Session VWAP on typical price; resets whenever the session key (e.g. date) changes."""
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.session = None
+        self.value = math.nan
+        self._pv = 0.0
+        self._vol = 0.0
+
+    def update(self, high: float, low: float, close: float, volume: float, session=None) -> float:
+        if session != self.session:
+            self.reset()
+            self.session = session
+        self._pv += (high + low + close) / 3.0 * volume
+        self._vol += volume
+        if self._vol > 0:
+            self.value = self._pv / self._vol
+        return self.value
+
+    def warm_up(self, high, low, close, volume, sessions: Optional[np.ndarray] = None) -> float:
+        self.reset()
+        if len(close) == 0:
+            return self.value
+        if sessions is not None:
+            # Only the last session matters for the running value
+            last = sessions[-1]
+            mask = sessions == last
+            high, low, close, volume = high[mask], low[mask], close[mask], volume[mask]
+            self.session = last
+        typical = (np.asarray(high) + np.asarray(low) + np.asarray(close)) / 3.0
+        self._pv = float((typical * volume).sum())
+        self._vol = float(np.sum(volume))
+        if self._vol > 0:
+            self.value = self._pv / self._vol
+        return self.value
+
+class RSI:
+    """Wilder RSI."""
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.reset()
+
+    def reset(self):
+        self.value = math.nan
+        self.count = 0
+        self._prev = None
+        self._gains = []
+        self._losses = []
+        self._avg_gain = math.nan
+        self._avg_loss = math.nan
+
+    def _set_value(self):
+        if self._avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._avg_gain / self._avg_loss)
+
+    def update(self, close: float) -> float:
+        if self._prev is None:
+            self._prev = close
+            return self.value
+        change = close - self._prev
+        self._prev = close
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        self.count += 1
+
+        if self.count < self.period:
+            self._gains.append(gain)
+            self._losses.append(loss)
+            return self.value
+        if self.count == self.period:
+            self._avg_gain = (sum(self._gains) + gain) / self.period
+            self._avg_loss = (sum(self._losses) + loss) / self.period
+            self._gains, self._losses = [], []
+        else:
+            self._avg_gain = (self._avg_gain * (self.period - 1) + gain) / self.period
+            self._avg_loss = (self._avg_loss * (self.period - 1) + loss) / self.period
+        self._set_value()
+        return self.value
+
+    def warm_up(self, close: np.ndarray) -> float:
+        self.reset()
+        close = np.asarray(close, dtype=float)
+        if len(close) == 0:
+            return self.value
+        self._prev = float(close[-1])
+        changes = np.diff(close)
+        self.count = len(changes)
+        gains = np.maximum(changes, 0.0)
+        losses = np.maximum(-changes, 0.0)
+        if self.count < self.period:
+            self._gains, self._losses = list(gains), list(losses)
+            return self.value
+
+        def wilder(x):
+            series = pd.Series(np.concatenate(([x[:self.period].mean()], x[self.period:])))
+            return float(series.ewm(alpha=1.0 / self.period, adjust=False).mean().iloc[-1])
+
+        self._avg_gain = wilder(gains)
+        self._avg_loss = wilder(losses)
+        self._set_value()
+        return self.value
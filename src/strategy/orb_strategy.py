@@ -1,19 +1,47 @@
+import copy
+from time import perf_counter_ns
 import pandas as pd
 import numpy as np
-from datetime import datetime, time, timedelta
-from typing import Dict, Any, Optional
+from datetime import time
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List
 
 from .base_strategy import BaseStrategy
-from ..config import START_TIME, FORCE_CLOSE_TIME, MULTI_ORB_STARTS
+from ..config import START_TIME, FORCE_CLOSE_TIME, MULTI_ORB_STARTS, AI_PREFETCH_ATR_FRACTION, TRADING_SYMBOL
 from ..ai.gemini_filter import GeminiFilter
 from ..utils import logger
-from ..storage.duckdb_store import DuckDBStore
+from ..storage.duckdb_store import get_store
+from ..metrics.latency import get_metrics
+from ..market.bars import NS_PER_MINUTE, NS_PER_DAY, to_wall_ns
+from .indicators import EMA, ATR
+from .session import SessionSchedule, FORMING, TRADING, minute_of_day
+
+TICK = 0.25 # MES tick
+
+@dataclass
+class ORBParams:
+    """Tunable ORB parameters, shared by the live strategy and the backtest engine."""
+    ema_period: int = 20
+    atr_period: int = 14
+    atr_method: str = 'sma' # 'sma' or 'wilder'
+    atr_min: float = 0.6
+    atr_max: float = 4.0
+    orb_minutes: int = 15
+    breakout_buffer: float = 0.25 # points beyond the ORB level
+    stop_atr_mult: float = 1.2
+    min_stop: float = 2.5 # points
+    tp_mult: float = 1.6 # take profit = tp_mult * stop
+    min_bars: int = 50 # history needed before indicators / ORB are trusted
+    orb_starts: List[time] = field(default_factory=lambda: sorted(MULTI_ORB_STARTS))
+    trading_end: time = FORCE_CLOSE_TIME
 
 class ORBStrategy(BaseStrategy):
-    def __init__(self, ai_filter: GeminiFilter):
-        super().__init__("ORB_MES_1min")
+    def __init__(self, ai_filter: GeminiFilter, params: ORBParams = None, symbol: str = None):
+        self.symbol = symbol or TRADING_SYMBOL
+        super().__init__(f"ORB_{self.symbol}_1min")
         self.ai_filter = ai_filter
-        self.db_store = DuckDBStore()
+        self.db_store = get_store()
+        self.metrics = get_metrics()
         
         # State
         self.orb_high = None
@@ -23,16 +51,28 @@ class ORBStrategy(BaseStrategy):
         self.active_position = None
         
         # Params
-        self.ema_period = 20
-        self.atr_period = 14
-        self.atr_min = 0.6
-        self.atr_max = 4.0
+        self.params = params or ORBParams()
+        self.ema_period = self.params.ema_period
+        self.atr_period = self.params.atr_period
+        self.atr_min = self.params.atr_min
+        self.atr_max = self.params.atr_max
+        self.orb_minutes = self.params.orb_minutes
+        self.min_bars = self.params.min_bars
+        
+        # Streaming indicators (O(1) per bar)
+        self.ema = EMA(self.ema_period)
+        self.atr = ATR(self.atr_period, method=self.params.atr_method)
+        self.last_bar_ns = None # wall-clock ns of the last bar fed to the indicators
+        self.last_signal_bar_ns = None # bar that last produced a signal (partial or completed)
+        self.last_price = None # latest trade tick
+        self.last_state = None # last state row logged live (also pushed to the dashboard feed)
         
         # Windows
-        self.orb_starts = sorted(MULTI_ORB_STARTS)
-        logger.info(f"ORB Strategy initialized with {len(self.orb_starts)} windows: {self.orb_starts}")
-        logger.info(f"Trading End / Force Close time set to: {FORCE_CLOSE_TIME}")
-        self.trading_end = FORCE_CLOSE_TIME
+        self.orb_starts = sorted(self.params.orb_starts)
+        logger.info(f"ORB Strategy ({self.symbol}) initialized with {len(self.orb_starts)} windows: {self.orb_starts}")
+        logger.info(f"Trading End / Force Close time set to: {self.params.trading_end}")
+        self.trading_end = self.params.trading_end
+        self.schedule = SessionSchedule.from_params(self.params)
         
     def _reset_daily(self, current_date):
         logger.info(f"Resetting Strategy for {current_date}")
@@ -41,6 +81,7 @@ class ORBStrategy(BaseStrategy):
         self.current_window_start = None
         self.daily_reset_date = current_date
         self.active_position = None
+        self.schedule = SessionSchedule.from_params(self.params)
 
     def on_bar(self, df: pd.DataFrame, replaying: bool = False) -> Optional[Dict[str, Any]]:
         if df.empty:
@@ -48,21 +89,29 @@ class ORBStrategy(BaseStrategy):
             
         current_bar = df.iloc[-1]
         current_time = current_bar.name.to_pydatetime() # Index is datetime
+
         current_date = current_time.date()
         current_time_time = current_time.time()
         
         if self.daily_reset_date != current_date:
             self._reset_daily(current_date)
 
+        # Update indicators once per bar (a revised bar with the same timestamp is not re-counted)
+        bar_ns, _ = to_wall_ns(current_time)
+        if self.last_bar_ns is None or bar_ns > self.last_bar_ns:
+            t0 = perf_counter_ns()
+            self.ema.update(current_bar['close'])
+            self.atr.update(current_bar['high'], current_bar['low'], current_bar['close'])
+            self.last_bar_ns = bar_ns
+            if not replaying:
+                self.metrics.since('indicators', t0)
+
         signal = None
-        # Detect current ORB window
-        active_window_start = None
-        for start in reversed(self.orb_starts):
-            if current_time_time >= start:
-                active_window_start = start
-                break
+        # Window / phase of this bar from today's schedule (one bisect)
+        window, phase, _ = self.schedule.classify(minute_of_day(current_time))
+        active_window_start = self.orb_starts[window] if window >= 0 else None
         
-        if active_window_start and active_window_start != self.current_window_start:
+        if active_window_start is not None and active_window_start != self.current_window_start:
             prefix = "[REPLAY] " if replaying else ""
             logger.info(f"{prefix}New ORB Window detection: {active_window_start}. Cleared previous levels {self.orb_high}/{self.orb_low}")
             
@@ -70,28 +119,17 @@ class ORBStrategy(BaseStrategy):
             self.orb_low = None
             self.current_window_start = active_window_start
 
-        # Calculate Indicators
-        # We need enough history. If df is small, return.
-        if len(df) < 50:
+        # We need enough history before trusting indicators.
+        if self.ema.count < self.min_bars:
             return None
             
-        df = df.copy()
-        df['ema20'] = df['close'].ewm(span=self.ema_period).mean()
-        df['tr'] = np.maximum(
-            df['high'] - df['low'],
-            np.maximum(
-                abs(df['high'] - df['close'].shift(1)),
-                abs(df['low'] - df['close'].shift(1))
-            )
-        )
-        df['atr14'] = df['tr'].rolling(self.atr_period).mean()
-        
-        latest = df.iloc[-1]
-        ema20 = latest['ema20']
-        atr14 = latest['atr14']
+        latest = current_bar
+        ema20 = self.ema.value
+        atr14 = self.atr.value
         
         # Log state for dashboard
         state_log = {
+            'symbol': self.symbol,
             'orb_high': self.orb_high,
             'orb_low': self.orb_low,
             'ema20': ema20,
@@ -101,14 +139,12 @@ class ORBStrategy(BaseStrategy):
             'active_window': self.current_window_start
         }
 
-        if not active_window_start:
-            self.db_store.insert_strategy_state(current_time, state_log)
+        if active_window_start is None:
+            self._log_state(current_time, state_log, replaying)
             return None
 
-        orb_end_time = (datetime.combine(datetime.today(), active_window_start) + timedelta(minutes=15)).time()
-
         # 1. Update ORB
-        if active_window_start <= current_time_time < orb_end_time:
+        if phase == FORMING:
             # Accumulating ORB
             if self.orb_high is None:
                 self.orb_high = current_bar['high']
@@ -120,100 +156,269 @@ class ORBStrategy(BaseStrategy):
             state_log['orb_high'] = self.orb_high
             state_log['orb_low'] = self.orb_low
         
-        elif current_time_time >= orb_end_time:
-             if current_time_time < self.trading_end:
+        else:
+             if phase == TRADING:
                  if not self.orb_high:
                      # Should have formed, but maybe data missing
                      state_log['status'] = 'ORB_FAILED'
                  else:
                      state_log['status'] = 'TRADING'
                      
-                     # Periodically log monitoring status (every 10 mins)
-                     if not replaying and current_time_time.second == 0 and current_time_time.minute % 10 == 0:
-                         logger.info(f"Monitoring breakout for {active_window_start} session. Range: {self.orb_low} - {self.orb_high}. Price: {latest['close']}")
+                     # Periodically log monitoring status (sampled: at most every 10 mins)
+                     if not replaying:
+                         logger.info("Monitoring breakout for %s session. Range: %s - %s. Price: %s",
+                                     active_window_start, self.orb_low, self.orb_high, latest['close'], extra={'every': 600})
 
                      # Generate Signal checks
-                     signal = self._check_entry(latest, ema20, atr14)
+                     t0 = perf_counter_ns()
+                     signal = self._check_entry(latest['close'], latest.name, ema20, atr14)
+                     if not replaying:
+                         self.metrics.since('check_entry', t0)
+                     if signal and bar_ns == self.last_signal_bar_ns:
+                         # Already fired from the forming bar
+                         signal = None
+                     elif signal:
+                         self.last_signal_bar_ns = bar_ns
+                     if not signal and not replaying:
+                          self._prefetch(current_time, active_window_start, latest['close'], ema20, atr14)
                      if signal:
-                          # Add AI Filter
                           if replaying:
                               # Skip AI during replay to save quota and avoid old order triggers
-                              self.db_store.insert_strategy_state(current_time, state_log)
+                              self._log_state(current_time, state_log, replaying)
                               return None
 
-                          context = {
-                              'time': str(current_time),
-                              'signal': signal['base_signal'],
-                              'market_data': {
-                                  'close': latest['close'],
-                                  'atr14': atr14,
-                                  'ema20': ema20,
-                                  'dist_orb_high': latest['close'] - self.orb_high,
-                                  'dist_orb_low': self.orb_low - latest['close']
-                              },
-                              'pnl': 0.0,
-                              'risk_state': {} 
-                          }
-                          
-                          ai_result = self.ai_filter.analyze_signal(context)
-                          signal['ai_decision'] = ai_result['decision']
-                          signal['ai_rationale'] = ai_result['rationale']
-                          signal['raw_json'] = ai_result.get('raw_json', '')
-                          
-                          if signal['ai_decision'] == 'DENY':
-                              logger.info(f"Signal Denied by AI: {ai_result['rationale']}")
-                              signal = None
-                          else:
-                              logger.info(f"Signal Approved by AI ({signal['ai_decision']})")
-                              state_log['active_signal_id'] = signal['signal_id']
-                              # Explicitly save signal to DB for dashboard
-                              self.db_store.insert_signal(signal)
+                          # AI filter runs off-loop: the caller awaits filter_signal() before executing
+                          signal['ai_context'] = self._ai_context(
+                              current_time, signal['base_signal'], active_window_start, latest['close'], ema20, atr14
+                          )
+                          state_log['active_signal_id'] = signal['signal_id']
              else:
                  # Past trading end
-                 if not replaying and current_time_time.second == 0 and current_time_time.minute % 5 == 0: # Reduce log spam
-                     logger.debug(f"Time {current_time_time} is past Trading End {self.trading_end}. Window {active_window_start} ignored.")
+                 if not replaying: # sampled to reduce log spam
+                     logger.debug("Time %s is past Trading End %s. Window %s ignored.",
+                                  current_time_time, self.trading_end, active_window_start, extra={'every': 300})
                  state_log['status'] = 'WAITING'
 
-        self.db_store.insert_strategy_state(current_time, state_log)
+        self._log_state(current_time, state_log, replaying)
+        return signal
+
+    def on_partial_bar(self, bar: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        The still-forming 1-min bar built from ticks (TickStream's bar dict, called per tick).
+        Breakout check only, against the ORB / indicators of the completed bars so far;
+        indicators, ORB and state move on completed bars only. Scalars, no DataFrame per tick.
+        """
+        bar_time = bar['time']
+        current_time = bar_time.to_pydatetime()
+        if self.ema.count < self.min_bars or not self.orb_high or self.current_window_start is None:
+            return None
+        if self.daily_reset_date != current_time.date():
+            return None
+
+        # The window must still be the active one for this minute, past its ORB
+        window, phase, _ = self.schedule.classify(minute_of_day(current_time))
+        if phase != TRADING or self.orb_starts[window] != self.current_window_start:
+            return None
+        window = self.current_window_start
+
+        bar_ns, _ = to_wall_ns(current_time)
+        if bar_ns == self.last_signal_bar_ns:
+            return None
+
+        ema20 = self.ema.value
+        atr14 = self.atr.value
+        signal = self._check_entry(bar['close'], bar_time, ema20, atr14)
+        if signal:
+            self.last_signal_bar_ns = bar_ns
+            signal['ai_context'] = self._ai_context(
+                current_time, signal['base_signal'], window, bar['close'], ema20, atr14
+            )
         return signal
 
-    def _check_entry(self, bar, ema20, atr14) -> Optional[Dict[str, Any]]:
+    def _ai_context(self, current_time, direction: str, window, close: float, ema20: float, atr14: float) -> Dict[str, Any]:
+        return {
+            'time': str(current_time),
+            'symbol': self.symbol,
+            'signal': direction,
+            'window': str(window),
+            'market_data': {
+                'close': close,
+                'atr14': atr14,
+                'ema20': ema20,
+                'dist_orb_high': close - self.orb_high,
+                'dist_orb_low': self.orb_low - close
+            },
+            'pnl': 0.0,
+            'risk_state': {} 
+        }
+
+    def _prefetch(self, current_time, window, close: float, ema20: float, atr14: float):
+        """
+        Price within AI_PREFETCH_ATR_FRACTION * ATR of an ORB level: have the filter evaluate the
+        breakout that would fire next (close just past level + buffer) in the background,
+        so the verdict is cached / in flight when the signal comes. Otherwise drop pending prefetches.
+        """
+        band = AI_PREFETCH_ATR_FRACTION * atr14
+        p = self.params
+        contexts = []
+        if band > 0 and p.atr_min <= atr14 <= p.atr_max:
+            # Smallest close that would trigger, or the current one if already past it
+            long_close = max(close, self.orb_high + p.breakout_buffer + TICK)
+            short_close = min(close, self.orb_low - p.breakout_buffer - TICK)
+            if abs(self.orb_high - close) <= band and long_close > ema20:
+                contexts.append(self._ai_context(current_time, 'BUY', window, long_close, ema20, atr14))
+            if abs(close - self.orb_low) <= band and short_close < ema20:
+                contexts.append(self._ai_context(current_time, 'SELL', window, short_close, ema20, atr14))
+        self.ai_filter.prefetch(contexts, self.symbol)
+
+    async def filter_signal(self, signal: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Runs the AI filter on a signal from on_bar without blocking the event loop
+        (deadline / fallback decision handled by the filter). Returns None if denied.
+        """
+        t0 = perf_counter_ns()
+        ai_result = await self.ai_filter.analyze_signal_async(signal.pop('ai_context'))
+        self.metrics.since('ai_filter', t0)
+        signal['ai_decision'] = ai_result['decision']
+        signal['ai_rationale'] = ai_result['rationale']
+        signal['raw_json'] = ai_result.get('raw_json', '')
+        
+        if signal['ai_decision'] == 'DENY':
+            logger.info(f"Signal Denied by AI: {ai_result['rationale']}")
+            return None
+        
+        logger.info(f"Signal Approved by AI ({signal['ai_decision']})")
+        # Explicitly save signal to DB for dashboard
+        self.db_store.insert_signal(signal)
+        return signal
+
+    def _log_state(self, current_time, state_log, replaying: bool):
+        # Replayed bars were already logged by the run that saw them live
+        if not replaying:
+            self.db_store.insert_strategy_state(current_time, state_log)
+            self.last_state = {'timestamp': current_time, **state_log}
+
+    def get_state(self) -> Dict[str, Any]:
+        """Everything needed to resume without replaying the day (see CheckpointStore)."""
+        return {
+            'orb_high': self.orb_high,
+            'orb_low': self.orb_low,
+            'current_window_start': self.current_window_start,
+            'daily_reset_date': self.daily_reset_date,
+            'active_position': self.active_position,
+            'last_bar_ns': self.last_bar_ns,
+            'last_signal_bar_ns': self.last_signal_bar_ns,
+            'ema': copy.deepcopy(self.ema),
+            'atr': copy.deepcopy(self.atr),
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.orb_high = state['orb_high']
+        self.orb_low = state['orb_low']
+        self.current_window_start = state['current_window_start']
+        self.daily_reset_date = state['daily_reset_date']
+        self.schedule = SessionSchedule.from_params(self.params)
+        self.active_position = state['active_position']
+        self.last_bar_ns = state['last_bar_ns']
+        self.last_signal_bar_ns = state.get('last_signal_bar_ns')
+        self.ema = state['ema']
+        self.atr = state['atr']
+
+    def restore(self, state: Optional[Dict[str, Any]], bars: np.ndarray) -> bool:
+        """
+        Resumes from a checkpoint and replays only the bars after it.
+        Returns False (nothing changed) if the checkpoint doesn't connect to this history.
+        """
+        if not state or len(bars) == 0 or state.get('last_bar_ns') is None:
+            return False
+        last_ns = state['last_bar_ns']
+        times = bars['time']
+        # Indicators are only continuous if the checkpointed bar is part of this history
+        if last_ns < times[0] or last_ns > times[-1]:
+            return False
+
+        self.load_state(state)
+        tail = bars[times > last_ns]
+        self.replay(tail)
+        logger.info(f"[RESTORE] Resumed from checkpoint at {pd.Timestamp(last_ns)}, replayed {len(tail)} bars")
+        return True
+
+    def catch_up(self, bars: np.ndarray):
+        """
+        Vectorized equivalent of replaying on_bar(replaying=True) over the history:
+        only the ORB levels of the last bar's window (on the last bar's day) survive a replay,
+        so compute just those with array ops.
+        """
+        if len(bars) == 0:
+            return
+
+        times = bars['time']
+        days = times // NS_PER_DAY
+        minutes = (times // NS_PER_MINUTE) % 1440
+        
+        last_time = pd.Timestamp(int(times[-1])).to_pydatetime()
+        self._reset_daily(last_time.date())
+        
+        # Indicators: one vectorized pass over the whole history
+        self.ema.warm_up(bars['close'])
+        self.atr.warm_up(bars['high'], bars['low'], bars['close'])
+        self.last_bar_ns = int(times[-1])
+        
+        # Active window / phase per bar (-1 = before the first window of the day)
+        windows, phases = self.schedule.classify_array(minutes)
+        last_window = windows[-1]
+        if last_window < 0:
+            return
+        self.current_window_start = self.orb_starts[last_window]
+
+        # Replay skips the ORB update until min_bars of history are available
+        warm = np.arange(len(bars)) >= self.min_bars - 1
+        forming = (days == days[-1]) & (windows == last_window) & (phases == FORMING) & warm
+        if forming.any():
+            self.orb_high = float(bars['high'][forming].max())
+            self.orb_low = float(bars['low'][forming].min())
+
+        logger.info(f"[CATCH-UP] {len(bars)} bars -> window {self.current_window_start}, ORB {self.orb_low} - {self.orb_high}")
+
+    def _check_entry(self, close: float, bar_time: pd.Timestamp, ema20, atr14) -> Optional[Dict[str, Any]]:
         # Filter: ATR Range
         if not (self.atr_min <= atr14 <= self.atr_max):
             return None
             
-        close = bar['close']
+        p = self.params
         
         # Long
-        if (close > self.orb_high + 0.25) and (close > ema20):
+        if (close > self.orb_high + p.breakout_buffer) and (close > ema20):
              # Basic check to avoid repeating signal same minute? 
              # Logic needs robustness. For MVP, we signal. Executor handles dupes.
-             stop_loss = max(2.5, 1.2 * atr14)
+             stop_loss = max(p.min_stop, p.stop_atr_mult * atr14)
              entry_price = close
              
              return {
-                 'signal_id': f"{bar.name.isoformat()}_LONG",
-                 'timestamp': bar.name.to_pydatetime(),
+                 'signal_id': f"{self.symbol}_{bar_time.isoformat()}_LONG",
+                 'symbol': self.symbol,
+                 'timestamp': bar_time.to_pydatetime(),
                  'base_signal': 'BUY',
                  'entry_price': entry_price,
                  'stop_points': stop_loss,
-                 'take_points': 1.6 * stop_loss,
+                 'take_points': p.tp_mult * stop_loss,
                  'orb_high': self.orb_high,
                  'orb_low': self.orb_low
              }
 
         # Short
-        elif (close < self.orb_low - 0.25) and (close < ema20):
-             stop_loss = max(2.5, 1.2 * atr14)
+        elif (close < self.orb_low - p.breakout_buffer) and (close < ema20):
+             stop_loss = max(p.min_stop, p.stop_atr_mult * atr14)
              entry_price = close
              
              return {
-                 'signal_id': f"{bar.name.isoformat()}_SHORT",
-                 'timestamp': bar.name.to_pydatetime(),
+                 'signal_id': f"{self.symbol}_{bar_time.isoformat()}_SHORT",
+                 'symbol': self.symbol,
+                 'timestamp': bar_time.to_pydatetime(),
                  'base_signal': 'SELL',
                  'entry_price': entry_price,
                  'stop_points': stop_loss,
-                 'take_points': 1.6 * stop_loss,
+                 'take_points': p.tp_mult * stop_loss,
                  'orb_high': self.orb_high,
                  'orb_low': self.orb_low
              }
@@ -221,4 +426,4 @@ class ORBStrategy(BaseStrategy):
         return None
 
     def on_tick(self, tick):
-        pass
+        self.last_price = tick['price']
@@ -0,0 +1,62 @@
+from bisect import bisect_right
+from datetime import time
+from typing import List, Tuple
+
+import numpy as np
+
+# Session schedule: ORB windows and the trading cutoff as minute-of-day arrays.
+# Built once per day (ORBStrategy._reset_daily); classifying a bar is one bisect.
+# The backtest uses classify_array() on the same arrays, so live and vectorized phases agree.
+
+# Phases
+PRE = 0 # before the first window of the day
+FORMING = 1 # inside a window's ORB range
+TRADING = 2 # ORB done, before trading_end
+CLOSED = 3 # past trading_end until the next window
+
+PHASE_NAMES = ('PRE', 'FORMING_ORB', 'TRADING', 'CLOSED')
+
+MINUTES_PER_DAY = 1440
+
+def minute_of_day(t) -> int:
+    return t.hour * 60 + t.minute
+
+class SessionSchedule:
+    def __init__(self, orb_starts: List[time], orb_minutes: int, trading_end: time):
+        self.orb_starts = sorted(orb_starts)
+        self._starts = [minute_of_day(t) for t in self.orb_starts]
+        self._ends = [s + orb_minutes for s in self._starts]
+        self.starts = np.array(self._starts, dtype=np.int64)
+        self.orb_ends = np.array(self._ends, dtype=np.int64)
+        self.trading_end = minute_of_day(trading_end)
+
+    @classmethod
+    def from_params(cls, params) -> "SessionSchedule":
+        """From an ORBParams (same fields the strategy and backtest use)."""
+        return cls(params.orb_starts, params.orb_minutes, params.trading_end)
+
+    def classify(self, minute: int) -> Tuple[int, int, int]:
+        """
+        (window index or -1, phase, deadline minute) for a minute of day.
+        deadline = when the phase ends: ORB end, trading_end, or the next window start.
+        """
+        w = bisect_right(self._starts, minute) - 1
+        if w < 0:
+            return -1, PRE, self._starts[0] if self._starts else MINUTES_PER_DAY
+        if minute < self._ends[w]:
+            return w, FORMING, self._ends[w]
+        if minute < self.trading_end:
+            return w, TRADING, self.trading_end
+        next_start = self._starts[w + 1] if w + 1 < len(self._starts) else MINUTES_PER_DAY
+        return w, CLOSED, next_start
+
+    def classify_array(self, minutes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized classify(): (window index, phase) per element."""
+        window = np.searchsorted(self.starts, minutes, side='right') - 1
+        ends = self.orb_ends[np.clip(window, 0, None)] if len(self.starts) else np.zeros_like(minutes)
+        phase = np.select(
+            [window < 0, minutes < ends, minutes < self.trading_end],
+            [PRE, FORMING, TRADING],
+            CLOSED
+        )
+        return window, phase
@@ -1,12 +1,165 @@
+import atexit
+import json
 import logging
+import queue
 import sys
+import time
+from datetime import datetime, timedelta
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
-from .config import LOG_DIR
+from typing import Dict, Optional
+from .config import LOG_DIR, LOG_MAX_BYTES, LOG_BACKUP_COUNT, LOG_JSON, LOG_FILES, LOG_QUEUE_SIZE
+
+STRUCTURED_DIR = LOG_DIR / "structured"
+
+class SizeTimeRotatingHandler(RotatingFileHandler):
+    """app.log -> app.log.1 ... when it passes max_bytes or at midnight, whichever comes first."""
+    def __init__(self, filename, max_bytes: int, backup_count: int):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count)
+        self._rollover_at = self._next_midnight()
+
+    @staticmethod
+    def _next_midnight() -> float:
+        tomorrow = datetime.now() + timedelta(days=1)
+        return tomorrow.replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+    def shouldRollover(self, record) -> bool:
+        if record.created >= self._rollover_at:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self._rollover_at = self._next_midnight()
+
+class JsonLinesHandler(logging.Handler):
+    """
+    Structured sink for searching logs by level / component across days:
+        logs/structured/<YYYY-MM-DD>/<LEVEL>.jsonl   {"ts", "level", "component", "msg"}
+    Splitting files by level is the index: "errors of the last week" only opens the ERROR files.
+    Component is the module that logged (bars, orb_strategy, executor, ...).
+    """
+    def __init__(self, root: Path = STRUCTURED_DIR):
+        super().__init__()
+        self.root = Path(root)
+        self._files = {} # level -> open file of the current day
+        self._day = None
+
+    def _file(self, level: str, day: str):
+        if day != self._day:
+            self._close_files()
+            self._day = day
+        f = self._files.get(level)
+        if f is None:
+            folder = self.root / day
+            folder.mkdir(parents=True, exist_ok=True)
+            f = self._files[level] = open(folder / f"{level}.jsonl", 'a', buffering=1)
+        return f
+
+    def emit(self, record):
+        try:
+            created = datetime.fromtimestamp(record.created)
+            line = json.dumps({
+                'ts': created.isoformat(timespec='milliseconds'),
+                'level': record.levelname,
+                'component': record.module,
+                'msg': record.getMessage(),
+            })
+            self._file(record.levelname, created.strftime("%Y-%m-%d")).write(line + "\n")
+        except Exception:
+            self.handleError(record)
+
+    def _close_files(self):
+        for f in self._files.values():
+            f.close()
+        self._files.clear()
+
+    def close(self):
+        self.acquire()
+        try:
+            self._close_files()
+        finally:
+            self.release()
+        super().close()
+
+class RateLimitFilter(logging.Filter):
+    """
+    Sampling for hot-path messages: logger.info(..., extra={'every': 60}) passes at most once per
+    60s per call site; the next one that passes says how many were suppressed in between.
+    Records without 'every' always pass.
+    """
+    def __init__(self):
+        super().__init__()
+        self._last = {} # (pathname, lineno) -> (monotonic of last pass, suppressed since)
+        self.suppressed = 0
+
+    def filter(self, record) -> bool:
+        every = getattr(record, 'every', None)
+        if every is None:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        last, skipped = self._last.get(key, (None, 0))
+        if last is not None and now - last < every:
+            self._last[key] = (last, skipped + 1)
+            self.suppressed += 1
+            return False
+        self._last[key] = (now, 0)
+        if skipped:
+            record.msg = f"{record.msg} (+{skipped} suppressed)"
+        return True
+
+# Args that can't change between the log call and the listener formatting them
+_IMMUTABLE = (str, int, float, bool, type(None))
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Caller side of the log queue: enqueues the record and returns, never blocks.
+    Message formatting is left to the listener thread (lazy %-style args stay unformatted here);
+    when the bounded queue is full the record is dropped and counted, and a warning with the
+    count goes out once there is room again.
+    """
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+        self._reported = 0
+
+    def prepare(self, record):
+        # Same process: no pickling, so keep the record as is. Only snapshot the message when an
+        # arg is mutable (it could change before the listener gets to it).
+        if record.args and not (isinstance(record.args, tuple) and all(isinstance(a, _IMMUTABLE) for a in record.args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            if self.dropped > self._reported:
+                # Report the gap ahead of the first record that fits again
+                lost = self.dropped - self._reported
+                self.queue.put_nowait(logging.LogRecord(record.name, logging.WARNING, __file__, 0,
+                                                        "Log queue full: dropped %d record(s)", (lost,), None))
+                self._reported += lost
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+class LogListener(QueueListener):
+    """QueueListener whose stop() waits for room for the sentinel instead of failing on a full queue."""
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)
+
+_listener: Optional[QueueListener] = None
 
 def setup_logger(name="ibkr_bot", level=logging.INFO):
+    """
+    The logger only holds a DroppingQueueHandler; console / file / JSONL writes happen on a
+    QueueListener thread, so a log call on the event loop costs a record + a queue put.
+    """
+    global _listener
     logger = logging.getLogger(name)
     logger.setLevel(level)
-    
+
     # Avoid duplicate handlers
     if logger.hasHandlers():
         return logger
@@ -18,14 +171,43 @@ def setup_logger(name="ibkr_bot", level=logging.INFO):
     # Console Handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
+
+    if LOG_FILES:
+        # File Handler, rotated by size and at midnight (the dashboard tails it, see dashboard/logs.py)
+        log_file = LOG_DIR / "app.log"
+        file_handler = SizeTimeRotatingHandler(log_file, LOG_MAX_BYTES, LOG_BACKUP_COUNT)
+        file_handler.setFormatter(formatter)
+        handlers.append(file_handler)
 
-    # File Handler
-    log_file = LOG_DIR / "app.log"
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
+        if LOG_JSON:
+            handlers.append(JsonLinesHandler())
 
+    queue_handler = DroppingQueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RateLimitFilter())
+    logger.addHandler(queue_handler)
+    _listener = LogListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
     return logger
 
+def stop_logging():
+    """Flushes what's queued and stops the listener thread (also runs at exit)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+def log_stats() -> Dict[str, int]:
+    handler = next((h for h in logger.handlers if isinstance(h, DroppingQueueHandler)), None)
+    if handler is None:
+        return {}
+    return {
+        'queued': handler.queue.qsize(),
+        'dropped': handler.dropped,
+        'suppressed': sum(f.suppressed for f in handler.filters if isinstance(f, RateLimitFilter)),
+    }
+
 logger = setup_logger()
@@ -0,0 +1,35 @@
+import os
+
+# No logs/app.log or logs/structured/ from test runs; set before anything imports src.utils
+os.environ.setdefault("LOG_FILES", "0")
+
+import numpy as np
+import pytest
+from datetime import datetime, time, timedelta
+
+from src.market.bars import BAR_DTYPE, to_wall_ns
+from src.strategy.orb_strategy import ORBParams
+
+def _bars(days=3, seed=3):
+    """Random-walk 1-min bars from 04:00 to 11:00 on consecutive days."""
+    rng = np.random.default_rng(seed)
+    rows = []
+    price = 5000.0
+    for d in range(days):
+        t = datetime(2026, 1, 5 + d, 4, 0)
+        while t.time() < time(11, 0):
+            o = price
+            price += rng.normal(0, 1.2)
+            rows.append((to_wall_ns(t)[0], o, max(o, price) + abs(rng.normal(0, 0.4)),
+                         min(o, price) - abs(rng.normal(0, 0.4)), price, 100))
+            t += timedelta(minutes=1)
+    return np.array(rows, dtype=BAR_DTYPE)
+
+@pytest.fixture
+def make_bars():
+    """make_bars(days=3, seed=3) -> BAR_DTYPE array shared by the strategy / backtest tests."""
+    return _bars
+
+@pytest.fixture
+def orb_params():
+    return ORBParams(orb_starts=[time(6, 30), time(8, 0), time(9, 30)], trading_end=time(10, 25))
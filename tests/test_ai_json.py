@@ -1,6 +1,10 @@
 import pytest
 import json
-from src.ai.gemini_filter import GeminiFilter
+import asyncio
+import time
+import numpy as np
+from src.ai.gemini_filter import GeminiFilter, GeminiBackend
+from src.ai.local_model import LocalScoreBackend, fit_logistic, features
 
 class MockResponse:
     def __init__(self, text):
@@ -13,11 +17,34 @@ class MockModel:
     def generate_content(self, *args, **kwargs):
         return MockResponse(self.output_text)
 
+class MockClient:
+    def __init__(self, output_text):
+        self.models = MockModel(output_text)
+
+class SlowBackend(GeminiBackend):
+    def __init__(self, delay, result):
+        super().__init__(api_key=None)
+        self.client = object()
+        self.delay = delay
+        self.result = result
+        self.calls = []
+
+    def evaluate(self, context):
+        self.calls.append(context['signal'])
+        time.sleep(self.delay)
+        return dict(self.result)
+
+def _filter(output_text):
+    backend = GeminiBackend(api_key=None)
+    backend.client = MockClient(output_text)
+    return GeminiFilter(backend=backend, fallback=None)
+
+CONTEXT = {'signal': 'BUY', 'window': '06:30:00', 'market_data': {
+    'close': 5010.5, 'atr14': 2.0, 'ema20': 5005.0, 'dist_orb_high': 0.5, 'dist_orb_low': 10.5}}
+
 def test_ai_valid_json():
     # Setup
-    f = GeminiFilter()
-    f.enabled = True
-    f.model = MockModel('{"decision": "ALLOW", "rationale": "Looks good", "confidence": 0.9}')
+    f = _filter('{"decision": "ALLOW", "rationale": "Looks good", "confidence": 0.9}')
     
     # Execute
     res = f.analyze_signal({'context': 'test'})
@@ -28,9 +55,7 @@ def test_ai_valid_json():
 
 def test_ai_invalid_json():
     # Setup
-    f = GeminiFilter()
-    f.enabled = True
-    f.model = MockModel('INVALID JSON')
+    f = _filter('INVALID JSON')
     
     # Execute
     res = f.analyze_signal({'context': 'test'})
@@ -38,3 +63,67 @@ def test_ai_invalid_json():
     # Verify (Default Fallback)
     assert res['decision'] == 'ALLOW'
     assert res['rationale'] == 'AI Disabled or Failed'
+
+def test_ai_async_deadline_fallback():
+    f = GeminiFilter(deadline=0.1, timeout_decision='DENY', backend=SlowBackend(0.5, {'decision': 'ALLOW'}), fallback=None)
+
+    res = asyncio.run(f.analyze_signal_async(CONTEXT))
+
+    assert res['decision'] == 'DENY'
+    assert res['rationale'] == 'AI Timeout'
+
+def test_ai_signal_reuses_prefetch():
+    backend = SlowBackend(0.05, {'decision': 'DENY', 'rationale': 'prefetched', 'confidence': 0.8, 'raw_json': ''})
+    f = GeminiFilter(backend=backend, fallback=None)
+
+    async def run():
+        f.prefetch([CONTEXT])
+        await asyncio.sleep(0) # signal fires while the prefetch is in flight
+        return await f.analyze_signal_async(CONTEXT)
+
+    res = asyncio.run(run())
+    assert res['rationale'] == 'prefetched'
+    assert backend.calls == ['BUY']
+    assert f.prefetch_hits == 1
+
+def test_prefetch_keeps_other_symbols_in_flight():
+    backend = SlowBackend(0.05, {'decision': 'DENY', 'rationale': 'prefetched', 'confidence': 0.8, 'raw_json': ''})
+    f = GeminiFilter(backend=backend, fallback=None)
+    mes = {**CONTEXT, 'symbol': 'MES'}
+
+    async def run():
+        f.prefetch([mes], 'MES')
+        f.prefetch([], 'MNQ') # MNQ bar with nothing near a level
+        assert len(f._prefetching) == 1
+        await asyncio.sleep(0.2)
+        f.prefetch([], 'MES') # MES moved away: only now is its prefetch dropped
+        return f.cache.contains(f.cache.key(mes))
+
+    assert asyncio.run(run())
+    assert backend.calls == ['BUY']
+
+def _local_model():
+    # Wins when the breakout is small, losses when price is already stretched
+    rng = np.random.default_rng(0)
+    orb_dist = rng.uniform(0, 3, 400)
+    X = np.column_stack([np.full(400, 2.0), rng.uniform(0, 3, 400), orb_dist])
+    y = (orb_dist < 1.5).astype(float)
+    model = fit_logistic(X, y)
+    model.update({'allow_threshold': 0.5, 'deny_threshold': 0.35})
+    return LocalScoreBackend(model=model)
+
+def test_local_backend_on_timeout():
+    local = _local_model()
+    f = GeminiFilter(deadline=0.1, backend=SlowBackend(0.5, {'decision': 'ALLOW'}), fallback=local)
+
+    stretched = {**CONTEXT, 'market_data': {**CONTEXT['market_data'], 'close': 5016.0, 'dist_orb_high': 6.0}}
+    res = asyncio.run(f.analyze_signal_async(stretched))
+
+    assert res['decision'] == 'DENY'
+    assert 'fallback' in res['rationale']
+
+def test_local_backend_scores_vectorized_like_single():
+    local = _local_model()
+    X = features([1, -1], [5010.5, 4990.0], [5005.0, 4995.0], [2.0, 2.0], [5010.0, 5010.0], [4991.0, 4991.0])
+    batch = local.decide(local.score(X))
+    assert batch[0] == local.evaluate(CONTEXT)['decision'] == 'ALLOW'
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime, time
+from unittest.mock import MagicMock, patch
+
+from src.market.bars import BarBuffer, to_wall_ns
+from src.strategy.base_strategy import BaseStrategy
+from src.strategy.orb_strategy import ORBStrategy
+from src.backtest.engine import compute_signals, run_backtest
+
+def _live_signals(bars, params):
+    ai = MagicMock()
+    ai.analyze_signal.return_value = {'decision': 'ALLOW', 'rationale': 'test'}
+    with patch("src.strategy.orb_strategy.get_store"):
+        strategy = ORBStrategy(ai, params)
+
+    buf = BarBuffer(256)
+    signals = []
+    for row in bars:
+        buf.append(pd.Timestamp(int(row['time'])), row['open'], row['high'], row['low'], row['close'], row['volume'])
+        sig = strategy.on_bar(buf.to_frame(1))
+        if sig:
+            signals.append(sig)
+    return signals
+
+def test_vectorized_signals_match_live_strategy(make_bars, orb_params):
+    bars = make_bars()
+    live = _live_signals(bars, orb_params)
+    vec = compute_signals(bars, orb_params)
+
+    assert len(live) > 0
+    assert len(live) == len(vec['index'])
+    for sig, i, d, stop, take in zip(live, vec['index'], vec['direction'], vec['stop_points'], vec['take_points']):
+        assert to_wall_ns(sig['timestamp'])[0] == bars['time'][i]
+        assert sig['base_signal'] == ('BUY' if d > 0 else 'SELL')
+        assert np.isclose(sig['stop_points'], stop)
+        assert np.isclose(sig['take_points'], take)
+
+def test_simulate_one_position_at_a_time(make_bars, orb_params):
+    bars = make_bars()
+    result = run_backtest(bars, orb_params)
+
+    trades = result.trades
+    assert result.summary['trades'] == len(trades)
+    # No overlapping positions
+    assert (trades['entry_time'].iloc[1:].values >= trades['exit_time'].iloc[:-1].values).all()
+
+def test_local_filter_only_removes_signals(make_bars, orb_params):
+    from src.ai.local_model import LocalScoreBackend
+    from src.backtest.engine import compute_indicators, apply_filter
+
+    bars = make_bars()
+    ind = compute_indicators(bars, orb_params)
+    signals = compute_signals(bars, orb_params, ind)
+    # Denies everything stretched more than ~1 ATR past the ORB
+    model = {'features': ['atr', 'ema_dist', 'orb_dist'], 'mean': [0, 0, 0], 'std': [1, 1, 1],
+             'weights': [0.0, 0.0, -4.0], 'bias': 4.0, 'allow_threshold': 0.5, 'deny_threshold': 0.35}
+    filtered = apply_filter(signals, ind, LocalScoreBackend(model=model))
+
+    assert 0 < len(filtered['index']) < len(signals['index'])
+    assert set(filtered['index']) <= set(signals['index'])
+
+def _strategy(params):
+    with patch("src.strategy.orb_strategy.get_store"):
+        return ORBStrategy(MagicMock(), params)
+
+def test_vectorized_catch_up_matches_bar_by_bar_replay(make_bars, orb_params):
+    bars = make_bars(days=2)
+    day2 = datetime(2026, 1, 6)
+    # History ending before the first window, while an ORB forms, while trading, between windows, after the end
+    for end in (time(5, 0), time(6, 40), time(7, 10), time(9, 35), time(10, 50)):
+        history = bars[bars['time'] <= to_wall_ns(datetime.combine(day2, end))[0]]
+        vectorized, replayed = _strategy(orb_params), _strategy(orb_params)
+        vectorized.catch_up(history)
+        BaseStrategy.catch_up(replayed, history) # default: bar-by-bar replay
+
+        assert vectorized.daily_reset_date == replayed.daily_reset_date
+        assert vectorized.current_window_start == replayed.current_window_start, end
+        assert vectorized.orb_high == replayed.orb_high and vectorized.orb_low == replayed.orb_low, end
+        assert vectorized.last_bar_ns == replayed.last_bar_ns
+        assert np.isclose(vectorized.ema.value, replayed.ema.value)
+        assert np.isclose(vectorized.atr.value, replayed.atr.value)
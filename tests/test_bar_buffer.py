@@ -0,0 +1,69 @@
+import duckdb
+import numpy as np
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from src.market.bars import BarBuffer, BarManager, bars_to_array
+from src.storage.duckdb_store import DuckDBStore
+
+def _fill(buf, n, start=datetime(2026, 1, 2, 6, 0)):
+    for i in range(n):
+        t = start + timedelta(minutes=i)
+        buf.append(t, 100 + i, 101 + i, 99 + i, 100.5 + i, 10)
+
+def test_tail_after_wrap():
+    buf = BarBuffer(capacity=8)
+    _fill(buf, 20)
+
+    assert len(buf) == 8
+    tail = buf.tail(5)
+    assert list(tail['open']) == [115, 116, 117, 118, 119]
+    # Zero-copy view into the ring
+    assert np.shares_memory(tail, buf._data)
+
+def test_revised_bar_overwrites():
+    buf = BarBuffer(capacity=4)
+    t = datetime(2026, 1, 2, 6, 30)
+    buf.append(t, 1, 2, 0.5, 1.5, 10)
+    buf.append(t, 1, 3, 0.5, 2.5, 20)
+
+    assert len(buf) == 1
+    assert buf.tail(1)['close'][0] == 2.5
+
+def test_to_frame_matches_tail():
+    buf = BarBuffer(capacity=16)
+    _fill(buf, 10)
+
+    df = buf.to_frame(3)
+    assert df.index.name == 'date'
+    assert list(df['close']) == [107.5, 108.5, 109.5]
+    assert df.index[-1].to_pydatetime() == datetime(2026, 1, 2, 6, 9)
+
+class _Inline:
+    """Persistence stand-in that runs writes immediately."""
+    def submit(self, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+        return True
+
+def test_history_and_live_bars_stored_in_one_timezone(tmp_path):
+    tz = ZoneInfo("America/Chicago")
+    ib_bars = [
+        SimpleNamespace(date=datetime(2026, 1, 2, 8, 28, tzinfo=tz) + timedelta(minutes=i),
+                        open=1.0, high=2.0, low=0.5, close=1.5, volume=10)
+        for i in range(3)
+    ]
+    manager = BarManager(None, symbol="MES", sec_type="STK")
+    manager.db_store = DuckDBStore(tmp_path / "t.duckdb", flush_rows=1000, flush_interval=60)
+    manager.persistence = _Inline()
+    manager.csv_store = SimpleNamespace(write_bar=lambda bar: None, write_bars=lambda rows, symbol: None)
+    manager.resampler.db_store = None
+
+    history, history_tz = bars_to_array(ib_bars[:2])
+    manager.replay_history(history, history_tz, bulk=False)
+    manager._on_bar_update_event(ib_bars, True)
+    manager.db_store.close()
+
+    with duckdb.connect(str(tmp_path / "t.duckdb"), read_only=True) as conn:
+        times = [r[0] for r in conn.execute("SELECT time FROM bars_1m ORDER BY time").fetchall()]
+    assert times == [datetime(2026, 1, 2, 8, 28), datetime(2026, 1, 2, 8, 29), datetime(2026, 1, 2, 8, 30)]
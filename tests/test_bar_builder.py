@@ -0,0 +1,70 @@
+from datetime import datetime, timezone
+from unittest.mock import MagicMock
+
+from src.market.bars import BarBuffer
+from src.market.ticks import BarBuilder, TickStream, wall_ns
+
+T0 = wall_ns(datetime(2024, 1, 2, 10, 0, 0))
+S = 1_000_000_000
+
+def test_builder_aggregates_and_completes_on_next_interval():
+    b = BarBuilder(5)
+    assert b.add(T0, 100.0, 1) is None
+    assert b.add(T0 + 1 * S, 101.0, 2) is None
+    assert b.add(T0 + 2 * S, 99.5, 1) is None
+    assert b.add(T0 + 4 * S, 100.25, 3) is None
+    assert b.partial()['high'] == 101.0
+
+    done = b.add(T0 + 5 * S, 102.0, 1)
+    assert done['time'] == T0
+    assert (done['open'], done['high'], done['low'], done['close'], done['volume']) == (100.0, 101.0, 99.5, 100.25, 7)
+    assert b.partial()['open'] == 102.0
+    assert len(b.bars) == 1
+
+def test_late_tick_is_dropped():
+    b = BarBuilder(1)
+    b.add(T0 + 2 * S, 100.0, 1)
+    assert b.add(T0, 90.0, 1) is None
+    assert b.low == 100.0
+
+def test_tick_stream_callbacks():
+    bar_manager = MagicMock(symbol="MES")
+    bar_manager.buffer = BarBuffer(16)
+    stream = TickStream(MagicMock(), bar_manager, seconds=[60], mode="tickbytick")
+    ticks, bars = [], []
+    stream.on_tick.append(ticks.append)
+    stream.on_bar.append(lambda s, bar, partial: bars.append((s, bar['close'], partial)))
+
+    stream.process(datetime(2024, 1, 2, 10, 0, 10), 100.0, 1)
+    stream.process(datetime(2024, 1, 2, 10, 0, 50), 101.0, 1)
+    stream.process(datetime(2024, 1, 2, 10, 1, 0), 102.0, 1)
+
+    assert len(ticks) == 3
+    assert bars == [(60, 100.0, True), (60, 101.0, True), (60, 101.0, False), (60, 102.0, True)]
+
+def test_wall_ns_uses_bar_timezone():
+    utc = datetime(2024, 1, 2, 15, 0, tzinfo=timezone.utc)
+    assert wall_ns(utc, timezone.utc) == wall_ns(datetime(2024, 1, 2, 15, 0))
+
+def test_partial_bar_signal_not_repeated_on_close(make_bars, orb_params):
+    import pandas as pd
+    from unittest.mock import patch
+    from src.backtest.engine import compute_signals
+    from src.strategy.orb_strategy import ORBStrategy
+
+    bars = make_bars()
+    i = int(compute_signals(bars, orb_params)['index'][0])
+    with patch("src.strategy.orb_strategy.get_store"):
+        strategy = ORBStrategy(MagicMock(), orb_params)
+    strategy.catch_up(bars[:i])
+
+    row = bars[i]
+    bar = {k: row[k] for k in ('open', 'high', 'low', 'close', 'volume')}
+    bar['time'] = pd.Timestamp(int(row['time']))
+    signal = strategy.on_partial_bar(bar)
+    assert signal is not None and 'ai_context' in signal
+    assert strategy.last_bar_ns == int(bars[i - 1]['time']) # indicators untouched
+    assert strategy.on_partial_bar(bar) is None
+    df = pd.DataFrame({k: [row[k]] for k in ('open', 'high', 'low', 'close', 'volume')},
+                      index=pd.DatetimeIndex([bar['time']], name='date'))
+    assert strategy.on_bar(df) is None
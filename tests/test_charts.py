@@ -0,0 +1,46 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from dashboard import charts
+from dashboard.data import DashboardData
+from src.storage.duckdb_store import DuckDBStore
+
+START = datetime(2026, 1, 5, 0, 0)
+
+def test_pick_bucket_fits_width():
+    assert charts.pick_bucket(START, START + timedelta(hours=6), 1600) == 60
+    assert charts.pick_bucket(START, START + timedelta(days=7), 1600) == 1800
+    assert charts.pick_bucket(START, START + timedelta(days=365), 100) == 604800
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(10000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 50.0
+    idx = charts.lttb(x, y, 200)
+    assert len(idx) == 200 and idx[0] == 0 and idx[-1] == 9999
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    assert len(charts.lttb(x[:50], y[:50], 200)) == 50
+
+def test_chart_aggregates_in_duckdb(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=100000, flush_interval=60)
+    n = 7 * 1440
+    rows = []
+    for i in range(n):
+        t = START + timedelta(minutes=i)
+        rows.append({'time': t, 'open': i, 'high': i + (100 if i == 5000 else 1), 'low': i - 1, 'close': i + 0.5, 'volume': 1})
+        store.insert_strategy_state(t, {'symbol': 'MES', 'status': 'WAITING', 'ema20': float(i)})
+    store.insert_bars(pd.DataFrame(rows), 'MES')
+    store.close()
+
+    bars, ema, bucket = DashboardData(db_path).chart('MES', 7, 1600)
+    assert bucket == 1800
+    assert len(bars) <= 1600 // charts.PX_PER_CANDLE
+    assert bars['volume'].sum() == n # every minute lands in exactly one candle
+    first = bars.iloc[0]
+    assert (first['open'], first['close'], first['low'], first['high']) == (0, 29.5, -1, 30)
+    assert bars['high'].iloc[5000 // 30] == 5100 # the wick survives aggregation
+    assert len(ema) <= 800 and ema['ema20'].iloc[-1] == n - 1
@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock, patch
+
+from src.storage.checkpoint import CheckpointStore
+from src.strategy.orb_strategy import ORBStrategy
+
+def _strategy(params):
+    with patch("src.strategy.orb_strategy.get_store"):
+        return ORBStrategy(MagicMock(), params)
+
+def test_restore_replays_only_newer_bars(tmp_path, make_bars, orb_params):
+    bars = make_bars()
+    before = _strategy(orb_params)
+    before.catch_up(bars[:-50])
+
+    store = CheckpointStore("orb", tmp_path)
+    store.save({'strategy': before.get_state()})
+
+    restored = _strategy(orb_params)
+    assert restored.restore(store.load()['strategy'], bars)
+
+    full = _strategy(orb_params)
+    full.catch_up(bars)
+    for attr in ('orb_high', 'orb_low', 'current_window_start', 'daily_reset_date', 'last_bar_ns'):
+        assert getattr(restored, attr) == getattr(full, attr)
+    assert abs(restored.ema.value - full.ema.value) < 1e-9
+    assert abs(restored.atr.value - full.atr.value) < 1e-9
+
+def test_corrupt_checkpoint_is_ignored(tmp_path):
+    store = CheckpointStore("orb", tmp_path)
+    store.save({'strategy': {}})
+    data = bytearray(store.path.read_bytes())
+    data[-1] ^= 0xFF
+    store.path.write_bytes(bytes(data))
+    assert store.load() is None
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime
+
+from src.storage import csv_store
+from src.storage.csv_store import CSVStore
+from src.storage.pipeline import PersistencePipeline
+
+BAR = {'time': datetime(2026, 1, 2, 6, 30), 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10}
+
+def _lines(tmp_path, category, name):
+    return [p.read_text().splitlines() for p in tmp_path.glob(f"{category}/*/{name}")][0]
+
+def test_lone_rows_are_flushed_by_the_pipeline_timer(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_store, "DATA_DIR", tmp_path)
+    store = CSVStore(flush_rows=100, flush_interval=0.1)
+    pipeline = PersistencePipeline()
+    pipeline.register_periodic(store.flush_due)
+
+    pipeline.submit(store.write_bar, {**BAR, 'symbol': 'MES'})
+    pipeline.drain()
+    assert _lines(tmp_path, "market", "MES_1min.csv") == [] # buffered
+
+    deadline = time.monotonic() + 3
+    while len(_lines(tmp_path, "market", "MES_1min.csv")) < 2:
+        assert time.monotonic() < deadline, "bar row never flushed without another write"
+        time.sleep(0.05)
+    pipeline.close()
+    store.close()
+
+def test_fills_are_written_through(tmp_path, monkeypatch):
+    monkeypatch.setattr(csv_store, "DATA_DIR", tmp_path)
+    store = CSVStore(flush_rows=100, flush_interval=3600)
+    store.write_fill({'execId': 'e1', 'side': 'BOT', 'shares': 1, 'price': 5000.25})
+    assert _lines(tmp_path, "fills", "fills.csv") == ["execId,side,shares,price", "e1,BOT,1,5000.25"]
+    store.close()
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+from dashboard.data import DashboardData
+from src.storage.duckdb_store import DuckDBStore
+
+def _bar(i, symbol="MES"):
+    return {
+        'symbol': symbol, 'time': datetime(2026, 1, 2, 6, 30) + timedelta(minutes=i),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.0 + i, 'volume': 10
+    }
+
+def _write(db_path, bars, states=()):
+    store = DuckDBStore(db_path, flush_rows=10000, flush_interval=60)
+    for b in bars:
+        store.insert_bar(b)
+    for i in states:
+        store.insert_strategy_state(_bar(i)['time'], {'symbol': 'MES', 'status': 'WAITING', 'ema20': float(i)})
+    store.close()
+
+def test_refresh_reads_only_new_rows(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    _write(db_path, [_bar(i) for i in range(30)] + [_bar(0, "MNQ")], states=range(30))
+    data = DashboardData(db_path, bars_limit=20)
+
+    bars, signals, state, state_hist, fills, orders = data.load("MES")
+    assert len(bars) == 20 and bars['close'].iloc[-1] == 30.0
+    assert state['ema20'].iloc[0] == 29.0
+    first = data.stats()['rows_fetched']
+
+    bars, *_ = data.load("MES") # nothing new: only rows at the watermark come back
+    assert data.stats()['rows_fetched'] - first <= 2
+
+    _write(db_path, [_bar(i) for i in range(30, 35)], states=range(30, 35))
+    before = data.stats()['rows_fetched']
+    bars, _, state, state_hist, _, _ = data.load("MES")
+    assert data.stats()['rows_fetched'] - before == 12 # 5 new + watermark row, per table
+    assert len(bars) == 20 and bars['close'].iloc[-1] == 35.0
+    assert bars['time'].is_unique and bars['time'].is_monotonic_increasing
+    assert state['ema20'].iloc[0] == 34.0
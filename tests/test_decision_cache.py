@@ -0,0 +1,52 @@
+import time
+
+from src.ai.decision_cache import DecisionCache
+from src.storage.duckdb_store import DuckDBStore
+
+def _context(close=5010.0, direction='BUY'):
+    return {
+        'signal': direction,
+        'window': '06:30:00',
+        'market_data': {
+            'close': close, 'atr14': 2.0, 'ema20': 5005.0,
+            'dist_orb_high': close - 5008.0, 'dist_orb_low': 5000.0 - close
+        }
+    }
+
+VERDICT = {'decision': 'DENY', 'rationale': 'chop', 'confidence': 0.7, 'raw_json': '{}'}
+
+def test_near_identical_contexts_share_a_key():
+    cache = DecisionCache()
+    assert cache.key(_context(5010.0)) == cache.key(_context(5010.1))
+    assert cache.key(_context(5010.0)) != cache.key(_context(5014.0))
+    assert cache.key(_context(5010.0)) != cache.key(_context(5010.0, 'SELL'))
+
+def test_ttl_and_lru():
+    cache = DecisionCache(ttl=0.05, max_entries=2)
+    a, b, c = (cache.key(_context(p)) for p in (5010.0, 5014.0, 5018.0))
+
+    cache.put(a, VERDICT)
+    assert cache.get(a)['decision'] == 'DENY'
+    time.sleep(0.06)
+    assert cache.get(a) is None
+
+    cache.ttl = 60
+    cache.put(a, VERDICT)
+    cache.put(b, VERDICT)
+    cache.get(a) # a is now most recent
+    cache.put(c, VERDICT)
+    assert cache.get(b) is None
+    assert cache.get(a) is not None
+
+    stats = cache.stats()
+    assert stats['evictions'] == 1 and stats['expirations'] == 1 and stats['hits'] == 3
+
+def test_persisted_decisions_reload(tmp_path):
+    store = DuckDBStore(tmp_path / "t.duckdb")
+    cache = DecisionCache(store=store)
+    key = cache.key(_context())
+    cache.put(key, VERDICT)
+
+    reloaded = DecisionCache(store=store)
+    assert reloaded.get(key)['rationale'] == 'chop'
+    store.close()
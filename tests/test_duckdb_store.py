@@ -0,0 +1,131 @@
+import time
+import pytest
+import duckdb
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from src.config import TRADING_SYMBOL
+from src.storage import duckdb_store
+from src.storage.duckdb_store import DuckDBStore
+
+def _count(db_path, table):
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+
+def _bar(i):
+    return {
+        'time': datetime(2026, 1, 2, 6, 30) + timedelta(minutes=i),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.5, 'volume': 10
+    }
+
+def test_inserts_are_queued_until_flush(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=1000, flush_interval=60)
+
+    for i in range(10):
+        store.insert_bar(_bar(i))
+        store.insert_strategy_state(_bar(i)['time'], {'status': 'WAITING', 'ema20': 1.0})
+    assert store.pending_rows() == 20
+    assert _count(db_path, 'bars_1m') == 0
+
+    store.flush()
+    assert store.pending_rows() == 0
+    assert _count(db_path, 'bars_1m') == 10
+    assert _count(db_path, 'strategy_state') == 10
+    store.close()
+
+def test_bulk_frame_and_duplicate_bars_are_ignored(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=1000, flush_interval=60)
+
+    store.insert_bars(pd.DataFrame([_bar(i) for i in range(5)]))
+    store.insert_bar(_bar(4)) # already in the frame
+    store.insert_bar(_bar(5))
+    store.close() # close flushes
+
+    assert _count(db_path, 'bars_1m') == 6
+
+def test_size_threshold_wakes_writer(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=5, flush_interval=60)
+
+    for i in range(5):
+        store.insert_bar(_bar(i))
+
+    deadline = time.time() + 5
+    while store.pending_rows() and time.time() < deadline:
+        time.sleep(0.01)
+
+    assert store.pending_rows() == 0
+    store.close()
+    assert _count(db_path, 'bars_1m') == 5
+
+def test_bars_are_keyed_by_symbol(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path)
+
+    store.insert_bar({**_bar(0), 'symbol': 'MES'})
+    store.insert_bar({**_bar(0), 'symbol': 'MNQ'}) # same minute, other symbol
+    store.insert_bars(pd.DataFrame([_bar(1)]), symbol='MNQ')
+
+    assert len(store.get_recent_bars(symbol='MNQ')) == 2
+    assert len(store.get_recent_bars(symbol='MES')) == 1
+    store.close()
+
+def test_legacy_bars_table_is_migrated(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    with duckdb.connect(str(db_path)) as conn:
+        conn.execute("""
+            CREATE TABLE bars_1m (time TIMESTAMP, open DOUBLE, high DOUBLE, low DOUBLE,
+                                  close DOUBLE, volume INTEGER, PRIMARY KEY (time))
+        """)
+        conn.execute("INSERT INTO bars_1m VALUES ('2026-01-02 06:30:00', 1, 2, 0.5, 1.5, 10)")
+
+    store = DuckDBStore(db_path)
+    store.insert_bar({**_bar(0), 'symbol': 'MNQ'})
+    store.close()
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        rows = conn.execute("SELECT symbol, count(*) FROM bars_1m GROUP BY symbol ORDER BY symbol").fetchall()
+    assert rows == sorted([(TRADING_SYMBOL, 1), ('MNQ', 1)])
+
+def test_poison_row_is_dropped_after_retries(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=1000, flush_interval=60)
+    for i in range(5):
+        store.insert_bar(_bar(i))
+    store.insert_bar({**_bar(5), 'open': 'not a price'})
+    store.insert_bars(pd.DataFrame([_bar(i) for i in range(6, 9)]))
+
+    for _ in range(2):
+        with pytest.raises(Exception):
+            store.flush()
+        assert store.pending_rows() == 9 # kept for the retry
+    store.flush() # third failure: written row by row
+    assert store.pending_rows() == 0
+    assert store.dropped_rows == 1
+    assert _count(db_path, 'bars_1m') == 8
+    store.close()
+
+    # A poison row still queued at shutdown doesn't take the rest down with it
+    store2 = DuckDBStore(db_path, flush_rows=1000, flush_interval=60)
+    store2.insert_bar({**_bar(20), 'close': 'bad'})
+    store2.insert_bar(_bar(21))
+    store2.close()
+    assert store2.dropped_rows == 1
+    assert _count(db_path, 'bars_1m') == 9
+
+def test_utc_fill_time_stored_as_market_wall_clock(tmp_path, monkeypatch):
+    monkeypatch.setattr(duckdb_store, "MARKET_ZONE", ZoneInfo("America/Chicago"))
+    db_path = tmp_path / "t.duckdb"
+    store = DuckDBStore(db_path, flush_rows=1000, flush_interval=60)
+    store.insert_bar({**_bar(0), 'time': datetime(2026, 1, 2, 6, 30, tzinfo=ZoneInfo("America/Chicago"))})
+    store.insert_fill({'execId': 'e1', 'time': datetime(2026, 1, 2, 12, 30, tzinfo=timezone.utc), 'symbol': 'MES',
+                       'side': 'BOT', 'shares': 1.0, 'price': 1.5, 'permId': 1, 'commission': 0.0})
+    store.close()
+
+    with duckdb.connect(str(db_path), read_only=True) as conn:
+        fill_time = conn.execute("SELECT time FROM fills").fetchone()[0]
+        bar_time = conn.execute("SELECT time FROM bars_1m").fetchone()[0]
+    assert fill_time == bar_time == datetime(2026, 1, 2, 6, 30)
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+
+from src.events.bus import EventBus, DROP_OLDEST, DROP_NEWEST, COALESCE
+from src.events.events import Event, BarClosed, SignalGenerated, RiskBreach
+
+def _bar(symbol, i):
+    return BarClosed(symbol, {'close': float(i)})
+
+def test_slow_consumer_does_not_delay_critical_one():
+    async def run():
+        bus = EventBus()
+        fast, slow = [], []
+
+        def on_fast(e):
+            fast.append(e.bar['close'])
+
+        async def on_slow(e):
+            await asyncio.sleep(0.05)
+            slow.append(e.bar['close'])
+
+        bus.subscribe(BarClosed, on_fast, name="strategy", capacity=0)
+        bus.subscribe(BarClosed, on_slow, name="dashboard", capacity=2, policy=DROP_OLDEST)
+        bus.start()
+        bus.publish(_bar("MES", 0))
+        await asyncio.sleep(0) # slow handler picks up bar 0
+        for i in range(1, 10):
+            bus.publish(_bar("MES", i))
+        await asyncio.sleep(0.01)
+        assert fast == [float(i) for i in range(10)] # all handled while the slow one sleeps
+        await bus.close()
+
+        stats = bus.stats()
+        assert stats['dashboard']['dropped'] == 8
+        assert slow == [0.0, 9.0] # the one in flight + the newest
+        assert stats['strategy']['dropped'] == 0 and stats['strategy']['delivered'] == 10
+    asyncio.run(run())
+
+def test_drop_newest_keeps_one_in_flight_per_symbol():
+    async def run():
+        bus = EventBus()
+        seen = []
+
+        async def on_signal(e):
+            await asyncio.sleep(0.02)
+            seen.append((e.symbol, e.signal['id']))
+
+        for symbol in ("MES", "MNQ"):
+            bus.subscribe(SignalGenerated, on_signal, name=f"ai:{symbol}", capacity=1, policy=DROP_NEWEST, symbol=symbol)
+        bus.start()
+        bus.publish(SignalGenerated("MES", {'id': 1}))
+        bus.publish(SignalGenerated("MNQ", {'id': 1}))
+        await asyncio.sleep(0) # handlers start
+        bus.publish(SignalGenerated("MES", {'id': 2})) # MES busy -> dropped
+        await bus.close()
+        assert sorted(seen) == [("MES", 1), ("MNQ", 1)]
+        assert bus.stats()['ai:MES']['dropped'] == 1
+    asyncio.run(run())
+
+def test_coalesce_replaces_pending_event_with_same_key():
+    async def run():
+        bus = EventBus()
+        seen = []
+        gate = asyncio.Event()
+
+        async def handler(e):
+            await gate.wait()
+            seen.append((e.symbol, e.bar['close']))
+
+        bus.subscribe(BarClosed, handler, name="latest", capacity=3, policy=COALESCE)
+        bus.start()
+        bus.publish(_bar("MES", 0))
+        await asyncio.sleep(0)
+        for i in range(1, 5):
+            bus.publish(_bar("MES", i))
+        bus.publish(_bar("MNQ", 1))
+        gate.set()
+        await bus.close()
+        assert seen == [("MES", 0.0), ("MES", 4.0), ("MNQ", 1.0)]
+    asyncio.run(run())
+
+def test_base_type_subscription_and_thread_publish():
+    async def run():
+        bus = EventBus()
+        seen = []
+        bus.subscribe(Event, lambda e: seen.append(type(e).__name__), name="audit")
+        bus.start()
+        t = threading.Thread(target=lambda: bus.publish(RiskBreach("MES", "Max Position Limit")))
+        t.start()
+        t.join()
+        await asyncio.sleep(0) # cross-thread publishes land on the loop's next iteration
+        bus.publish(_bar("MES", 1))
+        await bus.close()
+        assert seen == ["RiskBreach", "BarClosed"]
+        assert bus.stats()['audit']['latency_max_us'] > 0
+    asyncio.run(run())
@@ -0,0 +1,19 @@
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from src.execution.executor import Executor
+
+def _executor():
+    with patch("src.execution.executor.get_store"), patch("src.execution.executor.get_pipeline"), \
+            patch("src.execution.executor.CSVStore"):
+        return Executor(MagicMock(), MagicMock())
+
+def _trade(order_id, status):
+    return SimpleNamespace(order=SimpleNamespace(orderId=order_id), orderStatus=SimpleNamespace(status=status))
+
+def test_placed_time_dropped_on_terminal_status():
+    executor = _executor()
+    executor._placed_ns.update({1: 10, 2: 20, 3: 30, 4: 40})
+    for order_id, status in ((1, 'Cancelled'), (2, 'ApiCancelled'), (3, 'Inactive'), (4, 'Submitted')):
+        executor._on_order_status(_trade(order_id, status))
+    assert executor._placed_ns == {4: 40} # still working, a fill may come
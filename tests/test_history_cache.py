@@ -0,0 +1,59 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.market.bars import BAR_DTYPE, NS_PER_MINUTE, BarManager, to_wall_ns
+from src.market.history_cache import HistoryCache
+
+T0 = to_wall_ns(datetime(2026, 1, 5, 23, 0))[0]
+
+def _arr(start_min, n):
+    arr = np.zeros(n, dtype=BAR_DTYPE)
+    arr['time'] = T0 + (start_min + np.arange(n)) * NS_PER_MINUTE
+    arr['close'] = start_min + np.arange(n)
+    return arr
+
+def test_store_load_across_days_and_coverage(tmp_path):
+    cache = HistoryCache("MES", root=tmp_path)
+    end = T0 + 120 * NS_PER_MINUTE
+    assert cache.missing_ranges(T0, end) == [(T0, end)]
+
+    # 23:00 - 00:30 spans two day partitions
+    cache.store(_arr(0, 90), covered=(T0, T0 + 90 * NS_PER_MINUTE))
+    assert len(list(tmp_path.glob("MES/*.parquet"))) == 2
+    assert cache.missing_ranges(T0, end) == [(T0 + 90 * NS_PER_MINUTE, end)]
+
+    # Overlapping write: newer values win, no duplicates
+    newer = _arr(80, 20)
+    newer['close'] += 1000
+    cache.store(newer, covered=(T0 + 80 * NS_PER_MINUTE, T0 + 100 * NS_PER_MINUTE))
+    loaded = cache.load(T0, end)
+    assert len(loaded) == 100 and np.all(np.diff(loaded['time']) == NS_PER_MINUTE)
+    assert loaded['close'][79] == 79 and loaded['close'][80] == 1080
+    assert cache.coverage() == [(T0, T0 + 100 * NS_PER_MINUTE)]
+
+    # A hole in the middle of the covered ranges
+    cache.store(_arr(110, 10), covered=(T0 + 110 * NS_PER_MINUTE, end))
+    assert cache.missing_ranges(T0, end) == [(T0 + 100 * NS_PER_MINUTE, T0 + 110 * NS_PER_MINUTE)]
+
+def test_failed_backfill_is_not_recorded_as_covered(tmp_path):
+    responses = []
+
+    async def req(*args, **kwargs):
+        return responses.pop(0)
+
+    manager = BarManager(SimpleNamespace(reqHistoricalDataAsync=req), symbol="MES", sec_type="STK")
+    manager.history_cache = HistoryCache("MES", root=tmp_path)
+    gap = (T0, T0 + 30 * NS_PER_MINUTE)
+
+    responses.append([]) # error / timeout / pacing: IB hands back no bars
+    assert len(asyncio.run(manager._backfill(*gap))) == 0
+    assert manager.history_cache.missing_ranges(*gap) == [gap]
+
+    start = datetime(2026, 1, 5, 23, 0)
+    responses.append([SimpleNamespace(date=start + timedelta(minutes=i), open=1.0, high=1.0, low=1.0, close=1.0, volume=1)
+                      for i in range(30)])
+    assert len(asyncio.run(manager._backfill(*gap))) == 30
+    assert manager.history_cache.missing_ranges(*gap) == []
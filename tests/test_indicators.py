@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategy.indicators import EMA, ATR, RSI, VWAP
+
+def _ohlc(n=300, seed=7):
+    rng = np.random.default_rng(seed)
+    close = 5000 + np.cumsum(rng.normal(0, 1, n))
+    high = close + np.abs(rng.normal(0, 1, n))
+    low = close - np.abs(rng.normal(0, 1, n))
+    return high, low, close
+
+def test_ema_matches_pandas_full_series():
+    _, _, close = _ohlc()
+    ema = EMA(20)
+    for x in close:
+        ema.update(x)
+
+    expected = pd.Series(close).ewm(span=20).mean().iloc[-1]
+    assert ema.value == pytest.approx(expected)
+
+def test_atr_matches_rolling_mean():
+    high, low, close = _ohlc()
+    atr = ATR(14)
+    for h, l, c in zip(high, low, close):
+        atr.update(h, l, c)
+
+    prev = pd.Series(close).shift(1)
+    tr = np.maximum(high - low, np.maximum(abs(high - prev), abs(low - prev)))
+    assert atr.value == pytest.approx(pd.Series(tr).rolling(14).mean().iloc[-1])
+
+@pytest.mark.parametrize("factory, feed", [
+    (lambda: EMA(20), lambda ind, h, l, c: ind.update(c)),
+    (lambda: ATR(14, 'sma'), lambda ind, h, l, c: ind.update(h, l, c)),
+    (lambda: ATR(14, 'wilder'), lambda ind, h, l, c: ind.update(h, l, c)),
+    (lambda: RSI(14), lambda ind, h, l, c: ind.update(c)),
+])
+def test_warm_up_then_stream_equals_streaming(factory, feed):
+    high, low, close = _ohlc()
+    streamed, warmed = factory(), factory()
+
+    for h, l, c in zip(high, low, close):
+        feed(streamed, h, l, c)
+
+    # Warm up on the first 200 bars, stream the rest
+    if isinstance(warmed, (EMA, RSI)):
+        warmed.warm_up(close[:200])
+    else:
+        warmed.warm_up(high[:200], low[:200], close[:200])
+    for h, l, c in zip(high[200:], low[200:], close[200:]):
+        feed(warmed, h, l, c)
+
+    assert warmed.value == pytest.approx(streamed.value)
+
+def test_vwap_resets_per_session():
+    vwap = VWAP()
+    vwap.update(11, 9, 10, 100, session="d1")
+    vwap.update(21, 19, 20, 100, session="d2")
+    assert vwap.value == pytest.approx(20)
@@ -0,0 +1,53 @@
+import urllib.request
+
+import numpy as np
+
+from src.metrics.histogram import Histogram
+from src.metrics.latency import LatencyMetrics
+from src.metrics.exporter import MetricsServer
+from src.storage.duckdb_store import DuckDBStore
+
+def test_histogram_percentiles_within_one_percent():
+    rng = np.random.default_rng(0)
+    values = rng.lognormal(mean=11, sigma=1.5, size=20000).astype(np.int64) # ~60us median, long tail
+    h = Histogram()
+    for v in values:
+        h.record(int(v))
+    p = h.percentiles([0.5, 0.99])
+    for q in (0.5, 0.99):
+        exact = np.quantile(values, q)
+        assert abs(p[q] - exact) / exact < 0.01
+    assert h.max == values.max() and h.count == len(values)
+
+def test_prometheus_text_and_window_rows(tmp_path):
+    m = LatencyMetrics()
+    for ns in (1_000, 2_000, 3_000_000):
+        m.record('risk_check', ns)
+    text = m.prometheus_text()
+    assert '# TYPE ibkr_bot_stage_latency_seconds summary' in text
+    assert 'ibkr_bot_stage_latency_seconds_count{stage="risk_check"} 3' in text
+    assert 'stage="bar_to_order"' not in text # nothing recorded yet
+
+    rows = m.flush_rows()
+    assert [r['stage'] for r in rows] == ['risk_check']
+    assert rows[0]['max_us'] == 3000
+    assert m.flush_rows() == [] # window reset, totals kept
+    assert m.summary()['risk_check']['count'] == 3
+
+    store = DuckDBStore(tmp_path / "t.duckdb", flush_rows=1000, flush_interval=60)
+    store.insert_latency_metrics(rows)
+    store.flush()
+    with store._connection() as conn:
+        assert conn.execute("SELECT stage, count FROM latency_metrics").fetchall() == [('risk_check', 3)]
+    store.close()
+
+def test_metrics_endpoint_serves_text():
+    m = LatencyMetrics()
+    m.record('strategy', 5_000)
+    server = MetricsServer(0, [m.prometheus_text])
+    server.start()
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5).read().decode()
+        assert 'stage="strategy"' in body
+    finally:
+        server.close()
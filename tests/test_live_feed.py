@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timedelta
+
+from dashboard.data import DashboardData
+from src.events.feed import FeedServer, FeedClient
+from src.storage.duckdb_store import DuckDBStore
+
+def _bar(i):
+    return {
+        'symbol': 'MES', 'time': datetime(2026, 1, 2, 6, 30) + timedelta(minutes=i),
+        'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': 1.0 + i, 'volume': 10
+    }
+
+def _write(db_path, n):
+    store = DuckDBStore(db_path, flush_rows=10000, flush_interval=60)
+    for i in range(n):
+        store.insert_bar(_bar(i))
+        store.insert_strategy_state(_bar(i)['time'], {'symbol': 'MES', 'status': 'WAITING', 'ema20': float(i)})
+    store.close()
+
+class _Loop:
+    """The bot's event loop, on a thread."""
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout=5)
+
+    def call(self, fn, *args):
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+def _wait_for(pred, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not pred():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_feed_pushes_to_dashboard_without_db_reads(tmp_path):
+    db_path = tmp_path / "t.duckdb"
+    _write(db_path, 10)
+    sock = str(tmp_path / "feed.sock")
+
+    bot = _Loop()
+    server = FeedServer(sock)
+    bot.run(server.start())
+    client = FeedClient(sock, retry_seconds=0.05).start()
+    try:
+        _wait_for(lambda: client.connected and server.clients)
+        data = DashboardData(db_path)
+        data.load("MES", feed=client)
+        reads = data.stats()['db_reads']
+
+        seq = client.seq
+        sent = time.perf_counter()
+        bar = _bar(10)
+        bot.call(server.publish, 'bar', 'MES', bar)
+        assert client.wait(seq, timeout=2.0) > seq
+        assert time.perf_counter() - sent < 0.1
+
+        bot.call(server.publish, 'state', 'MES', {'timestamp': bar['time'], 'symbol': 'MES', 'status': 'WAITING', 'ema20': 10.0})
+        bot.call(server.publish, 'signal', 'MES', {
+            'signal_id': 's1', 'timestamp': bar['time'], 'symbol': 'MES', 'base_signal': 'BUY',
+            'entry_price': 11.0, 'stop_points': 2.0, 'take_points': 3.0, 'ai_decision': 'APPROVE',
+        })
+        bot.call(server.publish, 'fill', 'MES', {
+            'exec_id': 'e1', 'time': datetime(2026, 1, 2, 6, 41), 'symbol': 'MES', 'side': 'BOT',
+            'shares': 1.0, 'price': 11.0, 'signal_id': 's1',
+        })
+        _wait_for(lambda: len(client.since(seq)[1]) == 4)
+
+        bars, signals, state, _, fills, _ = data.load("MES", feed=client)
+        assert bars['close'].iloc[-1] == 11.0 and bars['time'].is_unique
+        assert state['ema20'].iloc[0] == 10.0
+        assert signals['direction'].iloc[0] == 'BUY' and signals['stop_loss'].iloc[0] == 2.0
+        assert fills['exec_id'].iloc[0] == 'e1'
+        # Only the orders frame (marked dirty by the signal / fill) went back to the DB
+        assert data.stats()['db_reads'] == reads + 1
+        assert data.stats()['feed_rows'] == 4
+    finally:
+        client.close()
+        bot.run(server.close())
+        bot.stop()
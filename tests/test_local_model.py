@@ -0,0 +1,73 @@
+import json
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+from src.ai.local_model import _trades, load_training_data, train
+from src.storage import duckdb_store
+from src.storage.duckdb_store import DuckDBStore
+
+CHICAGO = ZoneInfo("America/Chicago")
+
+def _fill(i, t, side, price, symbol='MES'):
+    return {'execId': f"e{i}", 'time': t, 'symbol': symbol, 'side': side,
+            'shares': 1.0, 'price': price, 'permId': i, 'commission': 0.0}
+
+def _write_trades(db_path, n, fill_tz=CHICAGO):
+    """n signals, each with its strategy state and a round trip entered a minute later (even ones win)."""
+    store = DuckDBStore(db_path, flush_rows=10000, flush_interval=60)
+    for i in range(n):
+        t = datetime(2026, 1, 5, 8, 0, tzinfo=CHICAGO) + timedelta(minutes=10 * i)
+        side, direction = ('BOT', 'BUY') if i % 3 else ('SLD', 'SELL')
+        store.insert_strategy_state(t, {'symbol': 'MES', 'status': 'WAITING', 'ema20': 5000.0 - i,
+                                        'atr14': 2.0 + i % 4, 'orb_high': 5001.0, 'orb_low': 4995.0})
+        store.insert_signal({'signal_id': f"s{i}", 'timestamp': t, 'symbol': 'MES', 'base_signal': direction,
+                             'entry_price': 5002.0 + i % 5})
+        entry = (t + timedelta(minutes=1)).astimezone(fill_tz)
+        exit_price = 5003.0 if (i % 2 == 0) == (side == 'BOT') else 5001.0
+        store.insert_fill(_fill(2 * i, entry, side, 5002.0))
+        store.insert_fill(_fill(2 * i + 1, entry + timedelta(minutes=5), 'SLD' if side == 'BOT' else 'BOT', exit_price))
+    store.close()
+
+def test_trades_pairs_round_trips_per_symbol():
+    t = datetime(2026, 1, 5, 8, 0)
+    fills = pd.DataFrame([
+        {'time': t, 'symbol': 'MES', 'side': 'BOT', 'shares': 1.0, 'price': 10.0},
+        {'time': t, 'symbol': 'MNQ', 'side': 'SLD', 'shares': 2.0, 'price': 20.0},
+        {'time': t + timedelta(minutes=1), 'symbol': 'MES', 'side': 'SLD', 'shares': 1.0, 'price': 12.0},
+        {'time': t + timedelta(minutes=2), 'symbol': 'MNQ', 'side': 'BOT', 'shares': 1.0, 'price': 19.0},
+        {'time': t + timedelta(minutes=3), 'symbol': 'MNQ', 'side': 'BOT', 'shares': 1.0, 'price': 18.0},
+    ])
+    trades = _trades(fills)
+    assert list(trades['symbol']) == ['MES', 'MNQ']
+    assert list(trades['direction']) == [1, -1]
+    assert list(trades['pnl_points']) == [2.0, 2.0] # exit price vs entry price, in the trade direction
+
+def test_chicago_fills_label_signals(tmp_path, monkeypatch):
+    monkeypatch.setattr(duckdb_store, "MARKET_ZONE", CHICAGO)
+    db_path = tmp_path / "t.duckdb"
+    _write_trades(db_path, 6)
+
+    data = load_training_data(db_path)
+    assert len(data) == 6
+    assert list(data['win']) == [1.0, 0.0, 1.0, 0.0, 1.0, 0.0]
+    assert (data['entry_time'] - data['timestamp'] == pd.Timedelta(minutes=1)).all()
+
+def test_utc_fills_are_matched_in_market_time(tmp_path, monkeypatch):
+    # ib_insync reports executions in UTC
+    monkeypatch.setattr(duckdb_store, "MARKET_ZONE", CHICAGO)
+    db_path = tmp_path / "t.duckdb"
+    _write_trades(db_path, 6, fill_tz=timezone.utc)
+    assert len(load_training_data(db_path)) == 6
+
+def test_train_writes_model(tmp_path, monkeypatch):
+    monkeypatch.setattr(duckdb_store, "MARKET_ZONE", CHICAGO)
+    db_path = tmp_path / "t.duckdb"
+    _write_trades(db_path, 24)
+
+    out = tmp_path / "model.json"
+    model = train(db_path, out, min_samples=20)
+    assert model is not None and model['samples'] == 24
+    assert json.loads(out.read_text())['win_rate'] == 0.5
+    assert train(db_path, tmp_path / "other.json", min_samples=25) is None
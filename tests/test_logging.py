@@ -0,0 +1,79 @@
+import logging
+import queue
+import threading
+import time
+from src.utils import DroppingQueueHandler, LogListener, RateLimitFilter
+
+class _SlowHandler(logging.Handler):
+    """Stands in for a slow disk."""
+    def __init__(self, gate: threading.Event):
+        super().__init__()
+        self.gate = gate
+        self.messages = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.gate.wait(5)
+        self.messages.append(record.getMessage())
+        self.threads.add(threading.current_thread().name)
+
+def _logger(name, handler):
+    log = logging.getLogger(name)
+    log.propagate = False
+    log.setLevel(logging.INFO)
+    log.addHandler(handler)
+    return log
+
+def test_queue_handler_never_blocks_and_counts_drops():
+    release = threading.Event()
+    sink = _SlowHandler(release)
+    handler = DroppingQueueHandler(queue.Queue(10))
+    listener = LogListener(handler.queue, sink)
+    listener.start()
+    log = _logger("test_queue_drop", handler)
+
+    t0 = time.perf_counter()
+    for i in range(100):
+        log.info("bar %d", i)
+    assert time.perf_counter() - t0 < 0.5 # sink is stuck, callers are not
+    assert handler.dropped >= 80
+
+    release.set()
+    while not handler.queue.empty():
+        time.sleep(0.01)
+    log.info("after")
+    listener.stop()
+    assert "bar 0" in sink.messages and sink.messages[-1] == "after"
+    assert any(m.startswith("Log queue full: dropped") for m in sink.messages)
+    assert threading.current_thread().name not in sink.threads
+
+def test_lazy_args_kept_unless_mutable():
+    handler = DroppingQueueHandler(queue.Queue())
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "price %s", (1.5,), None)
+    assert handler.prepare(record).args == (1.5,) # formatted later, on the listener thread
+    state = {'status': 'WAITING'}
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "state %s", (state,), None)
+    prepared = handler.prepare(record)
+    state['status'] = 'TRADING'
+    assert prepared.getMessage() == "state {'status': 'WAITING'}"
+
+def test_rate_limit_per_call_site():
+    handler = DroppingQueueHandler(queue.Queue())
+    limiter = RateLimitFilter()
+    handler.addFilter(limiter)
+    log = _logger("test_rate_limit", handler)
+
+    def tick(i):
+        log.info("tick %d", i, extra={'every': 60})
+
+    for i in range(5):
+        tick(i)
+        log.info("always %d", i)
+    messages = [handler.queue.get_nowait().getMessage() for _ in range(handler.queue.qsize())]
+    assert [m for m in messages if m.startswith("tick")] == ["tick 0"]
+    assert len([m for m in messages if m.startswith("always")]) == 5
+    assert limiter.suppressed == 4
+
+    limiter._last = {k: (v[0] - 61, v[1]) for k, v in limiter._last.items()}
+    tick(5)
+    assert handler.queue.get_nowait().getMessage() == "tick 5 (+4 suppressed)"
@@ -0,0 +1,56 @@
+import logging
+import os
+from datetime import date
+
+from dashboard.logs import LogTail, search
+from src.utils import JsonLinesHandler, SizeTimeRotatingHandler
+
+def test_tail_reads_only_appended_bytes_and_follows_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"line {i}\n" for i in range(100000)))
+    tail = LogTail(path, n=5)
+
+    assert tail.read() == [f"line {i}" for i in range(99995, 100000)]
+    assert tail.bytes_read < 10000 # seeked from the end, not the whole ~1 MB file
+
+    before = tail.bytes_read
+    with open(path, 'a') as f:
+        f.write("new 1\nnew 2\nhalf")
+    assert tail.read()[-2:] == ["new 1", "new 2"]
+    assert tail.bytes_read - before == len("new 1\nnew 2\nhalf")
+
+    os.replace(path, tmp_path / "app.log.1")
+    path.write_text("fresh 1\nfresh 2\n")
+    assert tail.read()[-3:] == ["new 2", "fresh 1", "fresh 2"]
+
+def test_rotating_handler_rolls_over_on_size(tmp_path):
+    handler = SizeTimeRotatingHandler(tmp_path / "app.log", max_bytes=200, backup_count=2)
+    log = logging.getLogger("test_rotation")
+    log.propagate = False
+    log.addHandler(handler)
+    for i in range(50):
+        log.warning(f"message number {i}")
+    handler.close()
+    assert (tmp_path / "app.log.1").exists() and (tmp_path / "app.log.2").exists()
+    assert not (tmp_path / "app.log.3").exists()
+    assert os.path.getsize(tmp_path / "app.log") <= 200
+
+def test_structured_sink_search_by_level_and_component(tmp_path):
+    handler = JsonLinesHandler(tmp_path)
+    log = logging.getLogger("test_structured")
+    log.propagate = False
+    log.setLevel(logging.DEBUG)
+    log.addHandler(handler)
+    log.info("bar received")
+    log.error("order rejected")
+    log.error("connection lost")
+    handler.close()
+
+    day = tmp_path / date.today().isoformat()
+    assert sorted(p.name for p in day.iterdir()) == ["ERROR.jsonl", "INFO.jsonl"]
+
+    rows = search(tmp_path, ["ERROR"], days=3)
+    assert [r['msg'] for r in rows] == ["connection lost", "order rejected"]
+    assert rows[0]['component'] == "test_logs"
+    assert search(tmp_path, ["ERROR"], text="ORDER")[0]['msg'] == "order rejected"
+    assert search(tmp_path, ["ERROR"], component="executor") == []
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from src.storage.pipeline import PersistencePipeline
+
+def test_fifo_order_and_drain_on_close():
+    pipeline = PersistencePipeline(maxsize=1000)
+    done = []
+    closed = []
+    pipeline.register_closer(lambda: closed.append(len(done)))
+    for i in range(200):
+        if i % 3:
+            pipeline.submit(done.append, i)
+        else:
+            pipeline.submit_critical(done.append, i)
+    pipeline.close()
+    assert done == list(range(200))
+    assert closed == [200] # closers run after the queue is drained
+    assert pipeline.stats()['completed'] == 200
+
+    # After close: rejected, not written from the caller's thread
+    assert not pipeline.submit_critical(done.append, 200)
+    assert done[-1] == 199 and pipeline.stats()['rejected'] == 1
+
+def test_writes_submitted_while_closing_run_on_the_worker():
+    pipeline = PersistencePipeline(maxsize=1000)
+    gate = threading.Event()
+    threads = []
+
+    def slow(i):
+        gate.wait(1.0)
+        threads.append((i, threading.current_thread().name))
+
+    pipeline.submit(slow, 0)
+    closer = threading.Thread(target=pipeline.close)
+    closer.start()
+    time.sleep(0.05) # close() is waiting on the worker
+    assert pipeline.submit_critical(slow, 1)
+    gate.set()
+    closer.join(5)
+    assert threads == [(0, "persistence"), (1, "persistence")]
+
+def test_only_droppable_writes_are_dropped_when_full():
+    gate = threading.Event()
+    pipeline = PersistencePipeline(maxsize=5, put_timeout=0.01)
+    done = []
+    pipeline.submit(gate.wait) # worker stuck on a slow write
+    time.sleep(0.05)
+
+    t0 = time.perf_counter()
+    bars = [pipeline.submit(done.append, ('bar', i)) for i in range(10)]
+    fills = [pipeline.submit_critical(done.append, ('fill', i)) for i in range(10)]
+    assert time.perf_counter() - t0 < 1.0
+
+    assert bars.count(False) == 5 and all(fills)
+    stats = pipeline.stats()
+    assert stats['dropped'] == 5 and stats['blocked'] == 5
+
+    gate.set()
+    pipeline.close()
+    assert [x for x in done if x[0] == 'fill'] == [('fill', i) for i in range(10)]
+    assert [x for x in done if x[0] == 'bar'] == [('bar', i) for i in range(5)]
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from src.market.resampler import Resampler
+
+def _expected(bars, minutes):
+    df = pd.DataFrame({k: bars[k] for k in ('open', 'high', 'low', 'close', 'volume')},
+                      index=pd.to_datetime(bars['time']))
+    return df.resample(f"{minutes}min").agg(
+        {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    ).dropna()
+
+def test_incremental_matches_pandas_resample(make_bars):
+    bars = make_bars(days=2)
+    r = Resampler("MES", [5, 60])
+    completed = []
+    r.on_bar.append(lambda m, bar: completed.append((m, bar['time'])))
+    for row in bars:
+        r.update(int(row['time']), row['open'], row['high'], row['low'], row['close'], row['volume'])
+
+    for minutes in (5, 60):
+        expected = _expected(bars, minutes)
+        got = r.to_frame(minutes, len(expected))
+        assert list(got.index) == list(expected.index)
+        assert np.allclose(got.to_numpy(), expected.to_numpy())
+        # Every bar but the forming one was reported once
+        assert [t for m, t in completed if m == minutes] == list(expected.index[:-1])
+
+def test_bulk_extend_then_stream_matches_incremental(make_bars):
+    bars = make_bars(days=1)
+    split = 203 # mid-bucket for every timeframe
+    bulk = Resampler("MES", [5, 15])
+    bulk.extend(bars[:split])
+    stream = Resampler("MES", [5, 15])
+    for r in (bulk, stream):
+        rows = bars[split:] if r is bulk else bars
+        for row in rows:
+            r.update(int(row['time']), row['open'], row['high'], row['low'], row['close'], row['volume'])
+    for minutes in (5, 15):
+        n = len(stream.tail(minutes, 1000))
+        assert np.array_equal(bulk.tail(minutes, n), stream.tail(minutes, n))
+
+def test_history_starting_mid_bucket_keeps_the_partial_bucket(make_bars):
+    bars = make_bars(days=1)[7:] # 04:07, inside the first 15 / 60-min and the daily bucket
+    bulk = Resampler("MES", [15, 60, 1440])
+    stream = Resampler("MES", [15, 60, 1440])
+    assert bulk.frames[60].extend(bars[:30]).size == 0 # partial bucket is never reported as completed
+    bulk.extend(bars[:30])
+    assert bulk.tail(1440, 1)[0]['open'] == bars['open'][0]
+    assert bulk.tail(1440, 1)[0]['volume'] == bars['volume'][:30].sum()
+    for r in (bulk, stream):
+        rows = bars[30:] if r is bulk else bars
+        for row in rows:
+            r.update(int(row['time']), row['open'], row['high'], row['low'], row['close'], row['volume'])
+    for minutes in (15, 60, 1440):
+        n = len(stream.tail(minutes, 1000))
+        assert np.array_equal(bulk.tail(minutes, n), stream.tail(minutes, n))
+
+    bulk.reset()
+    assert all(len(bulk.tail(m, 1000)) == 0 and bulk.frames[m].bucket is None for m in bulk.timeframes)
+
+def test_revised_minute_is_not_double_counted():
+    r = Resampler("MES", [5])
+    t = pd.Timestamp("2026-01-05 10:00").value
+    r.update(t, 100, 101, 99, 100.5, 10)
+    r.update(t + 60_000_000_000, 100.5, 102, 100, 101, 5)
+    r.update(t + 60_000_000_000, 100.5, 103, 100, 102, 8) # same minute, revised
+    bar = r.tail(5, 1)[0]
+    assert (bar['high'], bar['close'], bar['volume']) == (103, 102, 18)
+
+def test_completed_bars_persisted_per_timeframe(tmp_path, make_bars):
+    from src.storage.duckdb_store import DuckDBStore
+    store = DuckDBStore(tmp_path / "t.duckdb", flush_rows=1000, flush_interval=60)
+    bars = make_bars(days=1)
+    r = Resampler("MES", [5], db_store=store)
+    r.extend(bars[:100])
+    for row in bars[100:110]:
+        r.update(int(row['time']), row['open'], row['high'], row['low'], row['close'], row['volume'])
+
+    df = store.get_recent_bars(1000, "MES", minutes=5)
+    assert len(df) == 21 # 110 minutes -> 22 buckets, last one still forming
+    assert np.isclose(df['volume'].iloc[0], bars['volume'][:5].sum())
+    store.close()
@@ -0,0 +1,29 @@
+from datetime import time
+
+import numpy as np
+
+from src.strategy.session import SessionSchedule, PRE, FORMING, TRADING, CLOSED
+
+def _schedule():
+    return SessionSchedule([time(9, 30), time(6, 30), time(23, 50)], 15, time(10, 25))
+
+def test_classify_phases_and_deadlines():
+    s = _schedule()
+    assert s.classify(6 * 60) == (-1, PRE, 6 * 60 + 30)
+    assert s.classify(6 * 60 + 30) == (0, FORMING, 6 * 60 + 45)
+    assert s.classify(6 * 60 + 45) == (0, TRADING, 10 * 60 + 25)
+    assert s.classify(9 * 60 + 44) == (1, FORMING, 9 * 60 + 45)
+    assert s.classify(10 * 60 + 25) == (1, CLOSED, 23 * 60 + 50)
+
+def test_window_running_past_midnight_keeps_forming():
+    # ORB end 00:05 next day: must not wrap to a time-of-day before the start
+    s = _schedule()
+    assert s.classify(23 * 60 + 59)[:2] == (2, FORMING)
+
+def test_classify_array_matches_scalar():
+    s = _schedule()
+    minutes = np.arange(1440)
+    window, phase = s.classify_array(minutes)
+    for m in minutes:
+        w, p, _ = s.classify(int(m))
+        assert (window[m], phase[m]) == (w, p)
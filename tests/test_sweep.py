@@ -0,0 +1,43 @@
+import json
+from datetime import time
+from multiprocessing import shared_memory
+
+import pytest
+
+from src.backtest import sweep
+from src.backtest.engine import run_backtest
+
+def test_make_params_parses_time_strings():
+    params = sweep.make_params({'orb_starts': ["08:00", "06:30"], 'trading_end': "10:25"})
+    assert params.orb_starts == [time(6, 30), time(8, 0)]
+    assert params.trading_end == time(10, 25)
+
+def test_walk_forward_picks_best_train_candidate_and_frees_shared_memory(monkeypatch, make_bars):
+    created = []
+    original = sweep.SharedBars.__init__
+
+    def record(self, bars):
+        original(self, bars)
+        created.append(self.shm.name)
+
+    monkeypatch.setattr(sweep.SharedBars, "__init__", record)
+    bars = make_bars(days=4)
+    candidates = sweep.grid({'orb_minutes': [10, 15, 30], 'tp_mult': [1.2, 2.0],
+                             'orb_starts': [["06:30", "08:00"]], 'trading_end': ["10:25"]})
+    rows = sweep.run_sweep(bars, candidates, train_days=2, test_days=1, workers=2)
+
+    for fold in {r['fold'] for r in rows}:
+        train = [r for r in rows if r['fold'] == fold and r['split'] == 'train']
+        test = [r for r in rows if r['fold'] == fold and r['split'] == 'test']
+        assert len(train) == len(candidates) and len(test) == 1
+        assert test[0]['params'] == max(train, key=lambda r: r['total_pnl'])['params']
+
+    # Worker results match an in-process backtest of the same window
+    full = sweep.run_sweep(bars, candidates[:1], workers=1)[0]
+    expected = run_backtest(bars, sweep.make_params(json.loads(full['params']))).summary
+    assert full['total_pnl'] == pytest.approx(expected['total_pnl'])
+
+    assert len(created) == 2
+    for name in created:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)